@@ -8,7 +8,8 @@ import threading
 from datetime import datetime, timezone
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
-sys.path.append(os.getcwd())
+if os.getcwd() not in sys.path:
+    sys.path.append(os.getcwd())
 
 from quarkagent.agent import QuarkAgent
 from quarkagent.subagent import build_subagent_tool
@@ -100,10 +101,7 @@ class AgentService:
 
         tool_names = self.settings.default_tools or sorted(get_registered_tools().keys())
         agent.tools = []
-        for tool_name in tool_names:
-            if tool_name == "skills":
-                continue
-            agent.load_builtin_tool(tool_name)
+        agent.load_builtin_tools(tool_name for tool_name in tool_names if tool_name != "skills")
 
         if self.settings.enable_custom_skill_tool:
             agent.add_tool(skill_manager.build_skills_tool())
@@ -10,7 +10,8 @@ from typing import AsyncGenerator, Dict, Any
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import StreamingResponse
 
-sys.path.append(os.getcwd())
+if os.getcwd() not in sys.path:
+    sys.path.append(os.getcwd())
 
 from app.schemas import (
     ChatRequest,
@@ -0,0 +1,81 @@
+"""
+Shared helpers for the example test scripts.
+"""
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+# Precomputed section banner for test result summaries
+_BANNER = "=" * 80
+
+
+def configure_logging() -> None:
+    """
+    Configure root logging for a test script.
+
+    Args:
+        None.
+
+    Returns:
+        None.
+    """
+    logging.basicConfig(
+        level = logging.INFO,
+        format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers = [logging.StreamHandler()]
+    )
+
+
+def _run_one(test: Callable[[], bool]) -> bool:
+    """
+    Run one test function, treating exceptions as failures.
+
+    Args:
+        test: Test function returning whether it passed.
+
+    Returns:
+        Whether the test passed.
+    """
+    try:
+        return bool(test())
+    except Exception as exc:
+        logger.error("✗ %s failed with exception: %s", test.__name__, exc)
+        return False
+
+
+def run_tests(
+    tests: List[Callable[[], bool]],
+    title: str = "Test Results",
+    parallel: bool = False
+) -> int:
+    """
+    Run test functions and log a pass/fail summary.
+
+    Only pass `parallel = True` for tests that share no process state such as
+    environment variables, monkeypatched classes or the working directory.
+
+    Args:
+        tests: Test functions returning whether they passed.
+        title: Label used in the summary line.
+        parallel: Whether to run the tests concurrently in a thread pool.
+
+    Returns:
+        Process exit code.
+    """
+    if parallel and len(tests) > 1:
+        with ThreadPoolExecutor(max_workers = len(tests)) as executor:
+            results = list(executor.map(_run_one, tests))
+    else:
+        results = [_run_one(test) for test in tests]
+
+    passed = sum(results)
+    failed = len(results) - passed
+
+    logger.info("\n%s", _BANNER)
+    logger.info("%s: %s passed, %s failed", title, passed, failed)
+    logger.info(_BANNER)
+
+    return 0 if failed == 0 else 1
@@ -0,0 +1,10 @@
+"""
+Pytest configuration that makes the repository root importable.
+"""
+import sys
+import pathlib
+
+PROJECT_ROOT = str(pathlib.Path(__file__).resolve().parents[1])
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
@@ -2,11 +2,20 @@
 """
 Run all QuarkAgent tests.
 """
+import io
 import os
 import sys
-import subprocess
+import runpy
 import logging
-from typing import List, Tuple
+import threading
+import traceback
+import importlib
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from multiprocessing.pool import Pool
+from typing import List, Optional, TextIO, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -17,91 +26,280 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
 
-def run_test_script(script_name: str) -> Tuple[bool, str]:
+# Serializes per-script output so concurrent runs do not interleave
+OUTPUT_LOCK = threading.Lock()
+
+# Number of trailing output lines retained per stream for the failure report
+OUTPUT_TAIL_LINES = 200
+
+# Directory holding this runner and the test scripts it executes
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Repository root, put on the import path once for workers and child processes
+PROJECT_ROOT = os.path.dirname(EXAMPLES_DIR)
+
+# Test scripts to run, in summary order
+TEST_SCRIPT_NAMES = (
+    "test_json_llm_utils.py",
+    "test_agent_basic.py",
+    "test_skills.py",
+    "test_subagent.py",
+    "test_tools.py",
+    "test_memory.py",
+    "test_config.py",
+    "test_web_api.py",
+    "test_cli.py",
+    "test_reflector.py",
+)
+
+TEST_SCRIPT_PATHS = {name: os.path.join(EXAMPLES_DIR, name) for name in TEST_SCRIPT_NAMES}
+
+# Modules imported once per worker so scripts do not pay the import cost
+WORKER_PREIMPORTS = (
+    "quarkagent",
+    "quarkagent.agent",
+    "quarkagent.config",
+)
+
+
+class TailingStream(io.TextIOBase):
+    """
+    Text stream that forwards complete lines immediately and keeps a bounded tail.
     """
-    Run a test script and return the result.
 
-    Args:
-        script_name: Name of the test script to run
+    def __init__(self, target: TextIO, prefix: str, max_lines: int = OUTPUT_TAIL_LINES):
+        """
+        Initialize the stream.
+
+        Args:
+            target: Stream that receives forwarded lines
+            prefix: Text prepended to every forwarded line
+            max_lines: Maximum number of lines kept in the tail
+        """
+        self._target = target
+        self._prefix = prefix
+        self._pending = ""
+        self.tail = deque(maxlen = max_lines)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._pending += text
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            self._emit(line)
+        return len(text)
+
+    def flush(self) -> None:
+        if self._pending:
+            self._emit(self._pending)
+            self._pending = ""
+        self._target.flush()
+
+    def _emit(self, line: str) -> None:
+        self.tail.append(line)
+        self._target.write(f"{self._prefix}{line}\n")
+        self._target.flush()
+
+
+def preimport_worker() -> None:
+    """
+    Warm up one pool worker by importing the shared QuarkAgent modules.
+
+    Scripts resolve skills and sample files relative to the repository root,
+    so workers run from there regardless of where the runner was started.
 
     Returns:
-        Tuple of (success, output)
+        None
+    """
+    os.chdir(PROJECT_ROOT)
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    for module_name in WORKER_PREIMPORTS:
+        importlib.import_module(module_name)
+
+
+def run_script_in_worker(script_path: str) -> Tuple[int, str, str]:
     """
-    script_path = os.path.join(os.path.dirname(__file__), script_name)
+    Execute one test script as `__main__` inside a warm pool worker.
+
+    Output is streamed line by line to the worker's real stdout/stderr while
+    only a bounded tail is kept. Environment variables, argv and root logging
+    handlers are restored after the run so scripts sharing a worker stay
+    isolated from each other.
+
+    Args:
+        script_path: Absolute path of the test script
 
-    if not os.path.exists(script_path):
-        return False, f"Script not found: {script_path}"
+    Returns:
+        Tuple of (exit code, stdout tail, stderr tail)
+    """
+    saved_environ = dict(os.environ)
+    saved_argv = sys.argv[:]
+    root_logger = logging.getLogger()
+    saved_handlers = root_logger.handlers[:]
+    prefix = f"[{os.path.basename(script_path)}] "
+    stdout_buffer = TailingStream(sys.__stdout__, prefix)
+    stderr_buffer = TailingStream(sys.__stderr__, prefix)
+    exit_code = 0
 
-    logger.info(f"\n{'='*80}")
-    logger.info(f"Running test script: {script_name}")
-    logger.info(f"{'='*80}")
+    # Let each script's logging.basicConfig bind to the captured stderr
+    root_logger.handlers.clear()
+    sys.argv = [script_path]
 
     try:
-        result = subprocess.run(
-            [sys.executable, script_path],
-            capture_output = True,
-            text = True
-        )
+        with redirect_stdout(stdout_buffer), redirect_stderr(stderr_buffer):
+            try:
+                runpy.run_path(script_path, run_name = "__main__")
+            except SystemExit as e:
+                if e.code is None:
+                    exit_code = 0
+                else:
+                    exit_code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        stdout_buffer.flush()
+        stderr_buffer.flush()
+        root_logger.handlers[:] = saved_handlers
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        sys.argv = saved_argv
 
-        # Print output
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr, file = sys.stderr)
+    return exit_code, "\n".join(stdout_buffer.tail), "\n".join(stderr_buffer.tail)
 
-        return result.returncode == 0, f"Return code: {result.returncode}"
+
+def run_test_script(pool: Pool, script_name: str) -> Tuple[bool, str, str, str]:
+    """
+    Run a test script and return the result.
+
+    Args:
+        pool: Warm worker pool that executes the script
+        script_name: Name of the test script to run
+
+    Returns:
+        Tuple of (success, details, stdout tail, stderr tail)
+    """
+    script_path = TEST_SCRIPT_PATHS[script_name]
+
+    logger.info(f"Starting test script: {script_name}")
+
+    try:
+        exit_code, stdout_tail, stderr_tail = pool.apply(run_script_in_worker, (script_path,))
+        return exit_code == 0, f"Return code: {exit_code}", stdout_tail, stderr_tail
 
     except Exception as e:
         logger.error(f"Error running {script_name}: {e}")
-        return False, f"Exception: {e}"
+        return False, f"Exception: {e}", "", ""
+
+
+def print_failure_tail(script_name: str, stdout_tail: str, stderr_tail: str) -> None:
+    """
+    Print the retained output tail of one failed test script.
+
+    Args:
+        script_name: Name of the failed test script
+        stdout_tail: Last lines of standard output
+        stderr_tail: Last lines of standard error
+
+    Returns:
+        None
+    """
+    with OUTPUT_LOCK:
+        logger.info("\n%s", _BANNER)
+        logger.info(f"Output tail of failed test script: {script_name}")
+        logger.info(_BANNER)
+
+        if stdout_tail:
+            print(stdout_tail)
+        if stderr_tail:
+            print(stderr_tail, file = sys.stderr)
 
 
 def main():
-    """Run all test scripts in examples directory"""
+    """
+    Run all test scripts in examples directory.
+
+    Remaining scripts are cancelled after the first failure unless the
+    QA_FAIL_FAST environment variable is set to something other than "1".
+    """
     logger.info("Running all QuarkAgent tests...")
 
-    # List of test scripts to run
-    test_scripts = [
-        "test_json_llm_utils.py",
-        "test_agent_basic.py",
-        "test_skills.py",
-        "test_subagent.py",
-        "test_tools.py",
-        "test_memory.py",
-        "test_config.py",
-        "test_web_api.py",
-        "test_cli.py",
-        "test_reflector.py"
-    ]
+    test_scripts = TEST_SCRIPT_NAMES
 
-    results = []
+    # Spawned workers and any CLI subprocesses inherit the import path
+    python_path = os.environ.get("PYTHONPATH")
+    os.environ["PYTHONPATH"] = PROJECT_ROOT if not python_path else PROJECT_ROOT + os.pathsep + python_path
+    fail_fast = os.getenv("QA_FAIL_FAST", "1") == "1"
 
-    # Run each test script
-    for script in test_scripts:
-        success, details = run_test_script(script)
-        results.append((script, success, details))
+    outcomes = {}
+    worker_count = min(len(test_scripts), os.cpu_count() or 1)
+
+    # Long-lived pre-warmed workers are shared by all scripts; threads only
+    # wait on the pool so results can be reported in completion order. One
+    # thread per worker keeps the remaining scripts as cancellable futures.
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes = worker_count, initializer = preimport_worker) as pool:
+        with ThreadPoolExecutor(max_workers = worker_count) as executor:
+            futures = {executor.submit(run_test_script, pool, script): script for script in test_scripts}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                script = futures[future]
+                success, details, stdout_tail, stderr_tail = future.result()
+                logger.info(f"Finished test script: {script} ({details})")
+                if not success:
+                    print_failure_tail(script, stdout_tail, stderr_tail)
+                outcomes[script] = (success, details)
+
+                if not success and fail_fast:
+                    logger.error(f"Fail-fast: cancelling remaining test scripts after {script} failed")
+                    for pending in futures:
+                        pending.cancel()
+
+        # Leaving the block terminates the workers; close and join first so
+        # they exit normally and run the scripts' atexit cleanup hooks
+        pool.close()
+        pool.join()
+
+    # Keep the summary in the declared script order
+    results: List[Tuple[str, Optional[bool], str]] = [
+        (script, *outcomes.get(script, (None, "Skipped after fail-fast")))
+        for script in test_scripts
+    ]
 
     # Print summary
-    logger.info("\n" + "=" * 80)
+    logger.info("\n%s", _BANNER)
     logger.info("Test Results Summary")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     passed = 0
     failed = 0
+    skipped = 0
 
     for script, success, details in results:
-        status = "✓ PASSED" if success else "✗ FAILED"
-        logger.info(f"{status} - {script} ({details})")
-        if success:
+        if success is None:
+            status = "- SKIPPED"
+            skipped += 1
+        elif success:
+            status = "✓ PASSED"
             passed += 1
         else:
+            status = "✗ FAILED"
             failed += 1
+        logger.info(f"{status} - {script} ({details})")
 
     logger.info(f"\nTotal: {passed} passed, {failed} failed")
+    if skipped:
+        logger.info(f"Skipped: {skipped} (set QA_FAIL_FAST=0 to run every script)")
 
     # Return appropriate exit code
-    return 0 if failed == 0 else 1
+    return 0 if failed == 0 and skipped == 0 else 1
 
 
 if __name__ == "__main__":
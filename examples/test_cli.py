@@ -2,23 +2,47 @@
 """
 Test script to verify the functionality of QuarkAgent CLI commands.
 """
+import io
 import os
 import sys
+import atexit
+import asyncio
+import functools
 import subprocess
 import tempfile
 import json
 import logging
-sys.path.append(os.getcwd())
 
-# Configure logging
-logging.basicConfig(
-    level = logging.INFO,
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers = [logging.StreamHandler()]
-)
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Dict, List, Sequence, Tuple
+
+from examples._test_harness import configure_logging, run_tests
+from quarkagent.cli import build_parser
+from quarkagent.config import load_config
+
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
+_SUBBANNER = "-" * 60
+
+# Shared scratch directory and config path reused by config tests
+_TMPDIR = tempfile.TemporaryDirectory(prefix = "quarkagent-cli-test-")
+_CFG_PATH = os.path.join(_TMPDIR.name, "cfg.json")
+atexit.register(_TMPDIR.cleanup)
+
+# Interactive commands whose CLI sessions are spawned together
+INTERACTIVE_COMMANDS = ("/skills", "$skills docx", "/help")
+
+# Option strings registered on the CLI parser, used for flag wiring checks
+CLI_OPTIONS = frozenset(
+    option
+    for action in build_parser()._actions
+    for option in action.option_strings
+)
+
 
 def build_subprocess_env(clear_proxy: bool = False) -> dict:
     """
@@ -48,6 +72,82 @@ def build_subprocess_env(clear_proxy: bool = False) -> dict:
     return env
 
 
+def run_cli_parser(argv: List[str]) -> Tuple[int, str]:
+    """
+    Run the CLI argument parser in-process and capture its exit status.
+
+    Args:
+        argv: Command-line arguments passed to the parser.
+
+    Returns:
+        Tuple of (exit code, combined stdout and stderr output).
+    """
+    output = io.StringIO()
+    exit_code = 0
+
+    with redirect_stdout(output), redirect_stderr(output):
+        try:
+            build_parser().parse_args(argv)
+        except SystemExit as exc:
+            exit_code = exc.code if isinstance(exc.code, int) else 1
+
+    return exit_code, output.getvalue()
+
+
+async def run_interactive_session(command: str, env: dict) -> Tuple[int, str]:
+    """
+    Run one interactive CLI session that executes a command and quits.
+
+    Args:
+        command: Interactive command sent before `/q`.
+        env: Environment for the CLI subprocess.
+
+    Returns:
+        Tuple of (exit code, combined stdout and stderr output).
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "quarkagent", "--api-key", "test-key",
+        stdin = asyncio.subprocess.PIPE,
+        stdout = asyncio.subprocess.PIPE,
+        stderr = asyncio.subprocess.PIPE,
+        env = env
+    )
+    stdout, stderr = await process.communicate(f"{command}\n/q\n".encode("utf-8"))
+    output = stdout.decode("utf-8", errors = "replace") + stderr.decode("utf-8", errors = "replace")
+    return process.returncode, output
+
+
+async def run_interactive_sessions(commands: Sequence[str], env: dict) -> Dict[str, Tuple[int, str]]:
+    """
+    Run several interactive CLI sessions concurrently.
+
+    Args:
+        commands: Interactive commands, one session each.
+        env: Environment shared by the CLI subprocesses.
+
+    Returns:
+        Mapping of command to (exit code, combined output).
+    """
+    results = await asyncio.gather(*(run_interactive_session(command, env) for command in commands))
+    return dict(zip(commands, results))
+
+
+@functools.lru_cache(maxsize = None)
+def get_interactive_results() -> Dict[str, Tuple[int, str]]:
+    """
+    Spawn all interactive CLI sessions once so their start-up overlaps.
+
+    Args:
+        None.
+
+    Returns:
+        Mapping of command to (exit code, combined output).
+    """
+    return asyncio.run(
+        run_interactive_sessions(INTERACTIVE_COMMANDS, build_subprocess_env(clear_proxy = True))
+    )
+
+
 def write_memory_fixture(
     memory_root: str,
     scope: str,
@@ -75,20 +175,36 @@ def write_memory_fixture(
 
 def test_cli_help():
     """Test CLI help command"""
-    logger.info("=" * 80)
+    logger.info(_BANNER)
     logger.info("Testing CLI Help Command")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     try:
-        # Test --help
+        # Test --help in-process
+        exit_code, output = run_cli_parser(["--help"])
+        assert exit_code == 0, "Help command failed"
+        assert "usage:" in output.lower(), "Help output should contain usage information"
+        logger.info("✓ --help command executed successfully")
+
+        # One real entrypoint smoke test covers every value flag in a single spawn
         result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--help"],
+            [
+                sys.executable, "-m", "quarkagent",
+                "--config", _CFG_PATH,
+                "--model", "gpt-4",
+                "--temperature", "0.5",
+                "--top-p", "0.8",
+                "--api-key", "test-key-123",
+                "--base-url", "https://api.example.com",
+                "--load", "1",
+                "--help",
+            ],
             capture_output = True,
             text = True
         )
-        assert result.returncode == 0, "Help command failed"
+        assert result.returncode == 0, "Help command with CLI flags failed"
         assert "usage:" in result.stdout.lower(), "Help output should contain usage information"
-        logger.info("✓ --help command executed successfully")
+        logger.info("✓ python -m quarkagent with all value flags and --help executed successfully")
 
         logger.info("✓ All help command tests passed")
         return True
@@ -100,19 +216,15 @@ def test_cli_help():
 
 def test_cli_version():
     """Test CLI version command"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Version Command")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         # Test --version
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--version"],
-            capture_output = True,
-            text = True
-        )
+        exit_code, _ = run_cli_parser(["--version"])
         # It's possible --version isn't implemented, so check if command fails or not
-        if result.returncode == 0:
+        if exit_code == 0:
             logger.info("✓ --version command executed successfully")
         else:
             logger.warning("⚠️  --version command not implemented")
@@ -127,79 +239,55 @@ def test_cli_version():
 
 def test_cli_config_commands():
     """Test CLI configuration commands"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Configuration Commands")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        # Create a temporary config file
-        with tempfile.NamedTemporaryFile(mode = 'w', suffix = '.json', delete = False) as temp:
-            temp.write(json.dumps({
+        # Write the shared config file
+        with open(_CFG_PATH, "w", encoding = "utf-8") as f:
+            json.dump({
                 "llm": {
                     "model_name": "gpt-3.5-turbo",
                     "api_key": "test-key",
                     "temperature": 0.1
                 },
                 "default_tools": ["calculator", "read"]
-            }))
-            temp_filename = temp.name
+            }, f)
 
         # Test loading config file
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--config", temp_filename, "--help"],
-            capture_output = True,
-            text = True
-        )
-        assert result.returncode == 0, "Failed to load config file"
-        logger.info("✓ --config parameter works correctly")
+        config = load_config(_CFG_PATH)
+        assert config.llm.model_name == "gpt-3.5-turbo", "Config model name was not loaded"
+        assert config.llm.api_key == "test-key", "Config API key was not loaded"
 
-        # Clean up
-        os.unlink(temp_filename)
+        assert "--config" in CLI_OPTIONS, "--config parameter is not registered"
+        logger.info("✓ --config parameter works correctly")
 
         logger.info("✓ All config command tests passed")
         return True
 
     except Exception as e:
         logger.error(f"✗ Config command test failed: {e}")
-        try:
-            os.unlink(temp_filename)
-        except:
-            pass
         return False
 
 
 def test_cli_model_parameters():
     """Test CLI model parameters"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Model Parameters")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         # Test model parameter
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--model", "gpt-4", "--help"],
-            capture_output = True,
-            text = True
-        )
-        assert result.returncode == 0, "--model parameter failed"
+        assert "--model" in CLI_OPTIONS, "--model parameter is not registered"
         logger.info("✓ --model parameter works correctly")
 
         # Test temperature parameter
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--temperature", "0.5", "--help"],
-            capture_output = True,
-            text = True
-        )
-        assert result.returncode == 0, "--temperature parameter failed"
+        assert "--temperature" in CLI_OPTIONS, "--temperature parameter is not registered"
         logger.info("✓ --temperature parameter works correctly")
 
         # Test top-p parameter
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--top-p", "0.8", "--help"],
-            capture_output = True,
-            text = True
-        )
-        assert result.returncode == 0, "--top-p parameter failed"
+        assert "--top-p" in CLI_OPTIONS, "--top-p parameter is not registered"
         logger.info("✓ --top-p parameter works correctly")
 
         logger.info("✓ All model parameter tests passed")
@@ -212,18 +300,13 @@ def test_cli_model_parameters():
 
 def test_cli_memory_commands():
     """Test CLI memory commands"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Memory Commands")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        # Test load memory parameter with a valid saved-memory index
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--load", "1", "--help"],
-            capture_output = True,
-            text = True
-        )
-        assert result.returncode == 0, "--load parameter failed"
+        # Test load memory parameter is registered
+        assert "--load" in CLI_OPTIONS, "--load parameter is not registered"
         logger.info("✓ --load parameter works correctly")
 
         logger.info("✓ All memory command tests passed")
@@ -236,9 +319,9 @@ def test_cli_memory_commands():
 
 def test_cli_memory_overview_command():
     """Test interactive /memory command output."""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Memory Overview Command")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         with tempfile.TemporaryDirectory(prefix = "quarkagent-cli-memory-") as temp_home:
@@ -305,9 +388,9 @@ def test_cli_memory_overview_command():
 
 def test_cli_runtime_system_prompt_snapshot():
     """Test that runtime system prompt is persisted to config and memory snapshots."""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Runtime System Prompt Snapshot")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         with tempfile.TemporaryDirectory(prefix = "quarkagent-cli-prompt-") as temp_home:
@@ -339,7 +422,8 @@ def test_cli_runtime_system_prompt_snapshot():
             result = subprocess.run(
                 [sys.executable, "-m", "quarkagent", "--api-key", "test-key", "--load", "1"],
                 input = "/q\n",
-                capture_output = True,
+                stdout = subprocess.DEVNULL,
+                stderr = subprocess.DEVNULL,
                 text = True,
                 env = env,
                 cwd = temp_home
@@ -389,27 +473,17 @@ def test_cli_runtime_system_prompt_snapshot():
 
 def test_cli_api_parameters():
     """Test CLI API parameters"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI API Parameters")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         # Test API key parameter
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--api-key", "test-key-123", "--help"],
-            capture_output = True,
-            text = True
-        )
-        assert result.returncode == 0, "--api-key parameter failed"
+        assert "--api-key" in CLI_OPTIONS, "--api-key parameter is not registered"
         logger.info("✓ --api-key parameter works correctly")
 
         # Test base URL parameter
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--base-url", "https://api.example.com", "--help"],
-            capture_output = True,
-            text = True
-        )
-        assert result.returncode == 0, "--base-url parameter failed"
+        assert "--base-url" in CLI_OPTIONS, "--base-url parameter is not registered"
         logger.info("✓ --base-url parameter works correctly")
 
         logger.info("✓ All API parameter tests passed")
@@ -422,21 +496,14 @@ def test_cli_api_parameters():
 
 def test_cli_skills_command():
     """Test interactive /skills command"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Skills Command")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--api-key", "test-key"],
-            input = "/skills\n/q\n",
-            capture_output = True,
-            text = True,
-            env = build_subprocess_env(clear_proxy = True)
-        )
-        output = result.stdout + result.stderr
+        returncode, output = get_interactive_results()["/skills"]
 
-        assert result.returncode == 0, "/skills command failed"
+        assert returncode == 0, "/skills command failed"
         assert "System Skills" in output, "System skills section missing"
         assert "Custom Skills" in output, "Custom skills section missing"
         assert "${skill_name}" in output, "Custom skill usage hint missing"
@@ -452,21 +519,14 @@ def test_cli_skills_command():
 
 def test_cli_skill_detail_command():
     """Test interactive skill detail command"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Skill Detail Command")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--api-key", "test-key"],
-            input = "$skills docx\n/q\n",
-            capture_output = True,
-            text = True,
-            env = build_subprocess_env(clear_proxy = True)
-        )
-        output = result.stdout + result.stderr
+        returncode, output = get_interactive_results()["$skills docx"]
 
-        assert result.returncode == 0, "Skill detail command failed"
+        assert returncode == 0, "Skill detail command failed"
         assert "Skill Detail: docx" in output, "Skill detail header missing"
         assert "Loaded by default in the runtime prompt" in output, "Skill load policy missing"
         assert "skills/system/docx" in output, "Skill source path missing"
@@ -482,21 +542,14 @@ def test_cli_skill_detail_command():
 
 def test_cli_help_mentions_escape_stop():
     """Test interactive help mentions Esc stop behavior"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing CLI Help Mentions Esc Stop")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        result = subprocess.run(
-            [sys.executable, "-m", "quarkagent", "--api-key", "test-key"],
-            input = "/help\n/q\n",
-            capture_output = True,
-            text = True,
-            env = build_subprocess_env(clear_proxy = True)
-        )
-        output = result.stdout + result.stderr
+        returncode, output = get_interactive_results()["/help"]
 
-        assert result.returncode == 0, "Interactive help command failed"
+        assert returncode == 0, "Interactive help command failed"
         assert "Esc" in output, "Esc help entry missing"
         assert "stop the current response" in output.lower(), "Esc stop description missing"
         logger.info("✓ Interactive help includes Esc stop hint")
@@ -527,26 +580,8 @@ def main():
         test_cli_help_mentions_escape_stop
     ]
 
-    passed = 0
-    failed = 0
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            logger.error(f"✗ Test failed with exception: {e}")
-            failed += 1
-
-    logger.info("\n" + "=" * 80)
-    logger.info(f"Test Results: {passed} passed, {failed} failed")
-    logger.info("=" * 80)
-
-    return failed == 0
+    return run_tests(tests)
 
 
 if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
+    raise SystemExit(main())
@@ -3,24 +3,31 @@
 Test script to verify the functionality of QuarkAgent configuration system.
 """
 import os
-import sys
-import tempfile
 import json
+import atexit
 import logging
-sys.path.append(os.getcwd())
+import tempfile
+from pathlib import Path
+from unittest import mock
 
+from examples._test_harness import configure_logging, run_tests
 from app.settings import AppSettings
-from quarkagent.config import load_config, save_config, AgentConfig, LLMConfig
+from quarkagent import config as config_module
+from quarkagent.config import load_config, save_config, infer_model_from_api_base, AgentConfig, LLMConfig
 
-# Configure logging
-logging.basicConfig(
-    level = logging.INFO,
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers = [logging.StreamHandler()]
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
+_SUBBANNER = "-" * 60
+
+# Shared scratch directory and config path reused by file-based tests
+_TMPDIR = tempfile.TemporaryDirectory(prefix = "quarkagent-config-test-")
+_CFG_PATH = os.path.join(_TMPDIR.name, "cfg.json")
+atexit.register(_TMPDIR.cleanup)
+
 
 def pop_environment(keys):
     """Remove environment variables and return their previous values."""
@@ -39,9 +46,9 @@ def restore_environment(values):
 
 def test_default_config():
     """Test default configuration"""
-    logger.info("=" * 80)
+    logger.info(_BANNER)
     logger.info("Testing Default Configuration")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     try:
         cleared_values = pop_environment(
@@ -98,15 +105,11 @@ def test_default_config():
 
 def test_config_save_load():
     """Test config save and load functionality"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Configuration Save and Load")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        # Create temporary config file
-        with tempfile.NamedTemporaryFile(mode = 'w', suffix = '.json', delete = False) as temp:
-            temp_filename = temp.name
-
         # Create and save custom config
         config = AgentConfig()
         config.llm.model_name = "gpt-4"
@@ -119,12 +122,12 @@ def test_config_save_load():
         config.subagent_max_iterations = 3
         config.enable_reflection = True
 
-        save_success = save_config(config, temp_filename)
+        save_success = save_config(config, _CFG_PATH)
         assert save_success, "Failed to save configuration"
         logger.info("✓ Configuration saved successfully")
 
         # Load saved config
-        loaded_config = load_config(temp_filename)
+        loaded_config = load_config(_CFG_PATH)
         logger.info("✓ Configuration loaded successfully")
 
         # Verify loaded config matches saved config
@@ -139,67 +142,51 @@ def test_config_save_load():
         assert loaded_config.enable_reflection is True, "Reflection flag mismatch"
         logger.info("✓ Loaded configuration matches saved configuration")
 
-        # Clean up
-        os.unlink(temp_filename)
-
         logger.info("✓ All save/load tests passed")
         return True
 
     except Exception as e:
         logger.error(f"✗ Config save/load test failed: {e}")
-        try:
-            os.unlink(temp_filename)
-        except:
-            pass
         return False
 
 
 def test_env_variable_loading():
     """Test environment variable loading"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Environment Variable Loading")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        # Set test environment variables
-        os.environ["LLM_API_KEY"] = "test_api_key"
-        os.environ["LLM_MODEL"] = "test-model-123"
-        os.environ["LLM_API_BASE"] = "https://api.example.com"
-        os.environ["LLM_TEMPERATURE"] = "0.5"
-
-        # Load config with environment variables
-        config = load_config()
-        logger.info("✓ Config loaded with environment variables")
-
-        # Verify environment variables are picked up
-        assert config.llm.api_key == "test_api_key", "API key not loaded from environment"
-        assert config.llm.model_name == "test-model-123", "Model name not loaded from environment"
-        assert config.llm.api_base == "https://api.example.com", "API base not loaded from environment"
-        logger.info("✓ Environment variables correctly loaded")
+        # Set test environment variables; patch.dict restores them on exit
+        with mock.patch.dict(os.environ, {
+            "LLM_API_KEY": "test_api_key",
+            "LLM_MODEL": "test-model-123",
+            "LLM_API_BASE": "https://api.example.com",
+            "LLM_TEMPERATURE": "0.5",
+        }):
+            # Load config with environment variables
+            config = load_config()
+            logger.info("✓ Config loaded with environment variables")
 
-        # Clean up
-        del os.environ["LLM_API_KEY"]
-        del os.environ["LLM_MODEL"]
-        del os.environ["LLM_API_BASE"]
-        del os.environ["LLM_TEMPERATURE"]
+            # Verify environment variables are picked up
+            assert config.llm.api_key == "test_api_key", "API key not loaded from environment"
+            assert config.llm.model_name == "test-model-123", "Model name not loaded from environment"
+            assert config.llm.api_base == "https://api.example.com", "API base not loaded from environment"
+            logger.info("✓ Environment variables correctly loaded")
 
         logger.info("✓ All environment variable tests passed")
         return True
 
     except Exception as e:
         logger.error(f"✗ Environment variable test failed: {e}")
-        # Clean up even if test fails
-        for key in ["LLM_API_KEY", "LLM_MODEL", "LLM_API_BASE", "LLM_TEMPERATURE"]:
-            if key in os.environ:
-                del os.environ[key]
         return False
 
 
 def test_identifier_env_loading():
     """Test endpoint-style request models keep LLM_IDENTIFIER as metadata."""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing LLM_IDENTIFIER Environment Loading")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     cleared_values = pop_environment(
         [
@@ -210,11 +197,12 @@ def test_identifier_env_loading():
     )
 
     try:
-        os.environ["LLM_MODEL"] = "ep-20260319-demo"
-        os.environ["LLM_IDENTIFIER"] = "Doubao-Seed-2.0-Pro"
-
-        config = load_config()
-        settings = AppSettings()
+        with mock.patch.dict(os.environ, {
+            "LLM_MODEL": "ep-20260319-demo",
+            "LLM_IDENTIFIER": "Doubao-Seed-2.0-Pro",
+        }):
+            config = load_config()
+            settings = AppSettings()
 
         assert config.llm.model_name == "ep-20260319-demo", "Config should keep the endpoint model for requests"
         assert config.llm.model_identifier == "Doubao-Seed-2.0-Pro", "Config should expose LLM_IDENTIFIER separately"
@@ -232,33 +220,25 @@ def test_identifier_env_loading():
 
 def test_api_base_model_inference():
     """Test API base to model inference"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing API Base to Model Inference")
-    logger.info("-" * 60)
-
-    cleared_values = pop_environment(["LLM_MODEL", "LLM_MODEL_NAME", "LLM_IDENTIFIER"])
+    logger.info(_SUBBANNER)
 
     try:
         # Test different API base URLs
         test_cases = [
-            ("https://api.openai.com/v1", "gpt-3.5-turbo"),
-            ("https://api.deepseek.com", "deepseek-chat"),
-            ("https://api.anthropic.com", "claude-3-sonnet-20240229"),
-            ("https://azure.openai.com", "gpt-3.5-turbo")  # Default since no deployment name
+            ("https://api.openai.com/v1", None, "gpt-3.5-turbo"),
+            ("https://api.deepseek.com", None, "deepseek-chat"),
+            ("https://api.anthropic.com", None, "claude-3-sonnet-20240229"),
+            ("https://azure.openai.com", None, "gpt-3.5-turbo"),  # Default since no deployment name
+            ("https://azure.openai.com", "my-deployment", "my-deployment"),
         ]
 
-        for api_base, expected_model in test_cases:
-            os.environ["LLM_API_BASE"] = api_base
-            config = load_config()
-            if "azure" in api_base.lower() and "AZURE_OPENAI_DEPLOYMENT_NAME" not in os.environ:
-                assert config.llm.model_name == "gpt-3.5-turbo", f"Azure default model should be gpt-3.5-turbo"
-            else:
-                assert config.llm.model_name == expected_model, \
-                    f"Expected model {expected_model} for API base {api_base}, got {config.llm.model_name}"
-            logger.info(f"✓ API base {api_base} correctly inferred model {config.llm.model_name}")
-
-        # Clean up
-        del os.environ["LLM_API_BASE"]
+        for api_base, azure_deployment, expected_model in test_cases:
+            model_name = infer_model_from_api_base(api_base, azure_deployment = azure_deployment)
+            assert model_name == expected_model, \
+                f"Expected model {expected_model} for API base {api_base}, got {model_name}"
+            logger.info(f"✓ API base {api_base} correctly inferred model {model_name}")
 
         logger.info("✓ All API base inference tests passed")
         return True
@@ -266,22 +246,18 @@ def test_api_base_model_inference():
     except Exception as e:
         logger.error(f"✗ API base inference test failed: {e}")
         return False
-    finally:
-        if "LLM_API_BASE" in os.environ:
-            del os.environ["LLM_API_BASE"]
-        restore_environment(cleared_values)
 
 
 def test_config_from_file():
     """Test loading config from file"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Configuration from File")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        # Create temporary config file
-        with tempfile.NamedTemporaryFile(mode = 'w', suffix = '.json', delete = False) as temp:
-            temp.write(json.dumps({
+        # Write the shared config file
+        with open(_CFG_PATH, "w", encoding = "utf-8") as f:
+            json.dump({
                 "llm": {
                     "model_name": "custom-model",
                     "api_key": "file-api-key",
@@ -299,11 +275,10 @@ def test_config_from_file():
                 "subagent_max_iterations": 4,
                 "enable_reflection": True,
                 "reflection_max_iterations": 5
-            }))
-            temp_filename = temp.name
+            }, f)
 
         # Load from file
-        config = load_config(temp_filename)
+        config = load_config(_CFG_PATH)
         logger.info("✓ Config loaded from file successfully")
 
         # Verify config
@@ -324,18 +299,34 @@ def test_config_from_file():
         assert config.reflection_max_iterations == 5, "Reflection iterations not from file"
 
         logger.info("✓ All file config tests passed")
+        return True
+
+    except Exception as e:
+        logger.error(f"✗ Config from file test failed: {e}")
+        return False
+
 
-        # Clean up
-        os.unlink(temp_filename)
+def test_default_prompt_reload():
+    """Test that an edited default system prompt file is picked up"""
+    logger.info("\n%s", _SUBBANNER)
+    logger.info("Testing Default System Prompt Reload")
+    logger.info(_SUBBANNER)
 
+    try:
+        prompt_path = Path(_TMPDIR.name) / "system_prompt.md"
+        with mock.patch.object(config_module, "DEFAULT_SYSTEM_PROMPT_PATH", prompt_path):
+            prompt_path.write_text("first prompt", encoding = "utf-8")
+            assert load_config().system_prompt == "first prompt", "Prompt file was not loaded"
+
+            # A different size changes the signature even on coarse mtime clocks
+            prompt_path.write_text("edited prompt text", encoding = "utf-8")
+            assert load_config().system_prompt == "edited prompt text", "Cached config kept a stale prompt"
+
+        logger.info("✓ Default system prompt reload passed")
         return True
 
     except Exception as e:
-        logger.error(f"✗ Config from file test failed: {e}")
-        try:
-            os.unlink(temp_filename)
-        except:
-            pass
+        logger.error(f"✗ Default system prompt reload test failed: {e}")
         return False
 
 
@@ -349,29 +340,12 @@ def main():
         test_env_variable_loading,
         test_identifier_env_loading,
         test_api_base_model_inference,
-        test_config_from_file
+        test_config_from_file,
+        test_default_prompt_reload
     ]
 
-    passed = 0
-    failed = 0
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            logger.error(f"✗ Test failed with exception: {e}")
-            failed += 1
-
-    logger.info("\n" + "=" * 80)
-    logger.info(f"Test Results: {passed} passed, {failed} failed")
-    logger.info("=" * 80)
-
-    return failed == 0
+    return run_tests(tests)
 
 
 if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
+    raise SystemExit(main())
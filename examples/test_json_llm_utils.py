@@ -2,11 +2,9 @@
 """
 Test script to verify the functionality of json_util and llm_util modules.
 """
-import os
-import sys
-import json
 import logging
-sys.path.append(os.getcwd())
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
 from quarkagent.utils.json_util import (
     extract_json_from_markdown,
     clean_json_string,
@@ -16,6 +14,7 @@ from quarkagent.utils.json_util import (
     extract_tool_calls,
     extract_tool_call,
     format_tool_response,
+    dumps_json,
 )
 from quarkagent.utils.llm_util import (
     extract_tool_calls as llm_extract_tool_calls,
@@ -28,6 +27,62 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 
+# Precomputed section banners for test output
+_BANNER = "=" * 50
+_BANNER_BREAK = "\n" + _BANNER
+
+
+# Module-level OpenAI-style response mocks shared by the extraction tests.
+# Explicit __slots__ keeps Python 3.8 support (dataclass(slots=True) is 3.10+).
+@dataclass
+class MockFunction:
+    __slots__ = ("name", "arguments")
+    name: str
+    arguments: str
+
+
+@dataclass
+class MockToolCall:
+    __slots__ = ("id", "function")
+    id: str
+    function: MockFunction
+
+
+@dataclass
+class MockMessage:
+    __slots__ = ("content", "tool_calls")
+    content: str
+    tool_calls: List[MockToolCall]
+
+
+@dataclass
+class MockChoice:
+    __slots__ = ("message",)
+    message: MockMessage
+
+
+@dataclass
+class MockResponse:
+    __slots__ = ("choices",)
+    choices: List[MockChoice]
+
+
+# Tool call arguments encoded once and shared by every mock response
+CALCULATOR_CALLS = (
+    ("call_0", "calculator", dumps_json({"expression": "2 + 2"})),
+    ("call_1", "calculator", dumps_json({"expression": "3 * 4"})),
+)
+
+
+def build_mock_response(content: str, calls: Sequence[Tuple[str, str, str]]) -> MockResponse:
+    """Build a mock response from (call_id, name, encoded arguments) tuples"""
+    tool_calls = [
+        MockToolCall(call_id, MockFunction(name, arguments))
+        for call_id, name, arguments in calls
+    ]
+    return MockResponse([MockChoice(MockMessage(content, tool_calls))])
+
+
 def test_json_extraction():
     """Test JSON extraction from markdown"""
     print("Testing JSON extraction from markdown...")
@@ -72,6 +127,18 @@ def test_json_cleaning():
     assert parsed["value"] == 42, "Failed to parse cleaned JSON"
     assert parsed["items"] == [1, 2, 3], "Failed to parse cleaned JSON"
 
+    # Comment markers inside string values must survive cleaning
+    url_json = '{"url": "https://example.com/a", /* note */ "code": "x = 1 // keep",}'
+    parsed = parse_json(clean_json_string(url_json))
+    print(f"Parsed JSON with comment markers in strings: {parsed}")
+    assert parsed["url"] == "https://example.com/a", "URL inside string was stripped"
+    assert parsed["code"] == "x = 1 // keep", "Line comment marker inside string was stripped"
+
+    # Trailing-comma lookalikes inside strings survive with or without a "/" in the text
+    assert clean_json_string('{"a": "x, }",}') == '{"a": "x, }"}', "String without slash was altered"
+    assert clean_json_string('{"a": "x, }", "u": "h://",}') == '{"a": "x, }", "u": "h://"}', \
+        "String with slash was altered"
+
     print("✓ JSON cleaning test passed")
 
 
@@ -98,38 +165,7 @@ def test_tool_call_extraction():
     print("\nTesting tool call extraction...")
 
     # Test OpenAI style response
-    class MockFunctionCall:
-        def __init__(self, call_id, name, arguments):
-            self.id = call_id
-            self.function = type('', (), {
-                'name': name,
-                'arguments': json.dumps(arguments)
-            })()
-
-    class MockMessage:
-        def __init__(self, content, tool_calls):
-            self.content = content
-            self.tool_calls = tool_calls
-
-    class MockChoice:
-        def __init__(self, message):
-            self.message = message
-
-    class MockResponse:
-        def __init__(self, choices):
-            self.choices = choices
-
-    response = MockResponse([
-        MockChoice(
-            MockMessage(
-                "Please use the calculator tool",
-                [
-                    MockFunctionCall("call_0", "calculator", {"expression": "2 + 2"}),
-                    MockFunctionCall("call_1", "calculator", {"expression": "3 * 4"})
-                ]
-            )
-        )
-    ])
+    response = build_mock_response("Please use the calculator tool", CALCULATOR_CALLS)
 
     tool_calls = extract_tool_calls(response)
     print(f"Extracted tool calls: {tool_calls}")
@@ -149,37 +185,7 @@ def test_llm_util():
     print("\nTesting llm_util module...")
 
     # Test llm_util's tool call extraction
-    class MockFunctionCall:
-        def __init__(self, name, arguments):
-            self.function = type('', (), {
-                'name': name,
-                'arguments': json.dumps(arguments)
-            })()
-
-    class MockMessage:
-        def __init__(self, content, tool_calls):
-            self.content = content
-            self.tool_calls = tool_calls
-
-    class MockChoice:
-        def __init__(self, message):
-            self.message = message
-
-    class MockResponse:
-        def __init__(self, choices):
-            self.choices = choices
-
-    response = MockResponse([
-        MockChoice(
-            MockMessage(
-                "Please use the calculator tool",
-                [
-                    MockFunctionCall("calculator", {"expression": "2 + 2"}),
-                    MockFunctionCall("calculator", {"expression": "3 * 4"})
-                ]
-            )
-        )
-    ])
+    response = build_mock_response("Please use the calculator tool", CALCULATOR_CALLS)
 
     llm_tool_calls = llm_extract_tool_calls(response)
     print(f"LLM util extracted tool calls: {llm_tool_calls}")
@@ -217,7 +223,7 @@ def test_formatting():
 def main():
     """Run all tests"""
     print("Running JSON utility tests...")
-    print("=" * 50)
+    print(_BANNER)
 
     test_json_extraction()
     test_json_cleaning()
@@ -226,7 +232,7 @@ def main():
     test_llm_util()
     test_formatting()
 
-    print("\n" + "=" * 50)
+    print(_BANNER_BREAK)
     print("All tests passed! ✓")
 
 
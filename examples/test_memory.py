@@ -6,17 +6,21 @@ import json
 import logging
 import os
 import shutil
-import sys
 import tempfile
 
 from contextlib import contextmanager
+from pathlib import Path
 
-sys.path.append(os.getcwd())
-
-from quarkagent.memory import Memory
+from examples._test_harness import configure_logging, run_tests
+from quarkagent.memory import Memory, wait_for_memory_writes
+from quarkagent.memory.storage import memory_log_path
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
+_SUBBANNER = "-" * 60
+
 
 @contextmanager
 def temporary_memory_home():
@@ -40,14 +44,39 @@ def temporary_memory_home():
             os.environ.pop("QUARKAGENT_HOME", None)
         else:
             os.environ["QUARKAGENT_HOME"] = original_home
+        # A queued snapshot would recreate the directory after removal
+        wait_for_memory_writes()
+        shutil.rmtree(temp_dir, ignore_errors = True)
+
+
+@contextmanager
+def temporary_memory_path():
+    """
+    Run one memory test against an explicit file in a private temporary directory.
+
+    Tests using this helper do not touch QUARKAGENT_HOME, so they can run
+    concurrently with each other.
+
+    Args:
+        None.
+
+    Yields:
+        Memory file path inside a fresh temporary directory.
+    """
+    temp_dir = tempfile.mkdtemp(prefix = "quarkagent-memory-")
+
+    try:
+        yield Path(temp_dir) / "main" / "session.json"
+    finally:
+        wait_for_memory_writes()
         shutil.rmtree(temp_dir, ignore_errors = True)
 
 
 def test_memory_initialization():
     """Test Memory initialization."""
-    logger.info("=" * 80)
+    logger.info(_BANNER)
     logger.info("Testing Memory Initialization")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     try:
         with temporary_memory_home():
@@ -73,17 +102,15 @@ def test_memory_initialization():
 
 def test_memory_operations():
     """Test memory operations for structured fields and rendered context."""
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
     logger.info("Testing Memory Operations")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        with temporary_memory_home():
-            memory = Memory(agent_scope = "main")
-            memory.set_preference("temperature", 0.1)
-            memory.set_preference("model", "gpt-3.5-turbo")
-            memory.set_fact("username", "testuser")
-            memory.set_fact("project", "QuarkAgent")
+        with temporary_memory_path() as memory_path:
+            memory = Memory(path = memory_path, agent_scope = "main")
+            memory.set_preferences({"temperature": 0.1, "model": "gpt-3.5-turbo"})
+            memory.set_facts({"username": "testuser", "project": "QuarkAgent"})
             memory.set_task_state(
                 goal = "Implement memory module",
                 topic = "context-memory",
@@ -112,6 +139,23 @@ def test_memory_operations():
             assert "Recent conversation:" in context, "Recent conversation missing"
             assert "semantic-search" in context, "Relevant episode not selected"
 
+            cached_context = memory.context(query = "How should I implement semantic retrieval?")
+            assert cached_context is context, "Unchanged memory should reuse the rendered context"
+            memory.set_fact("team", "core")
+            refreshed_context = memory.context(query = "How should I implement semantic retrieval?")
+            assert "team=core" in refreshed_context, "Context cache was not invalidated after a mutation"
+
+            # Direct edits to the public fields bypass the mutators
+            memory.facts["team"] = "platform"
+            assert "team=platform" in memory.context(query = "How should I implement semantic retrieval?"), \
+                "Context cache missed a direct fact edit"
+            memory.preferences["theme"] = "dark"
+            assert "theme=dark" in memory.context(query = "How should I implement semantic retrieval?"), \
+                "Context cache missed a direct preference edit"
+            memory.messages.append({"role": "user", "content": "Directly appended message"})
+            assert "Directly appended message" in memory.context(query = "How should I implement semantic retrieval?"), \
+                "Context cache missed a direct message append"
+
         logger.info("✓ All memory operations tests passed")
         return True
 
@@ -122,13 +166,13 @@ def test_memory_operations():
 
 def test_memory_persistence():
     """Test memory persistence for structured memory fields."""
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
     logger.info("Testing Memory Persistence")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        with temporary_memory_home():
-            memory1 = Memory(agent_scope = "main")
+        with temporary_memory_path() as memory_path:
+            memory1 = Memory(path = memory_path, agent_scope = "main")
             memory1.set_preference("test_pref", "test_value")
             memory1.set_fact("test_fact", "fact_value")
             memory1.set_task_state(
@@ -158,8 +202,8 @@ def test_memory_persistence():
             )
             memory1.push("user", "Test message 1")
             memory1.push("assistant", "Test response 1")
+            memory1.save()
 
-            memory_path = memory1.path
             memory2 = Memory(path = memory_path, agent_scope = "main")
             memory2.load()
 
@@ -183,11 +227,53 @@ def test_memory_persistence():
         return False
 
 
+def test_memory_save_batching():
+    """Test that bursts of memory mutations are coalesced into fewer writes."""
+    logger.info(_SUBBANNER)
+    logger.info("Testing Memory Save Batching")
+    logger.info(_SUBBANNER)
+
+    def saved_message_count(memory_path):
+        reloaded_memory = Memory(path = memory_path, agent_scope = "main", max_messages = 20)
+        reloaded_memory.load()
+        return len(reloaded_memory.messages)
+
+    try:
+        with temporary_memory_path() as memory_path:
+            memory = Memory(path = memory_path, agent_scope = "main", max_messages = 20)
+            memory.push("user", "Message 0")
+            assert saved_message_count(memory_path) == 1, "First change should be written immediately"
+
+            # Changes right after a write are held back until the batch fills
+            for index in range(1, 8):
+                memory.push("user", f"Message {index}")
+            assert saved_message_count(memory_path) == 1, "Burst of changes should not be written one by one"
+            memory.push("user", "Message 8")
+            assert saved_message_count(memory_path) == 9, "Full batch should be written"
+            assert len(json.loads(memory_path.read_text(encoding = "utf-8"))["messages"]) == 1, \
+                "Pushes should be appended to the log instead of rewriting the snapshot"
+            assert memory_log_path(memory_path).exists(), "Change log should hold the appended pushes"
+
+            memory.push("user", "Message 9")
+            memory.save()
+            assert saved_message_count(memory_path) == 10, "Explicit save should flush pending changes"
+            assert len(json.loads(memory_path.read_text(encoding = "utf-8"))["messages"]) == 10, \
+                "Explicit save should compact the log into the snapshot"
+            assert not memory_log_path(memory_path).exists(), "Compaction should remove the change log"
+
+        logger.info("✓ Memory save batching passed")
+        return True
+
+    except Exception as exc:
+        logger.error("✗ Memory save batching test failed: %s", exc)
+        return False
+
+
 def test_memory_from_index():
     """Test Memory.from_index method."""
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
     logger.info("Testing Memory.from_index")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         with temporary_memory_home():
@@ -216,13 +302,14 @@ def test_memory_from_index():
 
 def test_automatic_compression():
     """Test that message overflow is compressed into long-term memory layers."""
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
     logger.info("Testing Automatic Compression")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        with temporary_memory_home():
+        with temporary_memory_path() as memory_path:
             memory = Memory(
+                path = memory_path,
                 agent_scope = "main",
                 max_messages = 5,
                 preserve_recent_messages = 2,
@@ -237,6 +324,60 @@ def test_automatic_compression():
             assert memory.episodes, "Episodes should be created after compression"
             assert memory.messages[-1]["content"] == "Response about strategy 3", "Recent tail incorrect"
 
+        with temporary_memory_path() as memory_path:
+            summarized_batches = []
+
+            def summarizer(messages):
+                summarized_batches.append(len(messages))
+                return f"Discussed {len(messages)} turns about memory strategy."
+
+            memory = Memory(
+                path = memory_path,
+                agent_scope = "main",
+                max_messages = 5,
+                preserve_recent_messages = 2,
+                summarizer = summarizer,
+            )
+            for index in range(3):
+                memory.push("user", f"Research memory strategy {index}")
+                memory.push("assistant", f"Response about strategy {index}")
+
+            assert summarized_batches, "Summarizer should receive the overflowed messages"
+            assert "Discussed 4 turns about memory strategy." in memory.rolling_summary, \
+                "Rolling summary should use the summarizer output"
+
+            memory._flush()
+            reloaded_memory = Memory(path = memory_path, agent_scope = "main", max_messages = 5)
+            reloaded_memory.load()
+            assert "Discussed 4 turns about memory strategy." in reloaded_memory.rolling_summary, \
+                "Compression should force a snapshot that keeps the summarizer output"
+
+            def failing_summarizer(messages):
+                raise RuntimeError("summarizer unavailable")
+
+            memory.summarizer = failing_summarizer
+            for index in range(4):
+                memory.push("user", f"Fallback strategy {index}")
+            assert "Fallback strategy" in memory.rolling_summary, "Failed summarizer should fall back to heuristics"
+
+        with temporary_memory_path() as memory_path:
+            memory = Memory(path = memory_path, agent_scope = "main", max_messages = 20)
+            for index in range(8):
+                memory.push("user", f"Logged message {index}")
+            memory._flush()
+
+            summarizer_calls = []
+            replayed_memory = Memory(
+                path = memory_path,
+                agent_scope = "main",
+                max_messages = 5,
+                preserve_recent_messages = 2,
+                summarizer = lambda messages: summarizer_calls.append(messages) or "unused",
+            )
+            replayed_memory.load()
+            assert replayed_memory.rolling_summary, "Replay overflow should still be compressed"
+            assert not summarizer_calls, "Replaying the change log should not call the summarizer"
+
         logger.info("✓ Automatic compression passed")
         return True
 
@@ -247,13 +388,13 @@ def test_automatic_compression():
 
 def test_relevant_episode_selection():
     """Test query-aware episodic retrieval."""
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
     logger.info("Testing Relevant Episode Selection")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
-        with temporary_memory_home():
-            memory = Memory(agent_scope = "main")
+        with temporary_memory_path() as memory_path:
+            memory = Memory(path = memory_path, agent_scope = "main")
             memory.remember_episode(
                 topic = "vector-retrieval",
                 summary = "Use semantic search to retrieve relevant historical context chunks.",
@@ -283,9 +424,9 @@ def test_relevant_episode_selection():
 
 def test_memory_scope_separation():
     """Test that main and subagent memory logs are stored separately."""
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
     logger.info("Testing Memory Scope Separation")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         with temporary_memory_home() as temp_home:
@@ -324,41 +465,26 @@ def main():
     """Run all memory tests."""
     logger.info("Running QuarkAgent memory system tests...")
 
-    tests = [
-        test_memory_initialization,
+    # Tests with an explicit memory path share no process state and run
+    # concurrently; the rest resolve paths through QUARKAGENT_HOME
+    isolated_tests = [
         test_memory_operations,
         test_memory_persistence,
-        test_memory_from_index,
+        test_memory_save_batching,
         test_automatic_compression,
         test_relevant_episode_selection,
+    ]
+    home_tests = [
+        test_memory_initialization,
+        test_memory_from_index,
         test_memory_scope_separation,
     ]
 
-    passed = 0
-    failed = 0
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as exc:
-            logger.error("✗ Test failed with exception: %s", exc)
-            failed += 1
-
-    logger.info("=" * 80)
-    logger.info("Test Results: %s passed, %s failed", passed, failed)
-    logger.info("=" * 80)
-    return failed == 0
-
+    isolated_code = run_tests(isolated_tests, title = "Isolated memory tests", parallel = True)
+    home_code = run_tests(home_tests, title = "QUARKAGENT_HOME memory tests")
+    return max(isolated_code, home_code)
 
 if __name__ == "__main__":
-    logging.basicConfig(
-        level = logging.INFO,
-        format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers = [logging.StreamHandler()]
-    )
-
-    success = main()
-    sys.exit(0 if success else 1)
+    configure_logging()
+
+    raise SystemExit(main())
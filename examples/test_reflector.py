@@ -2,28 +2,25 @@
 """
 Test script to verify the functionality of QuarkAgent Reflector.
 """
-import os
-import sys
 import logging
-sys.path.append(os.getcwd())
 
+from examples._test_harness import configure_logging, run_tests
 from quarkagent.utils.reflector import Reflector
 
-# Configure logging
-logging.basicConfig(
-    level = logging.INFO,
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers = [logging.StreamHandler()]
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
+_SUBBANNER = "-" * 60
+
 
 def test_reflector_initialization():
     """Test Reflector initialization"""
-    logger.info("=" * 80)
+    logger.info(_BANNER)
     logger.info("Testing Reflector Initialization")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     try:
         # Test basic initialization
@@ -38,7 +35,11 @@ def test_reflector_initialization():
             "disabled": False
         }
         reflector = Reflector(config = config)
-        logger.info(f"✓ Reflector initialized with config: temperature={reflector.temperature}, max_tokens={reflector.max_tokens}")
+        logger.info(
+            "✓ Reflector initialized with config: temperature=%s, max_tokens=%s",
+            reflector.temperature,
+            reflector.max_tokens
+        )
         assert reflector.temperature == 0.5, "Temperature not set from config"
         assert reflector.max_tokens == 1000, "Max tokens not set from config"
         assert not reflector.disabled, "Reflector should not be disabled"
@@ -53,15 +54,15 @@ def test_reflector_initialization():
         return True
 
     except Exception as e:
-        logger.error(f"✗ Reflector initialization test failed: {e}")
+        logger.error("✗ Reflector initialization test failed: %s", e)
         return False
 
 
 def test_reflection_disabled_behavior():
     """Test reflector behavior when disabled"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Reflector Disabled Behavior")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         reflector = Reflector(config = {"disabled": True})
@@ -86,15 +87,15 @@ def test_reflection_disabled_behavior():
         return True
 
     except Exception as e:
-        logger.error(f"✗ Disabled reflector test failed: {e}")
+        logger.error("✗ Disabled reflector test failed: %s", e)
         return False
 
 
 def test_reflection_message_processing():
     """Test reflection message processing"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Reflection Message Processing")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         reflector = Reflector()
@@ -122,15 +123,15 @@ def test_reflection_message_processing():
         return True
 
     except Exception as e:
-        logger.error(f"✗ Reflection message processing test failed: {e}")
+        logger.error("✗ Reflection message processing test failed: %s", e)
         return False
 
 
 def test_reflection_prompt_generation():
     """Test reflection prompt generation"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Reflection Prompt Generation")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         reflector = Reflector()
@@ -139,8 +140,8 @@ def test_reflection_prompt_generation():
         response = "Paris is the capital of France."
 
         prompt = reflector._build_reflection_prompt(query, response)
-        logger.info(f"✓ Prompt generated successfully (length: {len(prompt)} characters)")
-        logger.debug(f"Prompt snippet: {prompt[:200]}...")
+        logger.info("✓ Prompt generated successfully (length: %s characters)", len(prompt))
+        logger.debug("Prompt snippet: %.200s...", prompt)
 
         assert query in prompt, "Query not in prompt"
         assert response in prompt, "Response not in prompt"
@@ -153,15 +154,15 @@ def test_reflection_prompt_generation():
         return True
 
     except Exception as e:
-        logger.error(f"✗ Reflection prompt generation test failed: {e}")
+        logger.error("✗ Reflection prompt generation test failed: %s", e)
         return False
 
 
 def test_response_extraction():
     """Test improved response extraction"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Response Extraction")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         reflector = Reflector()
@@ -175,7 +176,7 @@ Paris is the capital and most populous city of France. It is located in the nort
         """.strip()
 
         improved = reflector._extract_improved_response(reflection_content)
-        logger.info(f"✓ Extracted improved response: {improved[:50]}...")
+        logger.info("✓ Extracted improved response: %.50s...", improved)
         assert "capital and most populous city" in improved, "Failed to extract improved response"
 
         # Test without clear section
@@ -189,15 +190,15 @@ Paris is the capital and most populous city of France. It is located in the nort
         return True
 
     except Exception as e:
-        logger.error(f"✗ Response extraction test failed: {e}")
+        logger.error("✗ Response extraction test failed: %s", e)
         return False
 
 
 def test_reflector_configuration():
     """Test reflector configuration handling"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Reflector Configuration")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         config = {
@@ -210,7 +211,11 @@ def test_reflector_configuration():
         assert reflector.temperature == 0.3, "Temperature not configured"
         assert reflector.max_tokens == 500, "Max tokens not configured"
         assert not reflector.disabled, "Should not be disabled"
-        logger.info(f"✓ Reflector configured with temperature={reflector.temperature}, max_tokens={reflector.max_tokens}")
+        logger.info(
+            "✓ Reflector configured with temperature=%s, max_tokens=%s",
+            reflector.temperature,
+            reflector.max_tokens
+        )
 
         # Test default values
         default_reflector = Reflector()
@@ -223,7 +228,7 @@ def test_reflector_configuration():
         return True
 
     except Exception as e:
-        logger.error(f"✗ Reflector configuration test failed: {e}")
+        logger.error("✗ Reflector configuration test failed: %s", e)
         return False
 
 
@@ -240,26 +245,9 @@ def main():
         test_reflector_configuration
     ]
 
-    passed = 0
-    failed = 0
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            logger.error(f"✗ Test failed with exception: {e}")
-            failed += 1
-
-    logger.info("\n" + "=" * 80)
-    logger.info(f"Test Results: {passed} passed, {failed} failed")
-    logger.info("=" * 80)
-
-    return failed == 0
+    # Reflector tests share no process state, so they can run concurrently
+    return run_tests(tests, parallel = True)
 
 
 if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
+    raise SystemExit(main())
@@ -3,24 +3,22 @@
 Test script to verify the QuarkAgent skills system.
 """
 import os
-import sys
 import shutil
 import logging
 import tempfile
 
-sys.path.append(os.getcwd())
-
+from examples._test_harness import configure_logging, run_tests
 from quarkagent.agent import QuarkAgent
 from quarkagent.skills import SkillManager, build_skill_command_response
 
-logging.basicConfig(
-    level = logging.INFO,
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers = [logging.StreamHandler()]
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
+_SUBBANNER = "-" * 60
+
 
 def clear_proxy_environment() -> dict:
     """
@@ -176,9 +174,9 @@ def test_namespace_discovery() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("=" * 80)
+    logger.info(_BANNER)
     logger.info("Testing Skill Namespace Discovery")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     skill_manager = build_skill_manager()
 
@@ -201,9 +199,9 @@ def test_default_system_skill_loading() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Default System Skill Loading")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     skill_manager = build_skill_manager()
 
@@ -233,9 +231,9 @@ def test_custom_skill_lookup() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Custom Skill Lookup")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     skill_manager = build_skill_manager()
 
@@ -269,9 +267,9 @@ def test_local_skill_commands() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Local Skill Commands")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     skill_manager = build_skill_manager()
 
@@ -307,9 +305,9 @@ def test_agent_runtime_prompt_with_skills() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Agent Runtime Prompt With Skills")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     skill_manager = build_skill_manager()
 
@@ -360,23 +358,7 @@ def main() -> int:
         test_agent_runtime_prompt_with_skills,
     ]
 
-    passed = 0
-    failed = 0
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as exc:
-            logger.error("✗ %s failed: %s", test.__name__, exc)
-            failed += 1
-
-    logger.info("\n" + "=" * 80)
-    logger.info("Skills Test Results: %s passed, %s failed", passed, failed)
-    logger.info("=" * 80)
-    return 0 if failed == 0 else 1
+    return run_tests(tests, title = "Skills Test Results")
 
 
 if __name__ == "__main__":
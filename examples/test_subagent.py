@@ -3,27 +3,28 @@
 Test script to verify QuarkAgent subagent functionality.
 """
 import os
-import sys
 import json
+import contextvars
 import logging
 import shutil
 import tempfile
 
 from contextlib import contextmanager
 
-sys.path.append(os.getcwd())
-
+from examples._test_harness import configure_logging, run_tests
 from quarkagent.agent import QuarkAgent
+from quarkagent.agent.runtime import ACTIVE_STOP_CALLBACK
+from quarkagent.memory import wait_for_memory_writes
 from quarkagent.subagent import build_subagent_tool
 
-logging.basicConfig(
-    level = logging.INFO,
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers = [logging.StreamHandler()]
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
+_SUBBANNER = "-" * 60
+
 
 @contextmanager
 def temporary_memory_home():
@@ -47,6 +48,8 @@ def temporary_memory_home():
             os.environ.pop("QUARKAGENT_HOME", None)
         else:
             os.environ["QUARKAGENT_HOME"] = original_home
+        # A queued snapshot would recreate the directory after removal
+        wait_for_memory_writes()
         shutil.rmtree(temp_dir, ignore_errors = True)
 
 
@@ -119,9 +122,9 @@ def test_subagent_tool_registration() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("=" * 80)
+    logger.info(_BANNER)
     logger.info("Testing Subagent Tool Registration")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     try:
         agent = create_test_agent(
@@ -156,9 +159,9 @@ def test_subagent_execution() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Subagent Execution")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     original_call_llm = QuarkAgent._call_llm
     responses = [
@@ -208,6 +211,8 @@ def test_subagent_execution() -> bool:
             assert result["tools"] == ["calculator"], f"Unexpected delegated tools: {result}"
             assert result["answer"] == "The delegated result is 4.", f"Unexpected subagent answer: {result}"
 
+            # Memory files are written by a background thread
+            wait_for_memory_writes()
             subagent_dir = os.path.join(temp_home, "memory", "subagent")
             subagent_files = sorted(os.listdir(subagent_dir))
             assert len(subagent_files) == 1, f"Expected one subagent log file, got {subagent_files}"
@@ -250,9 +255,9 @@ def test_subagent_stop_propagation() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Subagent Stop Propagation")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         with temporary_memory_home():
@@ -264,10 +269,11 @@ def test_subagent_stop_propagation() -> bool:
             )
             agent.load_builtin_tool("calculator")
             agent.add_tool(build_subagent_tool(agent, default_max_iterations = 3))
-            agent._active_stop_callback = lambda: True
-
             subagent_tool = next(tool for tool in agent.tools if tool["name"] == "subagent")
-            result = subagent_tool["executor"](task = "Any delegated task is fine.")
+            # Run the tool in a context where the parent run has a stop pending
+            stop_context = contextvars.copy_context()
+            stop_context.run(ACTIVE_STOP_CALLBACK.set, lambda: True)
+            result = stop_context.run(subagent_tool["executor"], task = "Any delegated task is fine.")
 
             assert result["status"] == "stopped", f"Unexpected stop result: {result}"
             assert result["answer"] == agent.STOP_MESSAGE, f"Unexpected stop message: {result}"
@@ -277,9 +283,6 @@ def test_subagent_stop_propagation() -> bool:
     except Exception as e:
         logger.error(f"✗ Subagent stop propagation test failed: {e}")
         return False
-    finally:
-        if "agent" in locals():
-            agent._active_stop_callback = None
 
 
 def main() -> int:
@@ -298,23 +301,7 @@ def main() -> int:
         test_subagent_stop_propagation,
     ]
 
-    passed = 0
-    failed = 0
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as exc:
-            logger.error("✗ %s failed: %s", test.__name__, exc)
-            failed += 1
-
-    logger.info("\n" + "=" * 80)
-    logger.info("Subagent Test Results: %s passed, %s failed", passed, failed)
-    logger.info("=" * 80)
-    return 0 if failed == 0 else 1
+    return run_tests(tests, title = "Subagent Test Results")
 
 
 if __name__ == "__main__":
@@ -3,143 +3,160 @@
 Test script to verify the functionality of QuarkAgent built-in tools.
 """
 import os
-import sys
+import re
+import fnmatch
 import tempfile
 import logging
 
-sys.path.append(os.getcwd())
+from math import isclose
+from pathlib import Path
+from typing import Tuple
 
-from quarkagent.tools import get_registered_tools, get_tool, execute_tool
-from quarkagent.tools.basic_tools import calculator
-from quarkagent.tools.code_tools import read, write, edit, glob, grep, bash
+from examples._test_harness import configure_logging, run_tests
+from quarkagent.tools import get_registered_tools, get_tool, get_tool_description, execute_tool
+from quarkagent.tools.basic_tools import calculator, file_status, _evaluate_expression
+from quarkagent.tools.code_tools import read, write, edit, glob, grep, bash, search_multi, _compile_regex
 
-# Configure logging
-logging.basicConfig(
-    level = logging.INFO,
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers = [logging.StreamHandler()]
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
+_SUBBANNER = "-" * 60
+
+# Calculator expressions and their expected float results
+_CALC_CASES: Tuple[Tuple[str, float], ...] = (
+    ("2 + 2", 4.0),
+    ("3 * 4", 12.0),
+    ("10 - 5", 5.0),
+    ("100 / 4", 25.0),
+    ("2 ** 3", 8.0),
+    ("sqrt(16)", 4.0),
+)
+
+# Test-file regex shared by the grep and fused search checks
+_TEST_FILE_RE = re.compile(r"test.*\.py$")
+
 
 def test_tool_registration():
     """Test tool registration system"""
-    logger.info("=" * 80)
+    logger.info(_BANNER)
     logger.info("Testing Tool Registration System")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     try:
         registered_tools = get_registered_tools()
-        logger.info(f"✓ Number of registered tools: {len(registered_tools)}")
-        logger.debug(f"Registered tools: {list(registered_tools.keys())}")
+        logger.info("✓ Number of registered tools: %s", len(registered_tools))
+        logger.debug("Registered tools: %s", list(registered_tools))
 
         assert len(registered_tools) > 0, "No tools registered"
+        assert get_registered_tools() is registered_tools, "Registry view should be shared, not copied"
+        try:
+            registered_tools["bogus"] = None
+            raise AssertionError("Registry view should be read-only")
+        except TypeError:
+            pass
 
         # Test getting tools by name
         test_tool_names = ["read", "write", "bash", "calculator", "grep", "glob"]
         for tool_name in test_tool_names:
             tool = get_tool(tool_name)
             if tool:
-                logger.info(f"✓ Tool '{tool_name}' found in registered tools")
+                logger.info("✓ Tool '%s' found in registered tools", tool_name)
             else:
-                logger.warning(f"⚠️  Tool '{tool_name}' not found")
+                logger.warning("⚠️  Tool '%s' not found", tool_name)
+
+        # Descriptions are cached per tool but handed out as independent copies
+        description = get_tool_description(read)
+        description["parameters"]["properties"]["path"]["type"] = "mutated"
+        fresh_description = get_tool_description(read)
+        assert fresh_description["parameters"]["properties"]["path"]["type"] == "string", "Cached description was mutated"
+        assert fresh_description["parameters"]["required"] == ["path"], f"Unexpected required: {fresh_description}"
 
         logger.info("✓ All tool registration tests passed")
         return True
 
     except Exception as e:
-        logger.error(f"✗ Tool registration test failed: {e}")
+        logger.error("✗ Tool registration test failed: %s", e)
         return False
 
 
 def test_calculator_tool():
     """Test calculator tool"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Calculator Tool")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         # Test basic arithmetic
-        test_cases = [
-            ("2 + 2", 4),
-            ("3 * 4", 12),
-            ("10 - 5", 5),
-            ("100 / 4", 25),
-            ("2 ** 3", 8),
-            ("sqrt(16)", 4)
-        ]
-
-        for expression, expected in test_cases:
+        for expression, expected in _CALC_CASES:
             result = calculator(expression = expression)
-            logger.info(f"✓ {expression} = {result}")
+            logger.info("✓ %s = %s", expression, result)
             # Allow for floating point precision issues
-            assert abs(float(result) - expected) < 0.001, f"Calculation error: {expression} should be {expected}, got {result}"
+            assert isclose(result, expected, abs_tol = 1e-3), f"Calculation error: {expression} should be {expected}, got {result}"
 
         logger.info("✓ All calculator tests passed")
         return True
 
     except Exception as e:
-        logger.error(f"✗ Calculator tool test failed: {e}")
+        logger.error("✗ Calculator tool test failed: %s", e)
         return False
 
 
 def test_file_operations_tools():
     """Test file operation tools"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing File Operation Tools")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
+    # Create the temporary file through a raw descriptor
+    fd, temp_filename = tempfile.mkstemp(suffix = '.txt')
     try:
-        # Create a temporary file for testing
-        with tempfile.NamedTemporaryFile(mode = 'w', suffix = '.txt', delete = False) as temp:
-            temp_filename = temp.name
-            temp.write("Test content for file operations")
+        os.write(fd, b"Test content for file operations")
+    finally:
+        os.close(fd)
+    temp_path = Path(temp_filename)
 
+    try:
         # Test read file
         content = read(path = temp_filename)
-        logger.info(f"✓ Read file successful: {content.strip()}")
+        logger.info("✓ Read file successful: %s", content.strip())
         assert "Test content for file operations" in content, "Read tool failed"
 
         # Test write file
         test_content = "Updated content from write tool"
-        write(path = temp_filename, content = test_content)
-        updated_content = read(path = temp_filename)
-        assert test_content in updated_content, "Write tool failed to update file"
+        assert "success" in write(path = temp_filename, content = test_content), "Write tool failed"
         logger.info("✓ Write file successful")
 
-        # Test edit file
-        edit(path = temp_filename, old = test_content, new = "Edited content")
-        edited_content = read(path = temp_filename)
-        assert "Edited content" in edited_content, "Edit tool failed"
+        # Test edit file; edit only succeeds if it finds the written content,
+        # so one read afterwards verifies both the write and the edit
+        edit_result = edit(path = temp_filename, old = test_content, new = "Edited content")
+        assert "success" in edit_result, f"Write tool failed to update file: {edit_result}"
+        assert temp_path.read_text(encoding = "utf-8") == "Edited content", "Edit tool failed"
         logger.info("✓ Edit file successful")
 
-        # Clean up
-        os.unlink(temp_filename)
-
         logger.info("✓ All file operation tests passed")
         return True
 
     except Exception as e:
-        logger.error(f"✗ File operation tool test failed: {e}")
-        # Clean up temp file if it exists
-        try:
-            os.unlink(temp_filename)
-        except:
-            pass
+        logger.error("✗ File operation tool test failed: %s", e)
         return False
 
+    finally:
+        os.unlink(temp_filename)
+
 
 def test_bash_tool():
     """Test bash command tool"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Bash Command Tool")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         # Test simple command
         result = bash(cmd = "echo 'Hello World'")
-        logger.info(f"✓ Bash command successful: {result}")
+        logger.info("✓ Bash command successful: %s", result)
         assert result["exit_code"] == 0, "Bash command failed"
         assert "Hello World" in result["stdout"], "Bash output mismatch"
 
@@ -148,78 +165,115 @@ def test_bash_tool():
         assert result["exit_code"] == 0, "ls command failed"
         logger.info("✓ ls command executed successfully")
 
+        # Output that is not valid UTF-8 is still returned
+        result = bash(cmd = "printf '\\377ok'")
+        assert result["exit_code"] == 0, "Non-UTF-8 output failed the command"
+        assert result["stdout"].endswith("ok"), "Non-UTF-8 output was not decoded"
+
         logger.info("✓ All bash tool tests passed")
         return True
 
     except Exception as e:
-        logger.error(f"✗ Bash tool test failed: {e}")
+        logger.error("✗ Bash tool test failed: %s", e)
         return False
 
 
 def test_directory_listing():
     """Test directory listing tool"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Directory Listing Tool")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         # List current directory
         result = glob(pattern = "*", path = ".")
-        logger.info(f"✓ Directory listing successful: {len(result)} items")
+        logger.info("✓ Directory listing successful: %s items", len(result))
         assert len(result) > 0, "Directory listing returned no items"
 
+        # Patterns written with the platform separator still reach subdirectories
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.mkdir(os.path.join(temp_dir, "sub"))
+            Path(temp_dir, "top.txt").write_text("top", encoding = "utf-8")
+            Path(temp_dir, "sub", "nested.txt").write_text("nested", encoding = "utf-8")
+            assert file_status(temp_dir, "*.txt")["file_count"] == 1, "Top-level pattern miscounted"
+            assert file_status(temp_dir, os.path.join("sub", "*.txt"))["file_count"] == 1, \
+                "Separator pattern missed the subdirectory"
+
         logger.info("✓ Directory listing tests passed")
         return True
 
     except Exception as e:
-        logger.error(f"✗ Directory listing test failed: {e}")
+        logger.error("✗ Directory listing test failed: %s", e)
         return False
 
 
 def test_code_tools():
     """Test code tools"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Code Tools")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         # Test search by pattern (looking for test files)
         pattern = "test_"
         files = glob(pattern = "**/test_*.py", path = ".")
-        logger.info(f"✓ Found {len(files)} files matching pattern '{pattern}'")
+        logger.info("✓ Found %s files matching pattern '%s'", len(files), pattern)
         assert len(files) > 0, "Search by pattern failed"
 
-        # Test search by regex
-        regex = r"test.*\.py$"
-        matches = grep(pattern = regex, path = ".")
-        logger.info(f"✓ Found {len(matches)} files matching regex '{regex}'")
+        # A directory pattern with a trailing slash matches the directory itself
+        assert glob(pattern = "examples/", path = ".") == [os.path.realpath("examples")], \
+            "Trailing-slash directory pattern failed"
+        assert glob(pattern = "missing_dir/", path = ".") == [], "Missing directory pattern should match nothing"
+
+        # Test search by regex, passing the precompiled pattern through
+        matches = grep(pattern = _TEST_FILE_RE, path = ".")
+        logger.info("✓ Found %s files matching regex '%s'", len(matches), _TEST_FILE_RE.pattern)
         assert len(matches) > 0, "Search by regex failed"
 
+        # Several file-name matchers share one directory walk
+        pattern_files, regex_files = search_multi(
+            [lambda name: fnmatch.fnmatchcase(name, "test_*.py"), _TEST_FILE_RE.search],
+            path = ".",
+        )
+        assert sorted(pattern_files) == sorted(files), "Fused walk disagrees with glob"
+        assert len(regex_files) > 0, "Fused walk found no regex matches"
+
+        # A pattern string is compiled once and reused on the next search
+        grep(pattern = _TEST_FILE_RE.pattern, path = "examples")
+        hits_before = _compile_regex.cache_info().hits
+        grep(pattern = _TEST_FILE_RE.pattern, path = "examples")
+        assert _compile_regex.cache_info().hits > hits_before, "Compiled regex was not reused"
+
         logger.info("✓ All code tool tests passed")
         return True
 
     except Exception as e:
-        logger.error(f"✗ Code tool test failed: {e}")
+        logger.error("✗ Code tool test failed: %s", e)
         return False
 
 
 def test_execute_tool_function():
     """Test the general execute_tool function"""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing Execute Tool Function")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     try:
         # Test calculator via execute_tool
         result = execute_tool("calculator", expression = "2 + 2")
-        logger.info(f"✓ Execute tool - calculator: {result}")
-        assert abs(float(result) - 4) < 0.001, "Execute tool failed for calculator"
+        logger.info("✓ Execute tool - calculator: %s", result)
+        assert isclose(result, 4.0, abs_tol = 1e-3), "Execute tool failed for calculator"
+
+        # A repeated expression is served from the memoized result
+        hits_before = _evaluate_expression.cache_info().hits
+        assert execute_tool("calculator", expression = "2 + 2") == result, "Memoized calculator result changed"
+        assert _evaluate_expression.cache_info().hits > hits_before, "Calculator result was not memoized"
 
         logger.info("✓ Execute tool function tests passed")
         return True
 
     except Exception as e:
-        logger.error(f"✗ Execute tool function test failed: {e}")
+        logger.error("✗ Execute tool function test failed: %s", e)
         return False
 
 
@@ -237,26 +291,10 @@ def main():
         test_execute_tool_function
     ]
 
-    passed = 0
-    failed = 0
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            logger.error(f"✗ Test failed with exception: {e}")
-            failed += 1
-
-    logger.info("\n" + "=" * 80)
-    logger.info(f"Test Results: {passed} passed, {failed} failed")
-    logger.info("=" * 80)
-
-    return failed == 0
+    # Each test works on its own temp files or read-only state, so they can
+    # overlap their file and subprocess I/O
+    return run_tests(tests, parallel = True)
 
 
 if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
+    raise SystemExit(main())
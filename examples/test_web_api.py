@@ -3,7 +3,6 @@
 Test script to verify the web API functionality.
 """
 import os
-import sys
 import json
 import time
 import logging
@@ -15,20 +14,19 @@ from typing import Any, Dict, List, Tuple
 
 from fastapi.testclient import TestClient
 
-sys.path.append(os.getcwd())
-
+from examples._test_harness import configure_logging, run_tests
 from app.settings import AppSettings
 from app.agent_service import AgentService
 from app.main import create_app
 
-logging.basicConfig(
-    level = logging.INFO,
-    format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers = [logging.StreamHandler()]
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Precomputed section banners for test log output
+_BANNER = "=" * 80
+_SUBBANNER = "-" * 60
+
 
 class FakeAgentService:
     """Mock service for deterministic API testing."""
@@ -296,9 +294,9 @@ def parse_sse_text(raw_text: str) -> List[Dict[str, Any]]:
 
 def test_health() -> bool:
     """Test health endpoint."""
-    logger.info("=" * 80)
+    logger.info(_BANNER)
     logger.info("Testing /api/health")
-    logger.info("=" * 80)
+    logger.info(_BANNER)
 
     client, _ = build_client()
     response = client.get("/api/health")
@@ -314,9 +312,9 @@ def test_health() -> bool:
 
 def test_create_and_delete_session() -> bool:
     """Test session creation and deletion endpoints."""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing /api/sessions create/delete")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     client, _ = build_client()
 
@@ -335,9 +333,9 @@ def test_create_and_delete_session() -> bool:
 
 def test_sync_chat() -> bool:
     """Test synchronous chat endpoint."""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing /api/chat")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     client, _ = build_client()
     session_id = client.post("/api/sessions").json()["session_id"]
@@ -371,9 +369,9 @@ def test_stop_session() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing /api/sessions/{id}/stop")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     client, app = build_client()
     session_id = client.post("/api/sessions").json()["session_id"]
@@ -398,9 +396,9 @@ def test_system_metadata_endpoints() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing /api/tools and /api/skills")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     client, _ = build_client()
 
@@ -423,9 +421,9 @@ def test_system_metadata_endpoints() -> bool:
 
 def test_stream_chat() -> bool:
     """Test streaming chat endpoint."""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing /api/chat/stream")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     client, _ = build_client()
     session_id = client.post("/api/sessions").json()["session_id"]
@@ -467,9 +465,9 @@ def test_local_skill_commands_over_http() -> bool:
     Returns:
         Whether the test passed.
     """
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing local /skills commands over HTTP")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     client, _, temp_root = build_real_skills_client()
 
@@ -510,9 +508,9 @@ def test_local_skill_commands_over_http() -> bool:
 
 def test_invalid_session_and_validation() -> bool:
     """Test invalid session and request validation errors."""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing invalid session + validation")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     client, _ = build_client()
 
@@ -542,9 +540,9 @@ def test_invalid_session_and_validation() -> bool:
 
 def test_ttl_expiry() -> bool:
     """Test session expiry behavior by TTL."""
-    logger.info("\n" + "-" * 60)
+    logger.info("\n%s", _SUBBANNER)
     logger.info("Testing session TTL expiry")
-    logger.info("-" * 60)
+    logger.info(_SUBBANNER)
 
     client, app = build_client()
     app.state.session_manager.ttl_seconds = 1
@@ -579,24 +577,7 @@ def main() -> int:
         test_ttl_expiry,
     ]
 
-    passed = 0
-    failed = 0
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as exc:
-            logger.error("✗ %s failed: %s", test.__name__, exc)
-            failed += 1
-
-    logger.info("\n" + "=" * 80)
-    logger.info("Web API Test Results: %s passed, %s failed", passed, failed)
-    logger.info("=" * 80)
-
-    return 0 if failed == 0 else 1
+    return run_tests(tests, title = "Web API Test Results")
 
 
 if __name__ == "__main__":
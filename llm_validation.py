@@ -9,7 +9,8 @@ from pathlib import Path
 import httpx
 from dotenv import load_dotenv
 
-sys.path.append(os.getcwd())
+if os.getcwd() not in sys.path:
+    sys.path.append(os.getcwd())
 logger = logging.getLogger("LLM_Connect_Validation")
 
 # Load environment variables from .env file
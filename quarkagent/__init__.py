@@ -1,8 +1,15 @@
-import os
-import sys
+from typing import TYPE_CHECKING, Any
 
-sys.path.append(os.getcwd())
-
-from quarkagent.agent import QuarkAgent
+if TYPE_CHECKING:
+    from quarkagent.agent import QuarkAgent
 
 __all__ = ["QuarkAgent"]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolved on first access so importing a submodule stays cheap
+    if name == "QuarkAgent":
+        from quarkagent.agent import QuarkAgent
+
+        return QuarkAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
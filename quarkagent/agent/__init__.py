@@ -1,8 +1,16 @@
-import os
-import sys
+from typing import TYPE_CHECKING, Any
 
-sys.path.append(os.getcwd())
-
-from quarkagent.agent.core import QuarkAgent
+if TYPE_CHECKING:
+    from quarkagent.agent.core import QuarkAgent
 
 __all__ = ["QuarkAgent"]
+
+
+def __getattr__(name: str) -> Any:
+    # Importing the agent pulls in the OpenAI SDK; defer it so the parsing
+    # and prompting helpers can be imported on their own
+    if name == "QuarkAgent":
+        from quarkagent.agent.core import QuarkAgent
+
+        return QuarkAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,10 @@
 import os
-import sys
 import logging
 
 from typing import Optional
 
 from dotenv import load_dotenv
 
-sys.path.append(os.getcwd())
-
 from quarkagent.agent import QuarkAgent
 
 logger = logging.getLogger(__name__)
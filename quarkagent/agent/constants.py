@@ -5,3 +5,14 @@ DEFAULT_SYSTEM_PROMPT = (
 DEFAULT_SYSTEM_PROMPT_FILE = "prompts/system_prompt.md"
 LOGGER_NAME = "QuarkAgent"
 STOP_MESSAGE = "Session stopped by user."
+DEFAULT_MAX_CONCURRENT_REQUESTS = 10
+DEFAULT_HISTORY_WINDOW = 6
+ASYNC_MAX_CONNECTIONS = 1000
+ASYNC_MAX_KEEPALIVE_CONNECTIONS = 200
+HTTP_MAX_CONNECTIONS = 200
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+HTTP_TIMEOUT = 60.0
+HTTP_CONNECT_TIMEOUT = 10.0
+LLM_MAX_ATTEMPTS = 3
+LLM_RETRY_MIN_WAIT = 1
+LLM_RETRY_MAX_WAIT = 60
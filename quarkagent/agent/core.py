@@ -1,28 +1,51 @@
-import os
-import sys
+import asyncio
 import logging
+import threading
 
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from openai import OpenAI
+import httpx
 
-sys.path.append(os.getcwd())
+from openai import AsyncOpenAI, OpenAI
 
 from quarkagent.utils import Reflector
 from quarkagent.skills import SkillDefinition, SkillManager
-from quarkagent.tools import get_registered_tools, get_tool, get_tool_description
-
-from quarkagent.agent.runtime import call_llm, execute_tool, is_stop_requested, build_stop_response, run_with_tools
-from quarkagent.agent.constants import DEFAULT_SYSTEM_PROMPT_FILE, LOGGER_NAME, STOP_MESSAGE
+from quarkagent.tools import get_registered_tools, get_tool_description
+
+from quarkagent.agent.runtime import (
+    call_llm,
+    acall_llm,
+    execute_tool,
+    build_tool_caller,
+    is_stop_requested,
+    build_stop_response,
+    run_with_tools,
+    arun_with_tools,
+)
+from quarkagent.agent.constants import (
+    ASYNC_MAX_CONNECTIONS,
+    ASYNC_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_HISTORY_WINDOW,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_SYSTEM_PROMPT_FILE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT,
+    LOGGER_NAME,
+    STOP_MESSAGE,
+)
 from quarkagent.agent.prompting import (
     load_system_prompt,
-    build_tools_prompt,
+    build_tool_prompt,
     build_memory_context,
     build_system_skills_prompt,
     build_runtime_system_prompt,
 )
 from quarkagent.agent.parsing import (
+    DEFAULT_TOOL_MARKERS,
     parse_tool_call,
+    build_tool_call_matcher,
     extract_write_args,
     extract_string_value,
     extract_balanced_json,
@@ -30,6 +53,121 @@ from quarkagent.agent.parsing import (
 
 logger = logging.getLogger(LOGGER_NAME)
 
+# HTTP connection pools shared by every agent in the process, so new agents
+# (including subagents) reuse warm keep-alive connections
+_shared_http_client: Optional[httpx.Client] = None
+_shared_async_http_client: Optional[httpx.AsyncClient] = None
+_shared_async_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_async_http_client_release: Optional[AsyncGenerator[None, None]] = None
+_shared_http_client_lock = threading.Lock()
+
+
+def _get_shared_http_client() -> httpx.Client:
+    """
+    Return the process-wide HTTP client, creating it on first use.
+
+    Args:
+        None.
+
+    Returns:
+        Shared synchronous HTTP client.
+    """
+    global _shared_http_client
+
+    with _shared_http_client_lock:
+        if _shared_http_client is None:
+            _shared_http_client = httpx.Client(
+                limits = httpx.Limits(
+                    max_connections = HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout = httpx.Timeout(HTTP_TIMEOUT, connect = HTTP_CONNECT_TIMEOUT),
+            )
+        return _shared_http_client
+
+
+async def _hold_until_loop_shutdown(client: httpx.AsyncClient) -> AsyncGenerator[None, None]:
+    """
+    Keep one async HTTP client open until its event loop finalizes async generators.
+
+    `asyncio.run` finalizes every live async generator before closing the
+    loop, which closes the client on the loop that owns its connections.
+
+    Args:
+        client: Async HTTP client bound to the running loop.
+
+    Yields:
+        None, once; the generator is then parked until the loop shuts down.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+def _get_shared_async_http_client(loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+    """
+    Return the async HTTP client shared on one event loop, creating it on first use.
+
+    Args:
+        loop: Running event loop the client's connections belong to.
+
+    Returns:
+        Shared asynchronous HTTP client.
+    """
+    global _shared_async_http_client, _shared_async_http_client_loop, _shared_async_http_client_release
+
+    with _shared_http_client_lock:
+        if _shared_async_http_client is None or _shared_async_http_client_loop is not loop:
+            previous_release = _shared_async_http_client_release
+            previous_loop = _shared_async_http_client_loop
+            # A client can only be closed on its own loop; one that is still
+            # running elsewhere gets the close scheduled, while a finished
+            # loop already closed it when finalizing its async generators
+            if previous_release is not None and previous_loop is not None and previous_loop.is_running():
+                asyncio.run_coroutine_threadsafe(previous_release.aclose(), previous_loop)
+            client = httpx.AsyncClient(
+                limits = httpx.Limits(
+                    max_connections = ASYNC_MAX_CONNECTIONS,
+                    max_keepalive_connections = ASYNC_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout = httpx.Timeout(HTTP_TIMEOUT, connect = HTTP_CONNECT_TIMEOUT),
+            )
+            # Step the holder to its yield so the running loop tracks it
+            release = _hold_until_loop_shutdown(client)
+            try:
+                release.asend(None).send(None)
+            except StopIteration:
+                pass
+            _shared_async_http_client = client
+            _shared_async_http_client_loop = loop
+            _shared_async_http_client_release = release
+        return _shared_async_http_client
+
+
+async def _aclose_shared_async_http_client(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Close the shared async HTTP client if it belongs to the given event loop.
+
+    Args:
+        loop: Event loop that is about to finish.
+
+    Returns:
+        None.
+    """
+    global _shared_async_http_client, _shared_async_http_client_loop, _shared_async_http_client_release
+
+    with _shared_http_client_lock:
+        if _shared_async_http_client_loop is not loop:
+            return
+        release = _shared_async_http_client_release
+        _shared_async_http_client = None
+        _shared_async_http_client_loop = None
+        _shared_async_http_client_release = None
+
+    if release is not None:
+        await release.aclose()
+
 
 class QuarkAgent:
     """
@@ -52,6 +190,11 @@ class QuarkAgent:
         model_identifier: Optional[str] = None,
         use_reflector: bool = False,
         memory_context_provider: Optional[Callable[[Optional[str]], str]] = None,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        stream_responses: bool = True,
+        tool_markers: Sequence[str] = DEFAULT_TOOL_MARKERS,
+        history_window: Optional[int] = DEFAULT_HISTORY_WINDOW,
+        structured_tools: bool = False,
         **kwargs: Any
     ):
         """
@@ -70,6 +213,11 @@ class QuarkAgent:
             model_identifier: Optional display name for the configured model.
             use_reflector: Whether response reflection should be enabled.
             memory_context_provider: Optional callable that renders memory context.
+            max_concurrent_requests: Maximum number of queries `arun_many` runs at once.
+            stream_responses: Whether LLM responses are streamed and cut off after a complete tool call.
+            tool_markers: Tool call markers to recognize; patterns for other markers are never run.
+            history_window: Number of recent tool turns sent back to the model, or `None` to keep all.
+            structured_tools: Whether tool schemas are sent as native function-calling tools.
             **kwargs: Additional keyword arguments reserved for future extensions.
         """
         del kwargs
@@ -84,12 +232,27 @@ class QuarkAgent:
         self.base_system_prompt = load_system_prompt(system_prompt, system_prompt_file)
         self.system_prompt = self.base_system_prompt
         self.tools: List[Dict[str, Any]] = []
+        self._tools_prompt_cache: Optional[Tuple[Tuple[Dict[str, Any], ...], str]] = None
+        self._llm_tools_cache: Optional[Tuple[Tuple[Dict[str, Any], ...], List[Dict[str, Any]]]] = None
+        self._tool_prompts: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        self._tool_callers: Dict[str, Tuple[Dict[str, Any], Any, Tuple[str, ...], Callable[[Dict[str, Any]], Any]]] = {}
+        self._static_system_prompt_cache: Optional[Tuple[Tuple[Any, ...], str]] = None
+        self._tools_by_name: Dict[str, Dict[str, Any]] = {}
+        self._tools_by_name_source: Optional[List[Dict[str, Any]]] = None
+        self._tools_by_name_size = 0
         self.client: Optional[OpenAI] = None
+        self.async_client: Optional[AsyncOpenAI] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        self.stream_responses = stream_responses
+        self.tool_markers = tuple(tool_markers)
+        self.tool_call_matcher = build_tool_call_matcher(self.tool_markers)
+        self.history_window = None if history_window is None else max(1, history_window)
+        self.structured_tools = structured_tools
         self.system_skills = system_skills or []
         self.skill_manager = skill_manager
         self.agent_scope = "main"
         self.memory_path: Optional[str] = None
-        self._active_stop_callback: Optional[Callable[[], bool]] = None
         self.use_reflector = use_reflector
         self.memory_context_provider = memory_context_provider
         self.reflector: Optional[Reflector] = None
@@ -125,6 +288,7 @@ class QuarkAgent:
             self.client = OpenAI(
                 api_key = self.api_key,
                 base_url = self.base_url,
+                http_client = _get_shared_http_client(),
             )
             logger.info("OpenAI client initialized with model: %s", self.model)
         except ImportError:
@@ -134,6 +298,31 @@ class QuarkAgent:
             logger.error("Failed to initialize OpenAI client: %s", exc)
             raise
 
+    def _get_async_client(self) -> AsyncOpenAI:
+        """
+        Return the async client for the running event loop, creating it on first use.
+
+        The underlying connection pool is tied to one event loop and shared by
+        all agents on it, so a new client is built when the agent is driven
+        from a different loop.
+
+        Args:
+            None.
+
+        Returns:
+            Async OpenAI-compatible client.
+        """
+        loop = asyncio.get_running_loop()
+        if self.async_client is None or self._async_client_loop is not loop or self.async_client.is_closed():
+            self.async_client = AsyncOpenAI(
+                api_key = self.api_key,
+                base_url = self.base_url,
+                http_client = _get_shared_async_http_client(loop),
+            )
+            self._async_client_loop = loop
+            logger.info("Async OpenAI client initialized with model: %s", self.model)
+        return self.async_client
+
     def add_tool(self, tool: Dict[str, Any]) -> None:
         """
         Add one runtime tool definition to the agent.
@@ -152,9 +341,47 @@ class QuarkAgent:
             if key not in tool:
                 raise ValueError(f"Tool is missing a required field: {key}")
 
+        index_is_current = self._is_tools_index_current()
         self.tools.append(tool)
+        if index_is_current:
+            self._tools_by_name.setdefault(tool["name"], tool)
+            self._tools_by_name_size = len(self.tools)
+        self._render_tool_prompt(tool)
+        self._get_tool_caller(tool)
         logger.debug("Added tool for QuarkAgent: %s", tool["name"])
 
+    def _is_tools_index_current(self) -> bool:
+        """
+        Check whether the name index still describes `self.tools`.
+
+        `self.tools` is public and may be reassigned, cleared or appended to
+        directly, so the index remembers which list and size it was built for.
+
+        Args:
+            None.
+
+        Returns:
+            Whether the index can be used as-is.
+        """
+        return self._tools_by_name_source is self.tools and self._tools_by_name_size == len(self.tools)
+
+    def get_tool_definition(self, tool_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up one runtime tool definition by name.
+
+        Args:
+            tool_name: Runtime tool name.
+
+        Returns:
+            First tool definition with that name, otherwise `None`.
+        """
+        if not self._is_tools_index_current():
+            # Build from the end so the first definition of a name wins
+            self._tools_by_name = {tool["name"]: tool for tool in reversed(self.tools)}
+            self._tools_by_name_source = self.tools
+            self._tools_by_name_size = len(self.tools)
+        return self._tools_by_name.get(tool_name)
+
     def load_builtin_tool(self, tool_name: str) -> bool:
         """
         Load one built-in tool by name.
@@ -165,21 +392,38 @@ class QuarkAgent:
         Returns:
             Whether the tool was loaded successfully.
         """
-        tool_item = get_tool(tool_name)
-        if not tool_item:
-            logger.warning("Built-in tool not found: %s", tool_name)
-            return False
-
-        tool_description = get_tool_description(tool_item)
-        tool = {
-            "name": tool_description["name"],
-            "description": tool_description["description"],
-            "parameters": tool_description.get("parameters", {}),
-            "executor": tool_item,
-        }
-        self.add_tool(tool)
-        logger.info("Loaded built-in tool: %s", tool_name)
-        return True
+        return bool(self.load_builtin_tools([tool_name]))
+
+    def load_builtin_tools(self, tool_names: Iterable[str]) -> List[str]:
+        """
+        Load several built-in tools in one pass over the tool registry.
+
+        Args:
+            tool_names: Built-in tool names to load.
+
+        Returns:
+            Names of the tools that were loaded successfully.
+        """
+        registry = get_registered_tools()
+        loaded_names = []
+
+        for tool_name in tool_names:
+            tool_item = registry.get(tool_name)
+            if not tool_item:
+                logger.warning("Built-in tool not found: %s", tool_name)
+                continue
+
+            tool_description = get_tool_description(tool_item)
+            self.add_tool({
+                "name": tool_description["name"],
+                "description": tool_description["description"],
+                "parameters": tool_description.get("parameters", {}),
+                "executor": tool_item,
+            })
+            loaded_names.append(tool_name)
+            logger.info("Loaded built-in tool: %s", tool_name)
+
+        return loaded_names
 
     def get_available_tools(self) -> List[str]:
         """
@@ -193,17 +437,114 @@ class QuarkAgent:
         """
         return list(get_registered_tools().keys())
 
+    def _render_tool_prompt(self, tool: Dict[str, Any]) -> str:
+        """
+        Return the prompt entry for one tool, rendering it once per tool definition.
+
+        Args:
+            tool: Runtime tool definition.
+
+        Returns:
+            Tool prompt string.
+        """
+        cached = self._tool_prompts.get(tool["name"])
+        if cached is not None and cached[0] is tool:
+            return cached[1]
+
+        tool_prompt = build_tool_prompt(tool)
+        self._tool_prompts[tool["name"]] = (tool, tool_prompt)
+        return tool_prompt
+
+    def _get_tool_caller(self, tool: Dict[str, Any]) -> Callable[[Dict[str, Any]], Any]:
+        """
+        Return the schema-specialized call function for one tool, generating it once per definition.
+
+        Args:
+            tool: Runtime tool definition.
+
+        Returns:
+            Function taking the parsed argument dict and returning the tool result.
+        """
+        executor = tool["executor"]
+        required_names = tuple(tool.get("parameters", {}).get("required", []))
+        cached = self._tool_callers.get(tool["name"])
+        if cached is not None and cached[0] is tool and cached[1] is executor and cached[2] == required_names:
+            return cached[3]
+
+        caller = build_tool_caller(tool)
+        self._tool_callers[tool["name"]] = (tool, executor, required_names, caller)
+        return caller
+
     def _build_tools_prompt(self) -> str:
         """
         Build the tools prompt block for the current agent tools.
 
+        The rendered block is reused until the tool list changes.
+
         Args:
             None.
 
         Returns:
             Tools prompt string.
         """
-        return build_tools_prompt(self.tools)
+        # `self.tools` is public and may be reassigned or mutated in place,
+        # so compare against a snapshot instead of tracking mutations
+        tools_snapshot = tuple(self.tools)
+        cached = self._tools_prompt_cache
+        if cached is not None and cached[0] == tools_snapshot:
+            return cached[1]
+
+        tools_prompt = "\n".join(self._render_tool_prompt(tool) for tool in self.tools)
+        self._tools_prompt_cache = (tools_snapshot, tools_prompt)
+        return tools_prompt
+
+    def _build_llm_tools(self) -> List[Dict[str, Any]]:
+        """
+        Build the native function-calling tool list for the current agent tools.
+
+        The list is reused until the tool list changes.
+
+        Args:
+            None.
+
+        Returns:
+            Tool definitions in the chat completions `tools` format.
+        """
+        tools_snapshot = tuple(self.tools)
+        cached = self._llm_tools_cache
+        if cached is not None and cached[0] == tools_snapshot:
+            return cached[1]
+
+        llm_tools = []
+        seen_names = set()
+        for tool in self.tools:
+            # The first definition of a name wins, as in `get_tool_definition`
+            if tool["name"] in seen_names:
+                continue
+            seen_names.add(tool["name"])
+
+            parameters = tool.get("parameters") or {}
+            llm_tools.append({
+                "type": "function",
+                "function": {
+                    "name": tool["name"],
+                    "description": tool.get("description") or "",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            name: {
+                                key: value for key, value in schema.items()
+                                if key != "default" or isinstance(value, (str, int, float, bool))
+                            }
+                            for name, schema in parameters.get("properties", {}).items()
+                        },
+                        "required": list(parameters.get("required", [])),
+                    },
+                },
+            })
+
+        self._llm_tools_cache = (tools_snapshot, llm_tools)
+        return llm_tools
 
     def _build_system_skills_prompt(self) -> str:
         """
@@ -227,15 +568,31 @@ class QuarkAgent:
         Returns:
             Fully rendered runtime system prompt.
         """
-        return build_runtime_system_prompt(
+        tools_prompt = self._build_tools_prompt() if self.tools else None
+
+        # Without skill hints or memory the prompt does not depend on the
+        # query, so it is reused until the base prompt, tools or skills change
+        query_independent = self.skill_manager is None and self.memory_context_provider is None
+        if query_independent:
+            cache_key = (self.base_system_prompt, tools_prompt, tuple(self.system_skills))
+            cached = self._static_system_prompt_cache
+            if cached is not None and cached[0] == cache_key:
+                return cached[1]
+
+        runtime_prompt = build_runtime_system_prompt(
             base_system_prompt = self.base_system_prompt,
             tools = self.tools,
             system_skills = self.system_skills,
             skill_manager = self.skill_manager,
             memory_context_provider = self.memory_context_provider,
             query = query,
+            tools_prompt = tools_prompt,
         )
 
+        if query_independent:
+            self._static_system_prompt_cache = (cache_key, runtime_prompt)
+        return runtime_prompt
+
     def _build_memory_context(self, query: Optional[str]) -> str:
         """
         Render dynamic memory context for the current query.
@@ -307,7 +664,7 @@ class QuarkAgent:
         Returns:
             Parsed tool call dictionary when successful, otherwise `None`.
         """
-        return parse_tool_call(content)
+        return parse_tool_call(content, self.tool_call_matcher)
 
     def _execute_tool(
         self,
@@ -338,6 +695,18 @@ class QuarkAgent:
         """
         return call_llm(self, messages)
 
+    async def _acall_llm(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Call the async LLM client with runtime messages.
+
+        Args:
+            messages: Runtime conversation messages.
+
+        Returns:
+            LLM response content string.
+        """
+        return await acall_llm(self, messages)
+
     def _is_stop_requested(self, stop_callback: Optional[Callable[[], bool]]) -> bool:
         """
         Evaluate whether the current run should stop.
@@ -418,3 +787,104 @@ class QuarkAgent:
             max_iterations = max_iterations,
             stop_callback = stop_callback,
         )
+
+    async def arun(
+        self,
+        query: str,
+        max_iterations: int = 10,
+        stop_callback: Optional[Callable[[], bool]] = None
+    ) -> str:
+        """
+        Execute the default agent run loop without blocking the event loop.
+
+        Args:
+            query: User query text.
+            max_iterations: Maximum number of runtime iterations.
+            stop_callback: Optional callback that stops the run at safe boundaries.
+
+        Returns:
+            Agent response text.
+        """
+        logger.info("Starting async run with query: %s", query)
+        return await arun_with_tools(
+            self,
+            query = query,
+            max_iterations = max_iterations,
+            stop_callback = stop_callback,
+        )
+
+    async def arun_many(
+        self,
+        queries: Sequence[str],
+        max_iterations: int = 10,
+        stop_callback: Optional[Callable[[], bool]] = None
+    ) -> List[str]:
+        """
+        Run several independent queries concurrently.
+
+        At most `max_concurrent_requests` queries are in flight at once, and
+        each query has at most one outstanding LLM request.
+
+        Args:
+            queries: User query texts.
+            max_iterations: Maximum number of runtime iterations per query.
+            stop_callback: Optional callback that stops every run at safe boundaries.
+
+        Returns:
+            Agent response texts in the same order as `queries`.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def run_one(query: str) -> str:
+            async with semaphore:
+                return await self.arun(query, max_iterations, stop_callback)
+
+        return list(await asyncio.gather(*(run_one(query) for query in queries)))
+
+    async def aclose(self) -> None:
+        """
+        Close the async HTTP connection pool shared on the running event loop.
+
+        Loops driven by `asyncio.run` close the pool on shutdown by themselves;
+        call this before finishing any other event loop the agent ran on.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        self.async_client = None
+        self._async_client_loop = None
+        await _aclose_shared_async_http_client(asyncio.get_running_loop())
+
+    def run_batch(
+        self,
+        queries: Sequence[str],
+        max_iterations: int = 10,
+        stop_callback: Optional[Callable[[], bool]] = None
+    ) -> List[str]:
+        """
+        Run a batch of independent queries concurrently from synchronous code.
+
+        Drives `arun_many` on a fresh event loop, so it must not be called
+        from inside a running loop; async callers should await `arun_many`.
+        The loop's HTTP connection pool is closed before the loop finishes.
+
+        Args:
+            queries: User query texts.
+            max_iterations: Maximum number of runtime iterations per query.
+            stop_callback: Optional callback that stops every run at safe boundaries.
+
+        Returns:
+            Agent response texts in the same order as `queries`.
+        """
+        logger.info("Starting batch run with %s queries", len(queries))
+
+        async def run_batch_on_loop() -> List[str]:
+            try:
+                return await self.arun_many(queries, max_iterations, stop_callback)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run_batch_on_loop())
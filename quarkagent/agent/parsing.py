@@ -1,76 +1,134 @@
-import os
 import re
-import sys
 import json
 import logging
 
-from typing import Any, Dict, Optional
-
-sys.path.append(os.getcwd())
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple
 
 from quarkagent.agent.constants import LOGGER_NAME
 from quarkagent.utils import parse_json
 
 logger = logging.getLogger(LOGGER_NAME)
 
-TOOL_NAME_PATTERNS = [
-    r"TOOL:\s*(\w+)\s*ARGS:\s*",
-    r"TOL:\s*(\w+)\s*ARGS:\s*",
-    r"使用工具:\s*(\w+)\s*参数:\s*",
-    r"USE TOOL:\s*(\w+)\s*WITH ARGS:\s*",
-    r"工具名称:\s*(\w+)\s*工具参数:\s*",
-    r"Tool:\s*(\w+)\s*Args:\s*",
-    r"Tool:\s*(\w+)\s*Arguments:\s*",
-]
+# Supported tool call headers as (marker, arguments label), in match priority order
+TOOL_CALL_FORMATS = (
+    ("TOOL:", "ARGS:"),
+    ("TOL:", "ARGS:"),
+    ("使用工具:", "参数:"),
+    ("USE TOOL:", "WITH ARGS:"),
+    ("工具名称:", "工具参数:"),
+    ("Tool:", "Args:"),
+    ("Tool:", "Arguments:"),
+)
+DEFAULT_TOOL_MARKERS = tuple(dict.fromkeys(marker for marker, _ in TOOL_CALL_FORMATS))
+
+
+@dataclass(frozen = True)
+class ToolCallMatcher:
+    """
+    Compiled tool call header patterns for one set of enabled markers.
+    """
+
+    formats: Tuple[Tuple[str, str], ...]
+    name_patterns: Tuple[Pattern[str], ...]
+    marker_pattern: Pattern[str]
+
 
+def build_tool_call_matcher(markers: Sequence[str] = DEFAULT_TOOL_MARKERS) -> ToolCallMatcher:
+    """
+    Compile the tool call matcher for the enabled header markers only.
+
+    Args:
+        markers: Tool call markers to recognize, e.g. `("TOOL:",)`.
 
-def extract_string_value(text: str, quote_char: str) -> Optional[str]:
+    Returns:
+        Matcher holding the header patterns and the marker prefilter.
+    """
+    unknown_markers = [marker for marker in markers if marker not in DEFAULT_TOOL_MARKERS]
+    if unknown_markers or not markers:
+        raise ValueError(f"Unsupported tool markers: {unknown_markers or list(markers)}")
+
+    enabled_formats = tuple((marker, label) for marker, label in TOOL_CALL_FORMATS if marker in markers)
+    name_patterns = tuple(
+        re.compile(re.escape(marker) + r"\s*(\w+)\s*" + re.escape(label) + r"\s*", re.DOTALL)
+        for marker, label in enabled_formats
+    )
+
+    # Content without any enabled marker cannot contain a tool call; a
+    # marker that contains another one ("USE TOOL:") is already covered
+    enabled_markers = list(dict.fromkeys(marker for marker, _ in enabled_formats))
+    prefilter_markers = [
+        marker for marker in enabled_markers
+        if not any(other != marker and other in marker for other in enabled_markers)
+    ]
+    marker_pattern = re.compile("|".join(map(re.escape, prefilter_markers)))
+
+    return ToolCallMatcher(formats = enabled_formats, name_patterns = name_patterns, marker_pattern = marker_pattern)
+
+
+DEFAULT_TOOL_CALL_MATCHER = build_tool_call_matcher()
+TOOL_NAME_PATTERNS = DEFAULT_TOOL_CALL_MATCHER.name_patterns
+TOOL_MARKER_PATTERN = DEFAULT_TOOL_CALL_MATCHER.marker_pattern
+
+# Write-tool argument locators used by `extract_write_args`; the fused
+# pattern covers the usual path-then-content order in a single scan
+WRITE_ARGS_PATTERN = re.compile(
+    r'["\']path["\']\s*:\s*["\']([^"\']+)["\']\s*,\s*["\']content["\']\s*:\s*(["\'])'
+)
+WRITE_PATH_PATTERN = re.compile(r'["\']path["\']\s*:\s*["\']([^"\']+)["\']')
+WRITE_CONTENT_PATTERN = re.compile(r'["\']content["\']\s*:\s*["\']')
+
+# Body of a quoted string up to its closing quote, keyed by quote character
+STRING_BODY_PATTERNS = {
+    '"': re.compile(r'([^"\\]*(?:\\.[^"\\]*)*)"', re.DOTALL),
+    "'": re.compile(r"([^'\\]*(?:\\.[^'\\]*)*)'", re.DOTALL),
+}
+STRING_ESCAPE_PATTERN = re.compile(r"\\(.)", re.DOTALL)
+STRING_ESCAPES = {"\\": "\\", "n": "\n", "t": "\t"}
+
+# Characters that affect brace matching in `extract_balanced_json`
+JSON_STRUCTURAL_CHAR_PATTERN = re.compile(r"[{}\"'\\]")
+
+# Shared decoder for scanning the first JSON object out of free-form text
+JSON_DECODER = json.JSONDecoder()
+
+# Characters that affect object nesting in strict JSON, for streamed scans
+JSON_STRICT_STRUCTURAL_CHAR_PATTERN = re.compile(r'[{}"\\]')
+
+# Text after a tool call marker within which its header must complete
+TOOL_HEADER_LOOKAHEAD = 256
+
+
+def extract_string_value(text: str, quote_char: str, start: int = 0) -> Optional[str]:
     """
     Extract a string value while preserving escaped characters.
 
+    The closing quote is located by the regex engine; escapes are only
+    rewritten when the value actually contains a backslash.
+
     Args:
-        text: Remaining text that starts after the opening quote.
+        text: Text containing the string value.
         quote_char: Quote character used to close the string.
+        start: Index just after the opening quote.
 
     Returns:
         Extracted string value when successful, otherwise `None`.
     """
-    result = []
-    index = 0
-    text_length = len(text)
+    match = STRING_BODY_PATTERNS[quote_char].match(text, start)
+    if not match:
+        return None
 
-    while index < text_length:
-        char = text[index]
+    value = match.group(1)
+    if "\\" not in value:
+        return value
 
-        if char == "\\":
-            if index + 1 < text_length:
-                next_char = text[index + 1]
-                if next_char == quote_char:
-                    result.append(quote_char)
-                    index += 2
-                elif next_char == "\\":
-                    result.append("\\")
-                    index += 2
-                elif next_char == "n":
-                    result.append("\n")
-                    index += 2
-                elif next_char == "t":
-                    result.append("\t")
-                    index += 2
-                else:
-                    result.append(char)
-                    result.append(next_char)
-                    index += 2
-            else:
-                result.append(char)
-                index += 1
-        elif char == quote_char:
-            return "".join(result)
-        else:
-            result.append(char)
-            index += 1
+    def unescape(escape: "re.Match[str]") -> str:
+        char = escape.group(1)
+        if char == quote_char:
+            return char
+        return STRING_ESCAPES.get(char, escape.group())
 
-    return None
+    return STRING_ESCAPE_PATTERN.sub(unescape, value)
 
 
 def extract_write_args(text: str) -> Optional[Dict[str, Any]]:
@@ -83,18 +141,26 @@ def extract_write_args(text: str) -> Optional[Dict[str, Any]]:
     Returns:
         Parsed write tool arguments when successful, otherwise `None`.
     """
-    path_match = re.search(r'["\']path["\']\s*:\s*["\']([^"\']+)["\']', text)
-    if not path_match:
-        return None
-
-    path = path_match.group(1)
-    content_match = re.search(r'["\']content["\']\s*:\s*["\']', text)
-    if not content_match:
-        return None
-
-    content_start = content_match.end()
-    quote_char = text[content_start - 1]
-    content = extract_string_value(text[content_start:], quote_char)
+    args_match = WRITE_ARGS_PATTERN.search(text)
+    if args_match:
+        path = args_match.group(1)
+        content_start = args_match.end()
+        quote_char = args_match.group(2)
+    else:
+        # Content before path or other fields in between
+        path_match = WRITE_PATH_PATTERN.search(text)
+        if not path_match:
+            return None
+
+        path = path_match.group(1)
+        content_match = WRITE_CONTENT_PATTERN.search(text)
+        if not content_match:
+            return None
+
+        content_start = content_match.end()
+        quote_char = text[content_start - 1]
+
+    content = extract_string_value(text, quote_char, content_start)
 
     if content is None:
         return None
@@ -106,6 +172,9 @@ def extract_balanced_json(text: str) -> Optional[str]:
     """
     Extract the last complete JSON object from mixed free-form text.
 
+    Only quote, brace and backslash characters are visited in Python; the
+    regex engine skips everything in between.
+
     Args:
         text: Text that may contain JSON content.
 
@@ -113,95 +182,261 @@ def extract_balanced_json(text: str) -> Optional[str]:
         Extracted JSON string when successful, otherwise `None`.
     """
     start = text.find("{")
-    if start == -1:
+    last_close = text.rfind("}")
+    if start == -1 or last_close < start:
+        if start != -1:
+            logger.error("Failed to extract balanced JSON from text: %.100s...", text)
         return None
 
     brace_count = 0
     in_string = False
-    escape_next = False
+    escaped_index = -1
     end = -1
-    index = start
-
-    while index < len(text):
-        char = text[index]
 
-        if escape_next:
-            escape_next = False
-            index += 1
+    for match in JSON_STRUCTURAL_CHAR_PATTERN.finditer(text, start, last_close + 1):
+        index = match.start()
+        if index == escaped_index:
             continue
 
+        char = match.group()
         if char == "\\":
-            escape_next = True
-            index += 1
-            continue
-
-        if char in ('"', "'"):
+            escaped_index = index + 1
+        elif char in ('"', "'"):
             in_string = not in_string
-            index += 1
-            continue
-
-        if not in_string:
+        elif not in_string:
             if char == "{":
                 brace_count += 1
-            elif char == "}":
+            else:
                 brace_count -= 1
                 if brace_count == 0:
                     end = index
-                    temp_index = index + 1
-                    temp_brace_count = 0
-                    temp_in_string = False
-                    temp_escape_next = False
-
-                    while temp_index < len(text):
-                        temp_char = text[temp_index]
-
-                        if temp_escape_next:
-                            temp_escape_next = False
-                            temp_index += 1
-                            continue
-
-                        if temp_char == "\\":
-                            temp_escape_next = True
-                            temp_index += 1
-                            continue
-
-                        if temp_char in ('"', "'"):
-                            temp_in_string = not temp_in_string
-                            temp_index += 1
-                            continue
-
-                        if not temp_in_string:
-                            if temp_char == "{":
-                                temp_brace_count += 1
-                            elif temp_char == "}":
-                                temp_brace_count -= 1
-                                if temp_brace_count == 0:
-                                    end = temp_index
-                        temp_index += 1
-                    break
-        index += 1
 
     if end != -1:
         return text[start:end + 1]
 
-    logger.error("Failed to extract balanced JSON from text: %s...", text[:100])
+    logger.error("Failed to extract balanced JSON from text: %.100s...", text)
     return None
 
 
-def parse_tool_call(content: str) -> Optional[Dict[str, Any]]:
+def decode_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode the JSON object that starts at the first brace in free-form text.
+
+    The C scanner behind `json.JSONDecoder.raw_decode` stops at the end of
+    the object, so trailing text needs no separate brace matching.
+
+    Args:
+        text: Text that may contain JSON content.
+
+    Returns:
+        Decoded object when the text holds strict JSON at its first brace, otherwise `None`.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    try:
+        value, _ = JSON_DECODER.raw_decode(text, start)
+    except json.JSONDecodeError as exc:
+        logger.debug("Strict JSON parse failed: %s", exc)
+        return None
+
+    return value
+
+
+def render_tool_call(
+    name: str,
+    arguments: str,
+    matcher: ToolCallMatcher = DEFAULT_TOOL_CALL_MATCHER
+) -> str:
+    """
+    Render a structured tool call in the first enabled text format.
+
+    Args:
+        name: Tool name.
+        arguments: JSON-encoded tool arguments.
+        matcher: Tool call matcher for the enabled markers.
+
+    Returns:
+        Tool call text that `parse_tool_call` reads back with one JSON decode.
+    """
+    marker, label = matcher.formats[0]
+    return f"{marker} {name}\n{label} {arguments.strip() or '{}'}"
+
+
+def has_complete_tool_call(content: str, matcher: ToolCallMatcher = DEFAULT_TOOL_CALL_MATCHER) -> bool:
+    """
+    Check whether partial model output already holds a complete tool call.
+
+    Only strict JSON arguments are recognized, so the check stays quiet on
+    the half-written buffers seen while a response is still streaming.
+
+    Args:
+        content: LLM response content received so far.
+        matcher: Tool call matcher for the enabled markers.
+
+    Returns:
+        Whether a tool marker is followed by a complete JSON object.
+    """
+    if not matcher.marker_pattern.search(content):
+        return False
+
+    for pattern in matcher.name_patterns:
+        match = pattern.search(content)
+        if match and decode_json_object(content[match.end():]) is not None:
+            return True
+
+    return False
+
+
+class ToolCallStreamScanner:
+    """
+    Incremental form of `has_complete_tool_call` for streamed model output.
+
+    Every fragment is scanned once: markers are searched in the new text
+    only, the header is matched within a bounded window after the marker,
+    and argument braces are counted as they arrive, so the JSON decode runs
+    once the first object closes instead of on every fragment.
+    """
+
+    def __init__(self, matcher: ToolCallMatcher = DEFAULT_TOOL_CALL_MATCHER) -> None:
+        """
+        Initialize an empty scanner.
+
+        Args:
+            matcher: Tool call matcher for the enabled markers.
+
+        Returns:
+            None.
+        """
+        self.matcher = matcher
+        self._overlap = max(len(marker) for marker, _ in matcher.formats) - 1
+        self._window = ""
+        self._marker_at = -1
+        self._in_args = False
+        self._args_parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape_next = False
+        self._finished = False
+
+    def feed(self, text: str) -> bool:
+        """
+        Scan one more fragment of model output.
+
+        Args:
+            text: Newly received text.
+
+        Returns:
+            Whether the output so far holds a complete tool call.
+        """
+        if self._finished or not text:
+            return False
+
+        if not self._in_args:
+            args_text = self._find_header(self._window + text)
+            if args_text is None:
+                return False
+            self._in_args = True
+            text = args_text
+
+        return self._scan_args(text)
+
+    def _find_header(self, window: str) -> Optional[str]:
+        """
+        Look for a complete tool call header in the unresolved text window.
+
+        Args:
+            window: Unresolved text followed by the new fragment.
+
+        Returns:
+            Text after the header when one is complete, otherwise `None`.
+        """
+        matcher = self.matcher
+        while True:
+            if self._marker_at < 0:
+                marker_match = matcher.marker_pattern.search(window)
+                if not marker_match:
+                    # Keep enough text for a marker split across fragments
+                    self._window = window[-self._overlap:] if self._overlap else ""
+                    return None
+                start = max(0, marker_match.start() - self._overlap)
+                window = window[start:]
+                self._marker_at = marker_match.start() - start
+
+            for pattern in matcher.name_patterns:
+                match = pattern.search(window)
+                if match:
+                    self._window = ""
+                    return window[match.end():]
+
+            if len(window) - self._marker_at <= TOOL_HEADER_LOOKAHEAD:
+                self._window = window
+                return None
+
+            # This marker never grew into a header; resume after it
+            window = window[self._marker_at + 1:]
+            self._marker_at = -1
+
+    def _scan_args(self, text: str) -> bool:
+        """
+        Track argument object nesting and decode once the first object closes.
+
+        Args:
+            text: Newly received argument text.
+
+        Returns:
+            Whether the arguments form a complete strict JSON object.
+        """
+        self._args_parts.append(text)
+        escaped_index = 0 if self._escape_next else -1
+        self._escape_next = False
+
+        for match in JSON_STRICT_STRUCTURAL_CHAR_PATTERN.finditer(text):
+            index = match.start()
+            if index == escaped_index:
+                continue
+
+            char = match.group()
+            if char == "\\":
+                if self._in_string:
+                    escaped_index = index + 1
+                    self._escape_next = escaped_index == len(text)
+            elif char == '"':
+                if self._depth:
+                    self._in_string = not self._in_string
+            elif not self._in_string:
+                if char == "{":
+                    self._depth += 1
+                elif self._depth:
+                    self._depth -= 1
+                    if not self._depth:
+                        # The first object is decided either way; more text cannot change it
+                        self._finished = True
+                        return decode_json_object("".join(self._args_parts)) is not None
+
+        return False
+
+
+def parse_tool_call(content: str, matcher: ToolCallMatcher = DEFAULT_TOOL_CALL_MATCHER) -> Optional[Dict[str, Any]]:
     """
     Parse a tool call from model output content.
 
     Args:
         content: LLM response content.
+        matcher: Tool call matcher for the enabled markers.
 
     Returns:
         Tool call dictionary when a supported pattern is found, otherwise `None`.
     """
     logger.debug("Parsing tool call from content (length=%s)", len(content))
 
-    for pattern in TOOL_NAME_PATTERNS:
-        match = re.search(pattern, content, re.DOTALL)
+    if not matcher.marker_pattern.search(content):
+        logger.debug("No tool call marker found")
+        return None
+
+    for pattern in matcher.name_patterns:
+        match = pattern.search(content)
         if not match:
             continue
 
@@ -214,19 +449,18 @@ def parse_tool_call(content: str) -> Optional[Dict[str, Any]]:
                 logger.info("Parsed write tool call with path: %s", args.get("path", "unknown"))
                 return {"name": tool_name, "arguments": args}
 
-        args_str = extract_balanced_json(remaining)
-        if not args_str:
-            continue
-
-        logger.debug("Matched tool '%s', args length=%s", tool_name, len(args_str))
-
-        try:
+        args = decode_json_object(remaining)
+        if args is not None:
+            logger.debug("Matched tool '%s' with strict JSON args", tool_name)
             return {
                 "name": tool_name,
-                "arguments": json.loads(args_str),
+                "arguments": args,
             }
-        except json.JSONDecodeError as exc:
-            logger.debug("Strict JSON parse failed: %s", exc)
+
+        # Lenient fallback for payloads that are not strict JSON
+        args_str = extract_balanced_json(remaining)
+        if not args_str:
+            continue
 
         args = parse_json(args_str)
         if args:
@@ -236,7 +470,7 @@ def parse_tool_call(content: str) -> Optional[Dict[str, Any]]:
                 "arguments": args,
             }
 
-        logger.warning("Failed to parse tool arguments for %s: %s...", tool_name, args_str[:100])
+        logger.warning("Failed to parse tool arguments for %s: %.100s...", tool_name, args_str)
 
     logger.debug("No tool call pattern matched")
     return None
@@ -1,11 +1,8 @@
 import os
-import sys
 import logging
 
 from typing import Any, Callable, Dict, List, Optional, Sequence
 
-sys.path.append(os.getcwd())
-
 from quarkagent.agent.constants import DEFAULT_SYSTEM_PROMPT, LOGGER_NAME
 
 logger = logging.getLogger(LOGGER_NAME)
@@ -62,6 +59,33 @@ def resolve_prompt_file(system_prompt_file: Optional[str]) -> str:
     return os.path.join(project_root, "prompts", "system_prompt.txt")
 
 
+def build_tool_prompt(tool: Dict[str, Any]) -> str:
+    """
+    Build the rendered prompt entry for one tool.
+
+    Args:
+        tool: Runtime tool definition.
+
+    Returns:
+        Tool prompt string.
+    """
+    params = tool.get("parameters", {})
+    required_names = params.get("required", [])
+    param_descriptions = [
+        f"{name}: {schema.get('description', '')} {'(required)' if name in required_names else ''}"
+        for name, schema in params.get("properties", {}).items()
+    ]
+
+    return "\n".join(
+        [
+            f"Tool: {tool['name']}",
+            f"Description: {tool['description']}",
+            "Parameters:",
+            "\n".join(param_descriptions),
+        ]
+    )
+
+
 def build_tools_prompt(tools: List[Dict[str, Any]]) -> str:
     """
     Build the rendered tools prompt block for the current agent tools.
@@ -72,29 +96,7 @@ def build_tools_prompt(tools: List[Dict[str, Any]]) -> str:
     Returns:
         Tools prompt string.
     """
-    tool_descriptions = []
-    for tool in tools:
-        params = tool.get("parameters", {})
-        param_descriptions = []
-
-        for name, schema in params.get("properties", {}).items():
-            required = name in params.get("required", [])
-            param_descriptions.append(
-                f"{name}: {schema.get('description', '')} {'(required)' if required else ''}"
-            )
-
-        tool_descriptions.append(
-            "\n".join(
-                [
-                    f"Tool: {tool['name']}",
-                    f"Description: {tool['description']}",
-                    "Parameters:",
-                    "\n".join(param_descriptions),
-                ]
-            )
-        )
-
-    return "\n".join(tool_descriptions)
+    return "\n".join(build_tool_prompt(tool) for tool in tools)
 
 
 def build_system_skills_prompt(system_skills: Sequence[Any]) -> str:
@@ -156,7 +158,8 @@ def build_runtime_system_prompt(
     system_skills: Sequence[Any],
     skill_manager: Optional[Any],
     memory_context_provider: Optional[Callable[[Optional[str]], str]],
-    query: str
+    query: str,
+    tools_prompt: Optional[str] = None
 ) -> str:
     """
     Build the final runtime system prompt for one user turn.
@@ -168,12 +171,14 @@ def build_runtime_system_prompt(
         skill_manager: Optional skill manager used to render custom skill hints.
         memory_context_provider: Optional memory provider for runtime context.
         query: Current user query.
+        tools_prompt: Pre-rendered tools block; built from `tools` when omitted.
 
     Returns:
         Fully rendered runtime system prompt.
     """
     runtime_prompt = base_system_prompt
-    tools_prompt = build_tools_prompt(tools) if tools else "No tools available."
+    if tools_prompt is None:
+        tools_prompt = build_tools_prompt(tools) if tools else "No tools available."
     system_skills_prompt = build_system_skills_prompt(system_skills)
     custom_skill_hint = ""
 
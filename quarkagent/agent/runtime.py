@@ -1,17 +1,70 @@
-import os
-import sys
+import time
+import random
+import asyncio
+import keyword
 import logging
+import functools
+import contextvars
 
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from openai import APIConnectionError, InternalServerError, RateLimitError
 
-sys.path.append(os.getcwd())
-
-from quarkagent.agent.constants import LOGGER_NAME
+from quarkagent.tools import to_tool_result
+from quarkagent.agent.constants import LLM_MAX_ATTEMPTS, LLM_RETRY_MAX_WAIT, LLM_RETRY_MIN_WAIT, LOGGER_NAME
+from quarkagent.agent.parsing import DEFAULT_TOOL_CALL_MATCHER, ToolCallMatcher, ToolCallStreamScanner, render_tool_call
 
 logger = logging.getLogger(LOGGER_NAME)
 
+# Transient failures worth retrying; timeouts are a kind of connection error.
+# Anything else (bad credentials, invalid requests) fails on the first attempt.
+RETRYABLE_LLM_ERRORS = (APIConnectionError, InternalServerError, RateLimitError)
+
+# Stop callback of the run executing in the current context. Concurrent runs
+# on one agent each see their own callback, and tools such as the subagent
+# read it to stop together with the run that called them.
+ACTIVE_STOP_CALLBACK: "contextvars.ContextVar[Optional[Callable[[], bool]]]" = contextvars.ContextVar(
+    "quarkagent_active_stop_callback",
+    default = None,
+)
+
+
+def build_tool_caller(tool: Dict[str, Any]) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Generate a call function specialized to one tool's argument schema.
+
+    The generated function fetches each required argument by name, so a
+    missing one is reported against the schema before the executor runs,
+    and calls that pass exactly the required arguments bind them as
+    keywords without re-packing the argument dict.
+
+    Args:
+        tool: Runtime tool definition containing parameters and executor.
+
+    Returns:
+        Function taking the parsed argument dict and returning the tool result.
+    """
+    executor = tool["executor"]
+    required_names = list(tool.get("parameters", {}).get("required", []))
+
+    # Names that cannot be spelled as keywords keep the generic call
+    if not all(name.isidentifier() and not keyword.iskeyword(name) for name in required_names):
+        return lambda args: executor(**args)
+
+    lines = ["def call_tool(args):"]
+    if required_names:
+        lines.append("    try:")
+        lines.extend(f"        {name} = args[{name!r}]" for name in required_names)
+        lines.append("    except KeyError as exc:")
+        lines.append("        raise TypeError(f'missing required argument: {exc}') from None")
+    lines.append(f"    if len(args) == {len(required_names)}:")
+    lines.append("        return executor(" + ", ".join(f"{name} = {name}" for name in required_names) + ")")
+    lines.append("    return executor(**args)")
+
+    namespace: Dict[str, Any] = {}
+    exec("\n".join(lines), {"executor": executor}, namespace)
+    return namespace["call_tool"]
+
 
 def execute_tool(
     agent: Any,
@@ -34,15 +87,10 @@ def execute_tool(
 
     logger.info("Executing tool: %s with arguments: %s", tool_name, tool_args)
 
-    tool_definition = None
-    for candidate in agent.tools:
-        if candidate["name"] == tool_name:
-            tool_definition = candidate
-            break
-
+    tool_definition = agent.get_tool_definition(tool_name)
     if tool_definition:
         try:
-            result = tool_definition["executor"](**tool_args)
+            result = agent._get_tool_caller(tool_definition)(tool_args)
             logger.info("Tool %s executed successfully", tool_name)
         except Exception as exc:
             error_message = f"Error executing tool {tool_name}: {str(exc)}"
@@ -54,17 +102,221 @@ def execute_tool(
         result = execute_registered_tool(tool_name, **tool_args)
 
     if tool_callback:
+        tool_result = to_tool_result(result)
         tool_callback("status", tool_name, {"arguments": tool_args})
-        tool_callback("end", tool_name, {"result": result})
+        tool_callback(
+            "end",
+            tool_name,
+            {
+                "result": result,
+                "status": "success" if tool_result.error is None else "error",
+                "error": tool_result.error,
+            },
+        )
 
     return result
 
 
-@retry(stop = stop_after_attempt(3), wait = wait_random_exponential(min = 1, max = 60))
+def llm_retry_delay(attempt: int) -> float:
+    """
+    Pick a jittered exponential backoff delay before retrying an LLM call.
+
+    Args:
+        attempt: Zero-based index of the attempt that just failed.
+
+    Returns:
+        Delay in seconds.
+    """
+    return random.uniform(LLM_RETRY_MIN_WAIT, min(LLM_RETRY_MAX_WAIT, 2 ** (attempt + 1)))
+
+
+def build_llm_request(agent: Any, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Build the chat completion request arguments for the current agent.
+
+    Args:
+        agent: Agent instance with model and sampling configuration.
+        messages: Runtime conversation messages.
+
+    Returns:
+        Keyword arguments for `chat.completions.create`.
+    """
+    request = {
+        "model": agent.model,
+        "messages": messages,
+        "temperature": agent.temperature,
+        "top_p": agent.top_p,
+        "stream": agent.stream_responses,
+    }
+    if agent.structured_tools and agent.tools:
+        request["tools"] = agent._build_llm_tools()
+        request["tool_choice"] = "auto"
+    return request
+
+
+def render_llm_message(
+    content: Optional[str],
+    tool_call: Optional[Tuple[str, str]],
+    matcher: ToolCallMatcher = DEFAULT_TOOL_CALL_MATCHER
+) -> str:
+    """
+    Merge a response's text and its first structured tool call into one message.
+
+    The tool call is rendered in the text format, so the run loop and the
+    conversation history handle native and text tool calls the same way.
+
+    Args:
+        content: Response text, if any.
+        tool_call: Name and JSON-encoded arguments of the first structured tool call, if any.
+        matcher: Tool call matcher for the enabled markers.
+
+    Returns:
+        LLM response content string.
+    """
+    content = content or ""
+    if tool_call is None:
+        return content
+
+    tool_call_text = render_tool_call(tool_call[0], tool_call[1], matcher)
+    return f"{content.rstrip()}\n{tool_call_text}" if content.strip() else tool_call_text
+
+
+def read_llm_message(message: Any, matcher: ToolCallMatcher = DEFAULT_TOOL_CALL_MATCHER) -> str:
+    """
+    Read the content of a complete (non-streamed) response message.
+
+    Args:
+        message: Chat completion message.
+        matcher: Tool call matcher for the enabled markers.
+
+    Returns:
+        LLM response content string.
+    """
+    tool_call = None
+    if getattr(message, "tool_calls", None):
+        function = message.tool_calls[0].function
+        tool_call = (function.name, function.arguments or "")
+    return render_llm_message(message.content, tool_call, matcher)
+
+
+def append_stream_chunk(
+    parts: List[str],
+    tool_call_parts: Dict[int, Dict[str, List[str]]],
+    chunk: Any,
+    scanner: ToolCallStreamScanner
+) -> bool:
+    """
+    Append the text of one streamed completion chunk to the response buffer.
+
+    Args:
+        parts: Response text fragments received so far.
+        tool_call_parts: Structured tool call name and argument fragments by call index.
+        chunk: Streamed chat completion chunk.
+        scanner: Incremental tool call scanner for this response.
+
+    Returns:
+        Whether the buffer now holds a complete tool call, so the rest of the generation can be dropped.
+    """
+    if not chunk.choices:
+        return False
+
+    delta = chunk.choices[0].delta
+    for tool_call in getattr(delta, "tool_calls", None) or ():
+        fragments = tool_call_parts.setdefault(tool_call.index, {"name": [], "arguments": []})
+        if tool_call.function is not None:
+            if tool_call.function.name:
+                fragments["name"].append(tool_call.function.name)
+            if tool_call.function.arguments:
+                fragments["arguments"].append(tool_call.function.arguments)
+
+    text = delta.content
+    if not text:
+        return False
+
+    parts.append(text)
+    return scanner.feed(text)
+
+
+def finish_llm_stream(
+    parts: List[str],
+    tool_call_parts: Dict[int, Dict[str, List[str]]],
+    matcher: ToolCallMatcher
+) -> str:
+    """
+    Join the buffered stream fragments into the final response content.
+
+    Args:
+        parts: Response text fragments.
+        tool_call_parts: Structured tool call name and argument fragments by call index.
+        matcher: Tool call matcher for the enabled markers.
+
+    Returns:
+        LLM response content string.
+    """
+    tool_call = None
+    if tool_call_parts:
+        fragments = tool_call_parts[min(tool_call_parts)]
+        tool_call = ("".join(fragments["name"]), "".join(fragments["arguments"]))
+    return render_llm_message("".join(parts), tool_call, matcher)
+
+
+def read_llm_stream(stream: Any, matcher: ToolCallMatcher = DEFAULT_TOOL_CALL_MATCHER) -> str:
+    """
+    Collect a streamed LLM response, stopping early at a complete tool call.
+
+    Args:
+        stream: Streamed chat completion response.
+        matcher: Tool call matcher for the enabled markers.
+
+    Returns:
+        LLM response content string.
+    """
+    parts: List[str] = []
+    tool_call_parts: Dict[int, Dict[str, List[str]]] = {}
+    scanner = ToolCallStreamScanner(matcher)
+    try:
+        for chunk in stream:
+            if append_stream_chunk(parts, tool_call_parts, chunk, scanner):
+                logger.debug("Complete tool call received, closing stream early")
+                break
+    finally:
+        stream.close()
+    return finish_llm_stream(parts, tool_call_parts, matcher)
+
+
+async def aread_llm_stream(stream: Any, matcher: ToolCallMatcher = DEFAULT_TOOL_CALL_MATCHER) -> str:
+    """
+    Collect an async streamed LLM response, stopping early at a complete tool call.
+
+    Args:
+        stream: Async streamed chat completion response.
+        matcher: Tool call matcher for the enabled markers.
+
+    Returns:
+        LLM response content string.
+    """
+    parts: List[str] = []
+    tool_call_parts: Dict[int, Dict[str, List[str]]] = {}
+    scanner = ToolCallStreamScanner(matcher)
+    try:
+        async for chunk in stream:
+            if append_stream_chunk(parts, tool_call_parts, chunk, scanner):
+                logger.debug("Complete tool call received, closing stream early")
+                break
+    finally:
+        await stream.close()
+    return finish_llm_stream(parts, tool_call_parts, matcher)
+
+
 def call_llm(agent: Any, messages: List[Dict[str, str]]) -> str:
     """
     Call the configured LLM client for the current agent.
 
+    Streamed responses are cut off as soon as a complete tool call arrives,
+    and structured tool calls come back rendered in the text format.
+    Transient API errors are retried with backoff; other errors propagate
+    immediately.
+
     Args:
         agent: Agent instance with model and client configuration.
         messages: Runtime conversation messages.
@@ -74,19 +326,64 @@ def call_llm(agent: Any, messages: List[Dict[str, str]]) -> str:
     """
     logger.debug("Calling LLM with %s messages", len(messages))
 
-    try:
-        response = agent.client.chat.completions.create(
-            model = agent.model,
-            messages = messages,
-            temperature = agent.temperature,
-            top_p = agent.top_p,
-        )
-        content = response.choices[0].message.content or ""
-        logger.debug("LLM response received: %s...", content[:100])
-        return content
-    except Exception as exc:
-        logger.error("LLM call failed: %s", exc)
-        raise
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        try:
+            response = agent.client.chat.completions.create(**build_llm_request(agent, messages))
+            if agent.stream_responses:
+                content = read_llm_stream(response, agent.tool_call_matcher)
+            else:
+                content = read_llm_message(response.choices[0].message, agent.tool_call_matcher)
+            logger.debug("LLM response received: %.100s...", content)
+            return content
+        except RETRYABLE_LLM_ERRORS as exc:
+            if attempt == LLM_MAX_ATTEMPTS - 1:
+                logger.error("LLM call failed: %s", exc)
+                raise
+            delay = llm_retry_delay(attempt)
+            logger.warning("LLM call failed (attempt %s/%s), retrying in %.1fs: %s", attempt + 1, LLM_MAX_ATTEMPTS, delay, exc)
+            time.sleep(delay)
+        except Exception as exc:
+            logger.error("LLM call failed: %s", exc)
+            raise
+
+
+async def acall_llm(agent: Any, messages: List[Dict[str, str]]) -> str:
+    """
+    Call the configured async LLM client for the current agent.
+
+    Streamed responses are cut off as soon as a complete tool call arrives,
+    and structured tool calls come back rendered in the text format.
+    Transient API errors are retried with backoff; other errors propagate
+    immediately.
+
+    Args:
+        agent: Agent instance with model and async client configuration.
+        messages: Runtime conversation messages.
+
+    Returns:
+        LLM response content string.
+    """
+    logger.debug("Calling async LLM with %s messages", len(messages))
+
+    for attempt in range(LLM_MAX_ATTEMPTS):
+        try:
+            response = await agent._get_async_client().chat.completions.create(**build_llm_request(agent, messages))
+            if agent.stream_responses:
+                content = await aread_llm_stream(response, agent.tool_call_matcher)
+            else:
+                content = read_llm_message(response.choices[0].message, agent.tool_call_matcher)
+            logger.debug("LLM response received: %.100s...", content)
+            return content
+        except RETRYABLE_LLM_ERRORS as exc:
+            if attempt == LLM_MAX_ATTEMPTS - 1:
+                logger.error("LLM call failed: %s", exc)
+                raise
+            delay = llm_retry_delay(attempt)
+            logger.warning("LLM call failed (attempt %s/%s), retrying in %.1fs: %s", attempt + 1, LLM_MAX_ATTEMPTS, delay, exc)
+            await asyncio.sleep(delay)
+        except Exception as exc:
+            logger.error("LLM call failed: %s", exc)
+            raise
 
 
 def is_stop_requested(stop_callback: Optional[Callable[[], bool]]) -> bool:
@@ -128,6 +425,28 @@ def build_stop_response(
     return stop_message
 
 
+def trim_history(messages: List[Dict[str, str]], history_window: Optional[int]) -> None:
+    """
+    Drop the oldest tool turns so the prompt stays a bounded size.
+
+    The system prompt and the original query are always kept.
+
+    Args:
+        messages: Runtime conversation messages, trimmed in place.
+        history_window: Number of recent assistant/tool turns to keep, or `None` to keep all.
+
+    Returns:
+        None.
+    """
+    if history_window is None:
+        return
+
+    excess = len(messages) - 2 - 2 * history_window
+    if excess > 0:
+        logger.debug("Dropping %s old messages from the history window", excess)
+        del messages[2:2 + excess]
+
+
 def run_with_tools(
     agent: Any,
     query: str,
@@ -156,7 +475,7 @@ def run_with_tools(
         {"role": "system", "content": agent._build_runtime_system_prompt(query)},
         {"role": "user", "content": query},
     ]
-    agent._active_stop_callback = stop_callback
+    stop_token = ACTIVE_STOP_CALLBACK.set(stop_callback)
 
     try:
         for iteration in range(max_iterations):
@@ -205,12 +524,111 @@ def run_with_tools(
 
             result = agent._execute_tool(tool_call, tool_callback)
             tool_response = f"Tool {tool_name} returned: {result}"
-            logger.debug("Tool response: %s...", tool_response[:100])
+            logger.debug("Tool response: %.100s...", tool_response)
+
+            messages.append({"role": "assistant", "content": content})
+            messages.append({"role": "user", "content": tool_response})
+            trim_history(messages, agent.history_window)
+    finally:
+        ACTIVE_STOP_CALLBACK.reset(stop_token)
+
+    error_message = "Reached maximum iterations without completing the task"
+    logger.error(error_message)
+    return error_message
+
+
+async def arun_with_tools(
+    agent: Any,
+    query: str,
+    max_iterations: int = 10,
+    tool_callback: Optional[Callable[[str, str, Dict[str, Any]], None]] = None,
+    status_callback: Optional[Callable[[str], None]] = None,
+    stop_callback: Optional[Callable[[], bool]] = None
+) -> str:
+    """
+    Execute one agent run with formatted tool-calling support on the event loop.
+
+    LLM calls are awaited on the async client; tools and reflection are
+    blocking, so they run in the loop's default executor.
+
+    Args:
+        agent: Agent instance coordinating the run.
+        query: Current user query text.
+        max_iterations: Maximum number of tool-execution iterations.
+        tool_callback: Optional callback for tool execution events.
+        status_callback: Optional callback for status text updates.
+        stop_callback: Optional callback that stops the run at safe boundaries.
+
+    Returns:
+        Final response text.
+    """
+    logger.info("Starting arun_with_tools with query: %s", query)
+
+    loop = asyncio.get_running_loop()
+    messages = [
+        {"role": "system", "content": agent._build_runtime_system_prompt(query)},
+        {"role": "user", "content": query},
+    ]
+    stop_token = ACTIVE_STOP_CALLBACK.set(stop_callback)
+
+    try:
+        for iteration in range(max_iterations):
+            logger.debug("Iteration %s/%s", iteration + 1, max_iterations)
+
+            if agent._is_stop_requested(stop_callback):
+                return agent._build_stop_response(status_callback)
+
+            if status_callback:
+                status_callback(f"Thinking... (Iteration {iteration + 1})")
+
+            try:
+                content = await agent._acall_llm(messages)
+            except Exception as exc:
+                error_message = f"Failed to get LLM response: {str(exc)}"
+                logger.error(error_message)
+                return error_message
+
+            if agent._is_stop_requested(stop_callback):
+                return agent._build_stop_response(status_callback)
+
+            tool_call = agent._parse_tool_call(content)
+            if not tool_call:
+                logger.info("Run completed without tool calls")
+
+                if agent.use_reflector and agent.reflector:
+                    if agent._is_stop_requested(stop_callback):
+                        return agent._build_stop_response(status_callback)
+                    if status_callback:
+                        status_callback("Improving response...")
+                    content = await loop.run_in_executor(
+                        None, contextvars.copy_context().run, agent.reflector.enhance_response, query, content
+                    )
+
+                return content
+
+            tool_name = tool_call["name"]
+            logger.info("Tool call detected: %s", tool_name)
+
+            if agent._is_stop_requested(stop_callback):
+                return agent._build_stop_response(status_callback)
+
+            if status_callback:
+                status_callback(f"Executing {tool_name}...")
+
+            # Executor threads do not inherit context variables; copy them so
+            # tools still see this run's stop callback
+            result = await loop.run_in_executor(
+                None,
+                functools.partial(contextvars.copy_context().run, agent._execute_tool, tool_call, tool_callback),
+            )
+            tool_response = f"Tool {tool_name} returned: {result}"
+            logger.debug("Tool response: %.100s...", tool_response)
 
             messages.append({"role": "assistant", "content": content})
             messages.append({"role": "user", "content": tool_response})
+            trim_history(messages, agent.history_window)
     finally:
-        agent._active_stop_callback = None
+        ACTIVE_STOP_CALLBACK.reset(stop_token)
 
     error_message = "Reached maximum iterations without completing the task"
     logger.error(error_message)
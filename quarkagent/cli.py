@@ -2,13 +2,15 @@ from __future__ import annotations
 
 import os
 import sys
+import reprlib
 import logging
 import argparse
 import threading
 
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 from rich import box
 
@@ -20,10 +22,8 @@ from rich.prompt import Prompt
 from rich.console import Console
 from rich.markdown import Markdown
 
-
-sys.path.append(os.getcwd())
-
 from quarkagent.memory import Memory, MemorySummary, list_memory_summaries
+from quarkagent.memory.constants import MEMORY_SUMMARY_PROMPT
 from quarkagent.agent import QuarkAgent
 from quarkagent.config import load_config, save_config
 from quarkagent.subagent import build_subagent_tool
@@ -37,6 +37,17 @@ console = Console()
 # Global status for thinking indicator
 CURRENT_STATUS : Optional[Status] = None
 
+# Number of recent user/assistant turns replayed into each query
+HISTORY_TURN_LIMIT = 10
+
+# Tool output characters scanned when counting lines for a display label
+LINE_COUNT_SCAN_LIMIT = 4096
+
+# Bounded repr for container tool results; only a short prefix is ever shown
+DISPLAY_REPR = reprlib.Repr()
+DISPLAY_REPR.maxstring = 80
+DISPLAY_REPR.maxother = 80
+
 # Style configurations
 STYLES = {
     "primary": "cyan",
@@ -200,35 +211,46 @@ class EscapeStopMonitor:
             except termios.error:
                 return
 
-def _format_history(history: List[Dict[str, str]], limit_turns: int = 10) -> str:
+def _format_history(history: Deque[str]) -> Optional[str]:
     """
     Format the conversation history for display.
     
     Args:
-        history: List of conversation history entries
-        limit_turns: Number of recent turns to display
+        history: Bounded buffer of pre-formatted `role: content` lines
         
     Returns:
         Formatted string of the conversation history
     """
     if not history:
         return None
-    
-    # Format the recent history
-    recent_text = history[-(limit_turns * 2) :]
-    formatted_history = ["Conversation history (most recent last):"]
-    for entry in recent_text:
-        role = entry.get('role', '')
-        content = entry.get('content', '')
-        formatted_history.append(f"{role}: {content}")
 
-    return '\n'.join(formatted_history) + "\n\n"
+    return "Conversation history (most recent last):\n" + "\n".join(history) + "\n\n"
 
 def _truncate_str(s: str, limit: int = 60) -> str:
     """Truncate a string for display."""
-    if len(s) > limit:
-        return s[:limit] + "…"
-    return s
+    return s if len(s) <= limit else f"{s[:limit]}…"
+
+
+def _display_str(value: Any, limit: int = 60) -> str:
+    """Render any value as a truncated display string without stringifying large containers in full."""
+    if isinstance(value, str):
+        return _truncate_str(value, limit)
+    if isinstance(value, (dict, list, tuple, set)):
+        return _truncate_str(DISPLAY_REPR.repr(value), limit)
+    return _truncate_str(str(value), limit)
+
+
+def _count_lines(text: str, limit: int = LINE_COUNT_SCAN_LIMIT) -> Tuple[int, bool]:
+    """Count lines for a display label, scanning at most `limit` characters."""
+    if len(text) <= limit:
+        return text.count("\n") + 1, False
+    return text.count("\n", 0, limit) + 1, True
+
+
+def _format_line_count(text: str) -> str:
+    """Format a bounded line count such as `12 lines` or `96+ lines`."""
+    lines, capped = _count_lines(text)
+    return f"{lines}+ lines" if capped else f"{lines} lines"
 
 
 def _format_tool_args(name: str, args: Dict[str, Any]) -> str:
@@ -247,8 +269,7 @@ def _format_tool_args(name: str, args: Dict[str, Any]) -> str:
     def format_write(a):
         path = a.get("path", "")
         content = a.get("content", "")
-        lines = content.count("\n") + 1
-        return f"{path} ({lines} lines)"
+        return f"{path} ({_format_line_count(content)})"
 
     def format_edit(a):
         return a.get("path", "")
@@ -278,7 +299,7 @@ def _format_tool_args(name: str, args: Dict[str, Any]) -> str:
     # Generic formatting for unknown tools
     if args:
         first_key = next(iter(args))
-        return f"{first_key}={_truncate_str(str(args[first_key]), 50)}"
+        return f"{first_key}={_display_str(args[first_key], 50)}"
     return ""
 
 def _format_tool_result(name: str, result: Any) -> str:
@@ -293,20 +314,23 @@ def _format_tool_result(name: str, result: Any) -> str:
             code = result.get("exit_code", "0")
             if code == 0:
                 stdout = result.get("stdout", "")
-                lines = stdout.strip().split("\n") if stdout else []
-                if len(lines) <= 3:
-                    return "\n".join(lines) if lines else "✓"
-                return f"{len(lines)} lines"
+                if not stdout:
+                    return "✓"
+                stdout = stdout.strip()
+                lines, capped = _count_lines(stdout)
+                if lines <= 3 and not capped:
+                    return stdout
+                return _format_line_count(stdout)
             else:
                 return f"exit {code}"
         elif "error" in result:
-            return f"✗ {_truncate_str(str(result['error']), 50)}"
+            return f"✗ {_display_str(result['error'], 50)}"
     if isinstance(result, str):
         if len(result) > 100:
-            lines = result.count("\n") + 1
-            return f"{lines} lines" if lines > 3 else _truncate_str(result, 60)
+            lines, _ = _count_lines(result)
+            return _format_line_count(result) if lines > 3 else _truncate_str(result, 60)
         return _truncate_str(result, 60)
-    return _truncate_str(str(result), 60)
+    return _display_str(result, 60)
 
 def _status_callback(status_text: str) -> None:
     """
@@ -352,14 +376,15 @@ def _tool_callback(event: str, name: str, payload: Dict[str, Any]) -> None:
     elif event == "end":
         result = payload.get("result", payload.get("error"))
         result_str = _format_tool_result(name, result)
+        result_style = STYLES["error"] if payload.get("status") == "error" else STYLES["success"]
 
         # Enhanced result display
         if result_str and result_str != "✓" and len(result_str) < 100:
             result_panel = Panel(
                 Markdown(result_str),
                 title = "Result",
-                style = STYLES["success"],
-                border_style = STYLES["success"],
+                style = result_style,
+                border_style = result_style,
                 box = box.ROUNDED,
                 padding = (0, 1)
             )
@@ -465,7 +490,7 @@ def _build_memory_table(
         if summary.delegated_task:
             note = _truncate_str(summary.delegated_task, 48)
         elif summary.last_message:
-            note = _truncate_str(summary.last_message.replace("\n", " "), 48)
+            note = _truncate_str(summary.last_message, 48).replace("\n", " ")
 
         if current_path and str(summary.path) == current_path:
             note = (note + " | current").strip(" |")
@@ -514,6 +539,9 @@ def _render_memory_command(
     if command_name != "/memory":
         return False
 
+    # The listing reads sessions from disk, including the current one
+    current_memory.save()
+
     parts = normalized_command.split(maxsplit = 1)
     requested_scope = "all"
     if len(parts) == 2:
@@ -676,6 +704,28 @@ def _build_agent(args: argparse.Namespace) -> tuple[QuarkAgent, Memory]:
     )
     agent.agent_scope = memory.agent_scope
     agent.memory_path = str(memory.path)
+
+    if cfg.enable_memory_llm_summary:
+        def summarize_messages(messages: List[Dict[str, str]]) -> str:
+            """
+            Summarize conversation turns that overflow the memory window.
+
+            Args:
+                messages: Older conversation messages being compressed.
+
+            Returns:
+                One-paragraph summary from the LLM.
+            """
+            transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+            return agent._call_llm(
+                [
+                    {"role": "system", "content": MEMORY_SUMMARY_PROMPT},
+                    {"role": "user", "content": transcript},
+                ]
+            )
+
+        memory.summarizer = summarize_messages
+
     logger.info(
         f"Using request model: {model}, "
         f"model identifier: {cfg.llm.model_identifier}, "
@@ -684,10 +734,7 @@ def _build_agent(args: argparse.Namespace) -> tuple[QuarkAgent, Memory]:
     # Load some default tools if configured, else fall back to all currently registered.
     agent.tools = []
     tools = cfg.default_tools or agent.get_available_tools()
-    for tool_name in tools:
-        if tool_name == "skills":
-            continue
-        agent.load_builtin_tool(tool_name)
+    agent.load_builtin_tools(tool_name for tool_name in tools if tool_name != "skills")
 
     if cfg.enable_custom_skill_tool:
         agent.add_tool(skill_manager.build_skills_tool())
@@ -721,7 +768,16 @@ def _build_agent(args: argparse.Namespace) -> tuple[QuarkAgent, Memory]:
         )
     return agent, memory
 
-def args_parse():
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for the interactive CLI.
+
+    Args:
+        None.
+
+    Returns:
+        Configured argument parser.
+    """
     parser = argparse.ArgumentParser(prog = "quarkagent", description = "QuarkAgent interactive CLI")
     parser.add_argument("--config", help = "Path to config JSON for loading")
     parser.add_argument("--model", help = "Choose model to use")
@@ -733,8 +789,87 @@ def args_parse():
                         help = "Load memory from previous conversation N (1-8), where 1 is the most recent")
     parser.add_argument("--reflect", action = "store_true", help = "Enable reflector for response improvement")
     parser.add_argument("--no-reflect", action = "store_true", help = "Disable reflector for response improvement")
-    args = parser.parse_args()
-    return args
+    return parser
+
+def args_parse(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command-line arguments for the interactive CLI.
+
+    Args:
+        argv: Optional argument list; defaults to `sys.argv[1:]`.
+
+    Returns:
+        Parsed argument namespace.
+    """
+    return build_parser().parse_args(argv)
+
+def _quit_command(history: Deque[str], memory: Memory) -> bool:
+    """
+    Flush memory and leave the REPL.
+
+    Args:
+        history: Recent conversation lines.
+        memory: Current main-session memory instance.
+
+    Returns:
+        `True`, which ends the REPL loop.
+    """
+    memory.save()
+    return True
+
+def _clear_command(history: Deque[str], memory: Memory) -> bool:
+    """
+    Clear the conversation history replayed into queries.
+
+    Args:
+        history: Recent conversation lines.
+        memory: Current main-session memory instance.
+
+    Returns:
+        `False`, which keeps the REPL running.
+    """
+    history.clear()
+    console.print(f"[bold {STYLES['success']}]✅ Conversation history cleared[/bold {STYLES['success']}]")
+    console.print()
+    return False
+
+def _help_command(history: Deque[str], memory: Memory) -> bool:
+    """
+    Render the table of available REPL commands.
+
+    Args:
+        history: Recent conversation lines.
+        memory: Current main-session memory instance.
+
+    Returns:
+        `False`, which keeps the REPL running.
+    """
+    help_table = Table(title = "Available Commands", box = box.ROUNDED, style = STYLES["border"])
+    help_table.add_column("Command", style = STYLES["primary"], justify = "left")
+    help_table.add_column("Description", style = STYLES["text"], justify = "left")
+    help_table.add_row("/help", "Show this help message")
+    help_table.add_row("/skills", "Show the current system/custom skills and usage")
+    help_table.add_row("/skills <name>", "Show the full detail for one skill")
+    help_table.add_row("$skills <name>", "Alias for `/skills <name>`")
+    help_table.add_row("/memory", "Show saved main/subagent sessions")
+    help_table.add_row("/memory <scope>", "Show one scope: `main` or `subagent`")
+    help_table.add_row("/c", "Clear conversation history")
+    help_table.add_row("/q", "Quit the application")
+    help_table.add_row("Esc", "Stop the current response after the active step completes")
+    console.print(help_table)
+    console.print()
+    return False
+
+# Exact-match REPL commands; each handler returns whether the REPL should exit
+REPL_COMMANDS: Dict[str, Callable[[Deque[str], Memory], bool]] = {
+    "/q": _quit_command,
+    "/quit": _quit_command,
+    "/exit": _quit_command,
+    "/c": _clear_command,
+    "/clear": _clear_command,
+    "/help": _help_command,
+    "help": _help_command,
+}
 
 def main():
     args = args_parse()
@@ -764,7 +899,9 @@ def main():
     console.print(welcome_panel)
     console.print()
 
-    history: List[Dict[str, str]] = []
+    # Lines are formatted once when a turn is added; the buffer drops the
+    # oldest turn itself, so each query only joins the recent window
+    history: Deque[str] = deque(maxlen = HISTORY_TURN_LIMIT * 2)
 
     while True:
         try:
@@ -772,33 +909,16 @@ def main():
             user_text = user_text.strip()
         except (EOFError, KeyboardInterrupt):
             console.print()
+            memory.save()
             break
 
         if not user_text:
             continue
 
-        if user_text in ("/q", "/quit", "/exit"):
-            break
-        if user_text in ("/c", "/clear"):
-            history.clear()
-            console.print(f"[bold {STYLES['success']}]✅ Conversation history cleared[/bold {STYLES['success']}]")
-            console.print()
-            continue
-        if user_text in ("/help", "help"):
-            help_table = Table(title = "Available Commands", box = box.ROUNDED, style = STYLES["border"])
-            help_table.add_column("Command", style = STYLES["primary"], justify = "left")
-            help_table.add_column("Description", style = STYLES["text"], justify = "left")
-            help_table.add_row("/help", "Show this help message")
-            help_table.add_row("/skills", "Show the current system/custom skills and usage")
-            help_table.add_row("/skills <name>", "Show the full detail for one skill")
-            help_table.add_row("$skills <name>", "Alias for `/skills <name>`")
-            help_table.add_row("/memory", "Show saved main/subagent sessions")
-            help_table.add_row("/memory <scope>", "Show one scope: `main` or `subagent`")
-            help_table.add_row("/c", "Clear conversation history")
-            help_table.add_row("/q", "Quit the application")
-            help_table.add_row("Esc", "Stop the current response after the active step completes")
-            console.print(help_table)
-            console.print()
+        command = REPL_COMMANDS.get(user_text)
+        if command:
+            if command(history, memory):
+                break
             continue
 
         skill_command_result = build_skill_command_response(agent.skill_manager, user_text)
@@ -810,11 +930,10 @@ def main():
         if _render_memory_command(memory, user_text):
             continue
 
-        history.append({"role": "user", "content": user_text})
+        query = (_format_history(history) or "") + user_text
+        history.append(f"user: {user_text}")
         memory.push("user", user_text)
 
-        query = (_format_history(history[:-1]) or "") + user_text
-
         stop_monitor = EscapeStopMonitor()
         try:
             stop_monitor.start()
@@ -853,7 +972,7 @@ def main():
         finally:
             stop_monitor.stop()
 
-        history.append({"role": "assistant", "content": response})
+        history.append(f"assistant: {response}")
         memory.push("assistant", response)
 
         # Truncate overly long responses for display (keep full in history)
@@ -1,9 +1,11 @@
 import os
 import sys
+import copy
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 from dotenv import load_dotenv
 from dataclasses import dataclass, field
@@ -12,6 +14,56 @@ logger = logging.getLogger("QuarkAgent_Config")
 
 load_dotenv()
 
+# Environment variable prefixes that influence `load_config` results
+CONFIG_ENV_PREFIXES = (
+    "LLM_",
+    "OPENAI_",
+    "DEEPSEEK_",
+    "ANTHROPIC_",
+    "AZURE_",
+    "SKILLS_ROOT_DIR",
+    "SYSTEM_SKILLS_DIR",
+    "CUSTOM_SKILLS_DIR",
+    "DEFAULT_SYSTEM_SKILLS",
+    "ENABLE_",
+    "SUBAGENT_",
+)
+
+# Provider environment variables, in priority order
+API_KEY_ENV_VARS = (
+    "LLM_API_KEY",
+    "OPENAI_API_KEY",
+    "DEEPSEEK_API_KEY",
+    "ANTHROPIC_API_KEY",
+    "AZURE_OPENAI_API_KEY",
+)
+API_BASE_ENV_VARS = (
+    "LLM_API_BASE",
+    "OPENAI_API_BASE",
+    "DEEPSEEK_API_BASE",
+    "ANTHROPIC_API_BASE",
+    "AZURE_OPENAI_ENDPOINT",
+)
+ORGANIZATION_ENV_VARS = ("LLM_ORGANIZATION", "OPENAI_ORGANIZATION")
+
+
+def _first_env_value(env_names: Tuple[str, ...]) -> Optional[str]:
+    """
+    Return the first non-empty value among several environment variables.
+
+    Args:
+        env_names: Environment variable names in priority order.
+
+    Returns:
+        First non-empty value, or `None` when all are unset or empty.
+    """
+    environ = os.environ
+    for env_name in env_names:
+        value = environ.get(env_name)
+        if value:
+            return value
+    return None
+
 
 def _parse_csv_items(csv_text: str) -> List[str]:
     """
@@ -74,6 +126,33 @@ def _load_model_identifier() -> Optional[str]:
     return identifier or None
 
 
+def infer_model_from_api_base(
+    api_base: Optional[str],
+    azure_deployment: Optional[str] = None,
+    default: str = "gpt-3.5-turbo"
+) -> str:
+    """
+    Infer the default model name for a provider from its API base URL.
+
+    Args:
+        api_base: Provider API base URL.
+        azure_deployment: Azure OpenAI deployment name, used for Azure endpoints.
+        default: Model name returned when no provider-specific default applies.
+
+    Returns:
+        Inferred model name.
+    """
+    api_base_lower = (api_base or "").lower()
+    if "deepseek" in api_base_lower:
+        return "deepseek-chat"
+    if "anthropic" in api_base_lower:
+        return "claude-3-sonnet-20240229"
+    if "azure" in api_base_lower and azure_deployment:
+        # Azure OpenAI requires deployment name instead of model name
+        return azure_deployment
+    return default
+
+
 @dataclass
 class LLMConfig:
     """LLM Configuration"""
@@ -105,30 +184,71 @@ class AgentConfig:
     enable_custom_skill_tool: bool = field(default_factory = lambda: _parse_bool_env("ENABLE_CUSTOM_SKILL_TOOL", True))
     enable_subagent_tool: bool = field(default_factory = lambda: _parse_bool_env("ENABLE_SUBAGENT_TOOL", True))
     subagent_max_iterations: int = field(default_factory = lambda: int(os.getenv("SUBAGENT_MAX_ITERATIONS", "5")))
+    enable_memory_llm_summary: bool = field(default_factory = lambda: _parse_bool_env("ENABLE_MEMORY_LLM_SUMMARY", False))
     enable_reflection: bool = False
     reflection_system_prompt: Optional[str] = None
     reflection_max_iterations: int = 5
 
 
+# Default system prompt file read into AgentConfig.system_prompt
+DEFAULT_SYSTEM_PROMPT_PATH = Path(__file__).parent.parent / "prompts" / "system_prompt.md"
+
+
 def _load_default_system_prompt() -> str:
     """Load default system prompt from prompts/system_prompt.md"""
-    prompt_path = Path(__file__).parent.parent / "prompts" / "system_prompt.md"
+    prompt_path = DEFAULT_SYSTEM_PROMPT_PATH
     try:
         if prompt_path.exists():
             with open(prompt_path, "r", encoding = "utf-8") as f:
                 return f.read().strip()
-        logger.warning(f"System prompt file not found at {prompt_path}, using default")
+        logger.warning("System prompt file not found at %s, using default", prompt_path)
     except Exception as e:
-        logger.error(f"Failed to load system prompt from {prompt_path}: {e}")
+        logger.error("Failed to load system prompt from %s: %s", prompt_path, e)
 
     # Fallback to default if file not found or error
     return "You are a helpful AI assistant call QuarkAgent, created by Brench."
 
 
+def _config_env_fingerprint() -> Tuple[Tuple[str, str], ...]:
+    """
+    Snapshot the environment variables that affect configuration loading.
+
+    Returns:
+        Sorted tuple of (name, value) pairs for config-related variables.
+    """
+    return tuple(sorted(
+        (key, value) for key, value in os.environ.items()
+        if key.startswith(CONFIG_ENV_PREFIXES)
+    ))
+
+
+def _config_file_signature(config_path: Optional[str]) -> Tuple[int, int]:
+    """
+    Build a cheap change signature for a configuration file.
+
+    Args:
+        config_path: Path to the configuration file, if any.
+
+    Returns:
+        Tuple of (mtime in nanoseconds, size in bytes); (-1, -1) if missing.
+    """
+    if not config_path:
+        return 0, 0
+    try:
+        stat_result = os.stat(config_path)
+    except OSError:
+        return -1, -1
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
 def load_config(config_path: Optional[str] = None) -> AgentConfig:
     """
     Load agent configuration from a JSON file or use default values.
 
+    Results are cached per config file signature, default system prompt
+    file signature and config-related environment, so repeated calls skip
+    re-reading and re-parsing until one of them changes.
+
     Args:
         config_path (Optional[str]): Path to the configuration file. If None,
             looks for 'config.json' in the current directory.
@@ -136,36 +256,53 @@ def load_config(config_path: Optional[str] = None) -> AgentConfig:
     Returns:
         AgentConfig: Loaded agent configuration.
     """
+    cached_config = _load_config_cached(
+        config_path,
+        _config_file_signature(config_path),
+        _config_file_signature(str(DEFAULT_SYSTEM_PROMPT_PATH)),
+        _config_env_fingerprint(),
+    )
+    # Callers mutate the returned config, so never hand out the cached object
+    return copy.deepcopy(cached_config)
+
+
+@lru_cache(maxsize = 32)
+def _load_config_cached(
+    config_path: Optional[str],
+    file_signature: Tuple[int, int],
+    prompt_signature: Tuple[int, int],
+    env_fingerprint: Tuple[Tuple[str, str], ...]
+) -> AgentConfig:
+    """
+    Load agent configuration; cached on the file signatures and environment.
+
+    Args:
+        config_path: Path to the configuration file, if any.
+        file_signature: File change signature, used only as a cache key.
+        prompt_signature: Default system prompt file signature, used only as a cache key.
+        env_fingerprint: Config-related environment snapshot, used only as a cache key.
+
+    Returns:
+        AgentConfig: Loaded agent configuration.
+    """
+    del file_signature, prompt_signature, env_fingerprint
+
     config = AgentConfig()
 
     # Try to get API key from environment variables with multiple fallbacks
-    # Priority order: LLM_API_KEY > OPENAI_API_KEY > DEEPSEEK_API_KEY > ANTHROPIC_API_KEY > AZURE_OPENAI_API_KEY
-    env_api_key = (
-        os.environ.get("LLM_API_KEY") or
-        os.environ.get("OPENAI_API_KEY") or
-        os.environ.get("DEEPSEEK_API_KEY") or
-        os.environ.get("ANTHROPIC_API_KEY") or
-        os.environ.get("AZURE_OPENAI_API_KEY")
-    )
+    env_api_key = _first_env_value(API_KEY_ENV_VARS)
 
     if env_api_key:
         config.llm.api_key = env_api_key
 
     # Try to get API base URL from environment variables with multiple fallbacks
-    # Priority order: LLM_API_BASE > OPENAI_API_BASE > DEEPSEEK_API_BASE > ANTHROPIC_API_BASE > AZURE_OPENAI_ENDPOINT
-    env_api_base = (
-        os.environ.get("LLM_API_BASE") or
-        os.environ.get("OPENAI_API_BASE") or
-        os.environ.get("DEEPSEEK_API_BASE") or
-        os.environ.get("ANTHROPIC_API_BASE") or
-        os.environ.get("AZURE_OPENAI_ENDPOINT")
-    )
+    env_api_base = _first_env_value(API_BASE_ENV_VARS)
 
     if env_api_base:
         config.llm.api_base = env_api_base
 
     # Try to get organization from environment variables
-    env_organization = os.environ.get("LLM_ORGANIZATION") or os.environ.get("OPENAI_ORGANIZATION")
+    env_organization = _first_env_value(ORGANIZATION_ENV_VARS)
     if env_organization:
         config.llm.organization = env_organization
 
@@ -179,17 +316,12 @@ def load_config(config_path: Optional[str] = None) -> AgentConfig:
         config.llm.model_identifier = env_model_identifier
 
     # Determine likely provider based on API_BASE and set appropriate default model
-    if config.llm.api_base:
-        api_base_lower = config.llm.api_base.lower()
-        if "deepseek" in api_base_lower and not env_model:
-            config.llm.model_name = "deepseek-chat"
-        elif "anthropic" in api_base_lower and not env_model:
-            config.llm.model_name = "claude-3-sonnet-20240229"
-        elif "azure" in api_base_lower and not env_model:
-            # Azure OpenAI requires deployment name instead of model name
-            deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME")
-            if deployment_name:
-                config.llm.model_name = deployment_name
+    if config.llm.api_base and not env_model:
+        config.llm.model_name = infer_model_from_api_base(
+            config.llm.api_base,
+            azure_deployment = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME"),
+            default = config.llm.model_name,
+        )
 
     # If no configuration file, return default configuration
     if not config_path:
@@ -210,9 +342,9 @@ def load_config(config_path: Optional[str] = None) -> AgentConfig:
             if key != "llm" and hasattr(config, key):
                 setattr(config, key, value)
 
-        logger.info(f"Configuration loaded from {config_path}")
+        logger.info("Configuration loaded from %s", config_path)
     except Exception as e:
-        logger.error(f"Failed to load configuration from {config_path}: {e}")
+        logger.error("Failed to load configuration from %s: %s", config_path, e)
 
     return config
 
@@ -257,6 +389,7 @@ def save_config(
             "enable_custom_skill_tool": config.enable_custom_skill_tool,
             "enable_subagent_tool": config.enable_subagent_tool,
             "subagent_max_iterations": config.subagent_max_iterations,
+            "enable_memory_llm_summary": config.enable_memory_llm_summary,
             "enable_reflection": config.enable_reflection,
             "reflection_system_prompt": config.reflection_system_prompt,
             "reflection_max_iterations": config.reflection_max_iterations
@@ -268,8 +401,8 @@ def save_config(
         with open(config_file, "w", encoding = "utf-8") as f:
             json.dump(config_dict, f, indent = 2, ensure_ascii = False)
 
-        logger.info(f"Configuration saved to: {config_path}")
+        logger.info("Configuration saved to: %s", config_path)
         return True
     except Exception as e:
-        logger.error(f"Failed to save configuration to '{config_path}': {str(e)}")
+        logger.error("Failed to save configuration to '%s': %s", config_path, e)
         return False
@@ -1,10 +1,5 @@
-import os
-import sys
-
-sys.path.append(os.getcwd())
-
 from .core import Memory
 from .schemas import MemorySummary
-from .storage import list_memory_summaries
+from .storage import list_memory_summaries, wait_for_memory_writes
 
-__all__ = ["Memory", "MemorySummary", "list_memory_summaries"]
+__all__ = ["Memory", "MemorySummary", "list_memory_summaries", "wait_for_memory_writes"]
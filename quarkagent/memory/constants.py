@@ -10,6 +10,13 @@ DEFAULT_SUMMARY_CHAR_LIMIT = 1600
 DEFAULT_PRESERVE_RECENT_MESSAGES = 5
 DEFAULT_MAX_EPISODES = 12
 DEFAULT_MAX_DECISIONS = 12
+SAVE_INTERVAL_SECONDS = 1.0
+SAVE_BATCH_SIZE = 8
+MEMORY_LOG_MAX_BYTES = 256 * 1024
+MEMORY_SUMMARY_PROMPT = (
+    "Summarize the following conversation turns in at most three sentences. "
+    "Keep names, decisions, open questions and concrete values; drop greetings and filler."
+)
 STOP_WORDS = {
     "a",
     "an",
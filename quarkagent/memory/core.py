@@ -1,15 +1,15 @@
-import json
+import os
 import re
 import time
+import atexit
+import weakref
 
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-import os
-import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-sys.path.append(os.getcwd())
+from quarkagent.utils.json_util import dumps_json, loads_json
 
 from .constants import (
     DEFAULT_AGENT_SCOPE,
@@ -19,15 +19,43 @@ from .constants import (
     DEFAULT_PRESERVE_RECENT_MESSAGES,
     DEFAULT_RECENT_CONTEXT_MESSAGES,
     DEFAULT_SUMMARY_CHAR_LIMIT,
+    MEMORY_LOG_MAX_BYTES,
+    SAVE_BATCH_SIZE,
+    SAVE_INTERVAL_SECONDS,
     STOP_WORDS,
     logger,
 )
 from .storage import (
     default_memory_path,
     get_memory_path_by_index,
+    append_memory_log,
+    memory_log_path,
     normalize_agent_scope,
+    queue_memory_write,
+    wait_for_memory_writes,
+    write_memory_snapshot,
 )
 
+# Memories with changes not yet written to disk, flushed at interpreter exit
+_UNSAVED_MEMORIES: "weakref.WeakValueDictionary[int, Memory]" = weakref.WeakValueDictionary()
+
+
+def _save_unsaved_memories() -> None:
+    """
+    Write every memory that still has pending changes.
+
+    Args:
+        None.
+
+    Returns:
+        None.
+    """
+    for memory in list(_UNSAVED_MEMORIES.values()):
+        memory._flush()
+
+
+atexit.register(_save_unsaved_memories)
+
 
 @dataclass
 class Memory:
@@ -54,6 +82,24 @@ class Memory:
     max_decisions: int = DEFAULT_MAX_DECISIONS
     max_summary_chars: int = DEFAULT_SUMMARY_CHAR_LIMIT
     max_context_chars: int = DEFAULT_MAX_CONTEXT_CHARS
+    summarizer: Optional[Callable[[List[Dict[str, str]]], str]] = field(
+        default = None,
+        repr = False,
+        compare = False
+    )
+    _context_cache: Optional[Tuple[Tuple[Any, ...], str]] = field(
+        default = None,
+        init = False,
+        repr = False,
+        compare = False
+    )
+    _dirty_count: int = field(default = 0, init = False, repr = False, compare = False)
+    _last_flush: float = field(default = float("-inf"), init = False, repr = False, compare = False)
+    _pending_messages: List[Dict[str, str]] = field(default_factory = list, init = False, repr = False, compare = False)
+    _snapshot_stale: bool = field(default = False, init = False, repr = False, compare = False)
+    _updated_at: Optional[int] = field(default = None, init = False, repr = False, compare = False)
+    _snapshot_written: bool = field(default = False, init = False, repr = False, compare = False)
+    _log_bytes: int = field(default = 0, init = False, repr = False, compare = False)
 
     def __post_init__(self) -> None:
         """
@@ -115,11 +161,20 @@ class Memory:
         Returns:
             None.
         """
+        wait_for_memory_writes()
         if not self.path.exists():
             return
 
+        self._context_cache = None
+        self._dirty_count = 0
+        self._pending_messages = []
+        self._snapshot_stale = False
+        self._snapshot_written = True
+        self._log_bytes = 0
+        _UNSAVED_MEMORIES.pop(id(self), None)
         try:
-            data = json.loads(self.path.read_text(encoding = "utf-8"))
+            data = loads_json(self.path.read_bytes())
+            self._updated_at = data.get("updated_at")
             self.agent_scope = normalize_agent_scope(data.get("agent_scope", self.agent_scope))
             self.preferences = data.get("preferences", {}) or {}
             self.facts = data.get("facts", {}) or {}
@@ -133,12 +188,54 @@ class Memory:
             self.skills = data.get("skills", []) or []
             self.task_id = data.get("task_id") or self.facts.get("task_id")
             self._compress_overflow_messages()
+            self._replay_log()
         except Exception:
             logger.exception("Failed to load memory")
 
+    def _replay_log(self) -> None:
+        """
+        Re-apply the changes appended to the log since the snapshot was written.
+
+        A torn final line from an interrupted write is skipped. Overflow
+        hit while replaying is compressed with the heuristic summary, so a
+        load never calls the configured summarizer.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        log_path = memory_log_path(self.path)
+        if not log_path.exists():
+            return
+
+        summarizer = self.summarizer
+        self.summarizer = None
+        try:
+            with open(log_path, "rb") as log_file:
+                self._log_bytes = os.fstat(log_file.fileno()).st_size
+                for line in log_file:
+                    try:
+                        op = loads_json(line)
+                    except Exception:
+                        logger.warning("Skipping unreadable memory log entry in %s", log_path)
+                        continue
+
+                    if op.get("op") == "push":
+                        self._apply_push(op["role"], op["content"])
+                        self._updated_at = op.get("updated_at", self._updated_at)
+        finally:
+            self.summarizer = summarizer
+
     def save(self) -> None:
         """
-        Persist the current memory payload to disk.
+        Persist the full memory payload to disk as a fresh snapshot.
+
+        Mutators only schedule a write; call this to flush pending changes
+        right away, e.g. after editing fields directly. The payload is
+        serialized here and written by the background memory writer, so
+        the files are only durable once `wait_for_memory_writes()` returns.
 
         Args:
             None.
@@ -146,10 +243,16 @@ class Memory:
         Returns:
             None.
         """
+        self._context_cache = None
+        self._dirty_count = 0
+        self._last_flush = time.monotonic()
+        self._pending_messages = []
+        self._snapshot_stale = False
+        _UNSAVED_MEMORIES.pop(id(self), None)
         try:
-            self.path.parent.mkdir(parents = True, exist_ok = True)
+            self._updated_at = int(time.time())
             payload = {
-                "updated_at": int(time.time()),
+                "updated_at": self._updated_at,
                 "agent_scope": self.agent_scope,
                 "preferences": self.preferences,
                 "facts": self.facts,
@@ -163,13 +266,84 @@ class Memory:
                 "skills": self.skills,
                 "task_id": self.task_id,
             }
-            self.path.write_text(
-                json.dumps(payload, ensure_ascii = False, indent = 2),
-                encoding = "utf-8"
-            )
+            # Serialize on the calling thread: the payload shares live lists
+            # and dicts that keep changing once this returns
+            snapshot_data = dumps_json(payload, indent = True).encode("utf-8")
+            queue_memory_write(partial(write_memory_snapshot, self.path, snapshot_data))
+            self._snapshot_written = True
+            self._log_bytes = 0
         except Exception:
             logger.exception("Failed to save memory")
 
+    def _flush(self) -> None:
+        """
+        Write pending changes, appending them to the log when possible.
+
+        Pushes are appended as one JSON line each; any other change, a
+        snapshot this instance has not written or loaded, or an oversized
+        log falls back to a full snapshot.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        if (
+            self._snapshot_stale
+            or not self._pending_messages
+            or not self._snapshot_written
+            or self._log_bytes > MEMORY_LOG_MAX_BYTES
+        ):
+            self.save()
+            return
+
+        pending_messages = self._pending_messages
+        self._dirty_count = 0
+        self._last_flush = time.monotonic()
+        self._pending_messages = []
+        _UNSAVED_MEMORIES.pop(id(self), None)
+        updated_at = int(time.time())
+        log_data = b"".join(
+            dumps_json({"op": "push", **message, "updated_at": updated_at}).encode("utf-8") + b"\n"
+            for message in pending_messages
+        )
+        queue_memory_write(partial(append_memory_log, self.path, log_data))
+        self._updated_at = updated_at
+        self._log_bytes += len(log_data)
+
+    def _mark_dirty(self, pushed_message: Optional[Dict[str, str]] = None) -> None:
+        """
+        Record one mutation and write it out once enough changes or time accumulate.
+
+        Bursts of mutations are coalesced into a single save: the payload is
+        written at most once per `SAVE_INTERVAL_SECONDS` unless
+        `SAVE_BATCH_SIZE` changes are pending, and anything left over is
+        written at interpreter exit.
+
+        Args:
+            pushed_message: Message appended by `push`, logged as-is, or `None` when only a full snapshot captures the change.
+
+        Returns:
+            None.
+        """
+        # Every mutator goes through here, so this is where the rendered
+        # context goes stale
+        self._context_cache = None
+        self._dirty_count += 1
+        if pushed_message is None:
+            self._snapshot_stale = True
+        else:
+            self._pending_messages.append(pushed_message)
+
+        if (
+            self._dirty_count >= SAVE_BATCH_SIZE
+            or time.monotonic() - self._last_flush >= SAVE_INTERVAL_SECONDS
+        ):
+            self._flush()
+        else:
+            _UNSAVED_MEMORIES[id(self)] = self
+
     def set_runtime_state(
         self,
         system_prompt: Optional[str],
@@ -193,7 +367,7 @@ class Memory:
         self.tools = list(tools or [])
         self.skills = list(skills or [])
         self.task_id = task_id or self.task_id
-        self.save()
+        self._mark_dirty()
 
     def set_system_prompt(self, system_prompt: Optional[str]) -> None:
         """
@@ -206,7 +380,7 @@ class Memory:
             None.
         """
         self.system_prompt = system_prompt or None
-        self.save()
+        self._mark_dirty()
 
     def set_preference(self, key: str, value: Any) -> None:
         """
@@ -220,7 +394,7 @@ class Memory:
             None.
         """
         self.preferences[key] = value
-        self.save()
+        self._mark_dirty()
 
     def set_fact(self, key: str, value: Any) -> None:
         """
@@ -234,7 +408,37 @@ class Memory:
             None.
         """
         self.facts[key] = value
-        self.save()
+        self._mark_dirty()
+
+    def set_preferences(self, values: Dict[str, Any]) -> None:
+        """
+        Persist several stable user preferences with a single save.
+
+        Args:
+            values: Preference keys mapped to their values.
+
+        Returns:
+            None.
+        """
+        if not values:
+            return
+        self.preferences.update(values)
+        self._mark_dirty()
+
+    def set_facts(self, values: Dict[str, Any]) -> None:
+        """
+        Persist several stable user facts with a single save.
+
+        Args:
+            values: Fact keys mapped to their values.
+
+        Returns:
+            None.
+        """
+        if not values:
+            return
+        self.facts.update(values)
+        self._mark_dirty()
 
     def set_task_state(
         self,
@@ -283,7 +487,7 @@ class Memory:
             if normalized_list is not None:
                 self.task_state[key] = normalized_list
 
-        self.save()
+        self._mark_dirty()
 
     def record_decision(
         self,
@@ -311,7 +515,7 @@ class Memory:
             }
         )
         self.decision_log = self.decision_log[-self.max_decisions :]
-        self.save()
+        self._mark_dirty()
 
     def remember_episode(
         self,
@@ -346,7 +550,7 @@ class Memory:
         }
         self.episodes.append(episode)
         self.episodes = self.episodes[-self.max_episodes :]
-        self.save()
+        self._mark_dirty()
 
     def push(self, role: str, content: str) -> None:
         """
@@ -366,16 +570,32 @@ class Memory:
         if not clean_content:
             return
 
-        self.messages.append({"role": role, "content": clean_content})
+        # The stored message doubles as the pending log entry, so a push
+        # allocates nothing beyond the message itself until it is flushed
+        self._mark_dirty(self._apply_push(role, clean_content))
+
+    def _apply_push(self, role: str, content: str) -> Dict[str, str]:
+        """
+        Apply one conversational turn to the in-memory state without persisting it.
+
+        Args:
+            role: Message role such as `user` or `assistant`.
+            content: Cleaned message text.
+
+        Returns:
+            The message dictionary that was appended.
+        """
+        message = {"role": role, "content": content}
+        self.messages.append(message)
 
         if role == "user":
-            inferred_topic = self._infer_topic_from_text(clean_content)
+            inferred_topic = self._infer_topic_from_text(content)
             if inferred_topic:
                 self.task_state["topic"] = inferred_topic
-            self.task_state["latest_user_request"] = self._clip_text(clean_content, 220)
+            self.task_state["latest_user_request"] = self._clip_text(content, 220)
 
         self._compress_overflow_messages()
-        self.save()
+        return message
 
     def context(
         self,
@@ -385,6 +605,10 @@ class Memory:
         """
         Generate a compact layered memory context string for the LLM.
 
+        The last rendered context is reused while the query, the budget and
+        the rendered fields are unchanged. Mutators drop the cache, and direct
+        edits to the public fields are caught by `_context_fingerprint`.
+
         Args:
             query: Optional current query used for relevance scoring.
             max_chars: Optional maximum character budget for the rendered context.
@@ -393,29 +617,59 @@ class Memory:
             Rendered context string.
         """
         budget = max_chars or self.max_context_chars
-        sections: List[str] = []
-
-        preferences_section = self._render_preferences_section()
-        facts_section = self._render_facts_section()
-        task_state_section = self._render_task_state_section()
-        decisions_section = self._render_decision_section(query)
-        episodes_section = self._render_episode_section(query)
-        summary_section = self._render_summary_section()
-        recent_section = self._render_recent_messages_section(query)
-
-        for section in [
-            preferences_section,
-            facts_section,
-            task_state_section,
-            decisions_section,
-            episodes_section,
-            summary_section,
-            recent_section,
-        ]:
-            if section:
-                sections.append(section)
-
-        return self._fit_sections_to_budget(sections, budget).strip()
+        fingerprint = self._context_fingerprint(query, budget)
+        cached = self._context_cache
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        sections = [
+            section
+            for section in (
+                self._render_preferences_section(),
+                self._render_facts_section(),
+                self._render_task_state_section(),
+                self._render_decision_section(query),
+                self._render_episode_section(query),
+                self._render_summary_section(),
+                self._render_recent_messages_section(query),
+            )
+            if section
+        ]
+
+        rendered = self._fit_sections_to_budget(sections, budget).strip()
+        self._context_cache = (fingerprint, rendered)
+        return rendered
+
+    def _context_fingerprint(self, query: Optional[str], budget: int) -> Tuple[Any, ...]:
+        """
+        Capture the state `context` renders from, cheaply enough to check on every call.
+
+        Dict fields contribute their items, so added, removed or replaced
+        entries are detected; list fields contribute the list itself, its
+        length and its last element, so replaced lists and appends are
+        detected. Comparisons short-circuit on identity, so an unchanged
+        memory compares in time linear in the dict sizes.
+        In-place edits nested inside a value still need a mutator.
+
+        Args:
+            query: Current query used for relevance scoring.
+            budget: Character budget for the rendered context.
+
+        Returns:
+            Tuple that compares equal only while the rendered inputs are unchanged.
+        """
+        return (
+            query,
+            budget,
+            tuple(self.preferences.items()),
+            tuple(self.facts.items()),
+            tuple(self.task_state.items()),
+            self.rolling_summary,
+            *(
+                (items, len(items), items[-1] if items else None)
+                for items in (self.messages, self.episodes, self.decision_log)
+            ),
+        )
 
     def _normalize_text_list(self, items: Optional[List[str]]) -> Optional[List[str]]:
         """
@@ -450,13 +704,19 @@ class Memory:
         if len(self.messages) <= self.max_messages:
             return
 
+        # Trim in place so the list keeps its identity and only the overflow
+        # prefix is copied; a bounded deque would drop messages before they
+        # can be compressed into an episode.
         preserve_count = min(self.preserve_recent_messages, self.max_messages)
         overflow_messages = self.messages[:-preserve_count]
-        self.messages = self.messages[-preserve_count :]
+        del self.messages[:-preserve_count]
 
         if not overflow_messages:
             return
 
+        # Compression output is not in the change log, so the next flush
+        # has to write a full snapshot to keep it
+        self._snapshot_stale = True
         episode = self._create_episode_from_messages(overflow_messages)
         if episode:
             self.episodes.append(episode)
@@ -504,6 +764,15 @@ class Memory:
         Returns:
             Compact chunk summary.
         """
+        if self.summarizer is not None:
+            try:
+                summary = str(self.summarizer(messages) or "").strip()
+            except Exception:
+                logger.exception("Memory summarizer failed, falling back to heuristic summary")
+                summary = ""
+            if summary:
+                return self._clip_text(summary, self.max_summary_chars // 2)
+
         lines = []
         for message in messages[-6:]:
             role = message.get("role", "unknown").strip().title()
@@ -624,7 +893,8 @@ class Memory:
         if not self.task_state:
             return ""
 
-        lines: List[str] = []
+        # Header and items are joined once instead of concatenated piecewise
+        lines: List[str] = ["Task state:"]
         scalar_keys = ["goal", "topic", "latest_user_request"]
         list_keys = ["plan", "todo", "done", "blockers"]
 
@@ -636,12 +906,12 @@ class Memory:
         for key in list_keys:
             values = self.task_state.get(key) or []
             if values:
-                lines.append(f"{key}=" + "; ".join(values))
+                lines.append(f"{key}={'; '.join(values)}")
 
-        if not lines:
+        if len(lines) == 1:
             return ""
 
-        return "Task state:\n" + "\n".join(lines)
+        return "\n".join(lines)
 
     def _render_summary_section(self) -> str:
         """
@@ -671,12 +941,12 @@ class Memory:
             return ""
 
         recent_limit = DEFAULT_RECENT_CONTEXT_MESSAGES if query is None else min(6, DEFAULT_RECENT_CONTEXT_MESSAGES)
-        recent_messages = self.messages[-recent_limit :]
-        conversation = "\n".join(
+        lines = ["Recent conversation:"]
+        lines.extend(
             f"{message['role']}: {message['content']}"
-            for message in recent_messages
+            for message in self.messages[-recent_limit :]
         )
-        return "Recent conversation:\n" + conversation
+        return "\n".join(lines)
 
     def _render_episode_section(self, query: Optional[str]) -> str:
         """
@@ -692,13 +962,12 @@ class Memory:
         if not selected_episodes:
             return ""
 
-        lines = []
-        for episode in selected_episodes:
-            topic = episode.get("topic", "general")
-            summary = episode.get("summary", "")
-            lines.append(f"- [{topic}] {summary}")
-
-        return "Relevant episodes:\n" + "\n".join(lines)
+        lines = ["Relevant episodes:"]
+        lines.extend(
+            f"- [{episode.get('topic', 'general')}] {episode.get('summary', '')}"
+            for episode in selected_episodes
+        )
+        return "\n".join(lines)
 
     def _render_decision_section(self, query: Optional[str]) -> str:
         """
@@ -714,7 +983,7 @@ class Memory:
         if not selected_decisions:
             return ""
 
-        lines = []
+        lines = ["Key decisions:"]
         for item in selected_decisions:
             decision = item.get("decision", "")
             rationale = item.get("rationale", "")
@@ -723,7 +992,7 @@ class Memory:
             else:
                 lines.append(f"- {decision}")
 
-        return "Key decisions:\n" + "\n".join(lines)
+        return "\n".join(lines)
 
     def _select_relevant_episodes(
         self,
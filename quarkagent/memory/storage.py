@@ -1,13 +1,15 @@
 import os
-import sys
-import json
 import re
+import queue
+import atexit
+import threading
 
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-sys.path.append(os.getcwd())
+from quarkagent.utils.json_util import loads_json
 
 from .constants import DEFAULT_AGENT_SCOPE, LEGACY_MEMORY_FILENAME, logger
 from .schemas import MemorySummary
@@ -72,6 +74,148 @@ def generate_timestamped_filename(agent_scope: str = DEFAULT_AGENT_SCOPE) -> str
     return f"{normalized_scope}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
 
 
+def _scan_memory_files(directory: Path) -> List[Tuple[float, Path]]:
+    """
+    Collect memory files in one directory together with their creation time.
+
+    A single os.scandir pass is used and each file is stat-ed exactly once,
+    so callers can sort without issuing further syscalls.
+
+    Args:
+        directory: Directory holding memory files.
+
+    Returns:
+        Unsorted list of `(st_ctime, path)` pairs.
+    """
+    wait_for_memory_writes()
+    try:
+        with os.scandir(directory) as entries:
+            return [
+                (entry.stat().st_ctime, Path(entry.path))
+                for entry in entries
+                if entry.name.endswith(".json")
+                and entry.name != LEGACY_MEMORY_FILENAME
+                and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def memory_log_path(path: Path) -> Path:
+    """
+    Get the append-only change log that accompanies one memory snapshot.
+
+    Args:
+        path: Memory snapshot file path.
+
+    Returns:
+        Change log file path next to the snapshot.
+    """
+    return path.with_suffix(".log")
+
+
+# Memory file writes run in submission order on one background thread, so
+# a snapshot and the log lines appended after it can never be reordered
+_WRITE_QUEUE: "queue.Queue[Callable[[], None]]" = queue.Queue()
+_WRITER_LOCK = threading.Lock()
+_WRITER_THREAD: Optional[threading.Thread] = None
+
+
+def _run_memory_writer() -> None:
+    """
+    Execute queued memory writes until the interpreter exits.
+
+    Args:
+        None.
+
+    Returns:
+        None.
+    """
+    while True:
+        write = _WRITE_QUEUE.get()
+        try:
+            write()
+        except Exception:
+            logger.exception("Failed to write memory file")
+        finally:
+            _WRITE_QUEUE.task_done()
+
+
+def queue_memory_write(write: Callable[[], None]) -> None:
+    """
+    Schedule one memory file write on the background writer thread.
+
+    Args:
+        write: Callable that performs the file I/O.
+
+    Returns:
+        None.
+    """
+    global _WRITER_THREAD
+
+    with _WRITER_LOCK:
+        if _WRITER_THREAD is None or not _WRITER_THREAD.is_alive():
+            _WRITER_THREAD = threading.Thread(
+                target = _run_memory_writer,
+                name = "quarkagent-memory-writer",
+                daemon = True,
+            )
+            _WRITER_THREAD.start()
+    _WRITE_QUEUE.put(write)
+
+
+def wait_for_memory_writes() -> None:
+    """
+    Block until every queued memory write has reached the disk.
+
+    Args:
+        None.
+
+    Returns:
+        None.
+    """
+    _WRITE_QUEUE.join()
+
+
+# Registered before the memory module's exit hook, so it runs after that
+# hook has queued the last pending changes
+atexit.register(wait_for_memory_writes)
+
+
+def write_memory_snapshot(path: Path, data: bytes) -> None:
+    """
+    Atomically replace a memory snapshot and drop the change log it supersedes.
+
+    Args:
+        path: Memory snapshot file path.
+        data: Serialized snapshot payload.
+
+    Returns:
+        None.
+    """
+    path.parent.mkdir(parents = True, exist_ok = True)
+    # Write then rename so readers never see a half-written snapshot
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, path)
+    memory_log_path(path).unlink(missing_ok = True)
+
+
+def append_memory_log(path: Path, data: bytes) -> None:
+    """
+    Append serialized change log lines next to a memory snapshot.
+
+    Args:
+        path: Memory snapshot file path.
+        data: Newline-terminated JSON lines.
+
+    Returns:
+        None.
+    """
+    with open(memory_log_path(path), "ab") as log_file:
+        log_file.write(data)
+
+
 def list_memory_files(agent_scope: str = DEFAULT_AGENT_SCOPE) -> List[Path]:
     """
     List all memory files for one scope sorted by creation time.
@@ -84,15 +228,13 @@ def list_memory_files(agent_scope: str = DEFAULT_AGENT_SCOPE) -> List[Path]:
     """
     normalized_scope = normalize_agent_scope(agent_scope)
     scoped_dir = get_memory_dir(normalized_scope)
-    memory_files = [file for file in scoped_dir.glob("*.json") if file.name != LEGACY_MEMORY_FILENAME]
+    memory_files = _scan_memory_files(scoped_dir)
 
     if normalized_scope == DEFAULT_AGENT_SCOPE:
-        legacy_root = get_memory_root()
-        memory_files.extend(
-            [file for file in legacy_root.glob("*.json") if file.name != LEGACY_MEMORY_FILENAME]
-        )
+        memory_files.extend(_scan_memory_files(get_memory_root()))
 
-    return sorted(memory_files, key = lambda item: item.stat().st_ctime)
+    memory_files.sort(key = itemgetter(0))
+    return [path for _, path in memory_files]
 
 
 def manage_memory_files(
@@ -111,10 +253,7 @@ def manage_memory_files(
         None.
     """
     memory_dir = get_memory_dir(agent_scope)
-    memory_files = sorted(
-        [file for file in memory_dir.glob("*.json") if file.name != LEGACY_MEMORY_FILENAME],
-        key = lambda item: item.stat().st_ctime
-    )
+    memory_files = [path for _, path in sorted(_scan_memory_files(memory_dir), key = itemgetter(0))]
 
     if len(memory_files) <= max_files:
         return
@@ -123,6 +262,7 @@ def manage_memory_files(
     for file in files_to_delete:
         try:
             file.unlink()
+            memory_log_path(file).unlink(missing_ok = True)
             logger.info("Deleted old memory file: %s", file)
         except Exception:
             logger.exception("Failed to delete old memory file: %s", file)
@@ -186,7 +326,14 @@ def list_memory_summaries(
         payload: Dict[str, Any] = {}
 
         try:
-            payload = json.loads(path.read_text(encoding = "utf-8"))
+            payload = loads_json(path.read_bytes())
+            if memory_log_path(path).exists():
+                # Pending log entries only replay through the full memory model
+                from quarkagent.memory.core import Memory
+
+                memory = Memory(path = path, agent_scope = normalized_scope)
+                memory.load()
+                payload.update(messages = memory.messages, updated_at = memory._updated_at)
         except Exception:
             logger.exception("Failed to build memory summary from %s", path)
 
@@ -1,8 +1,3 @@
-import os
-import sys
-
-sys.path.append(os.getcwd())
-
 from quarkagent.skills.commands import SkillCommandResult, build_skill_command_response, parse_skill_command
 from quarkagent.skills.manager import SkillManager
 from quarkagent.skills.models import SkillDefinition
@@ -1,11 +1,6 @@
-import os
-import sys
-
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
-sys.path.append(os.getcwd())
-
 from quarkagent.skills.manager import SkillManager
 
 
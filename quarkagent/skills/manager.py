@@ -1,12 +1,8 @@
-import os
-import sys
 import logging
 
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-sys.path.append(os.getcwd())
-
 from quarkagent.skills.models import SkillDefinition
 from quarkagent.skills.parsing import (
     SKILL_REFERENCE_PATTERN,
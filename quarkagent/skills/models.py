@@ -1,10 +1,5 @@
-import os
-import sys
-
 from dataclasses import dataclass
 
-sys.path.append(os.getcwd())
-
 
 @dataclass
 class SkillDefinition:
@@ -1,11 +1,7 @@
-import os
 import re
-import sys
 
 from typing import Dict, List, Tuple
 
-sys.path.append(os.getcwd())
-
 SKILL_REFERENCE_PATTERN = re.compile(r"\$\{([A-Za-z0-9][A-Za-z0-9._-]*)\}")
 VALID_SKILL_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
 
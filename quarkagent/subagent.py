@@ -1,12 +1,8 @@
-import os
-import sys
 import logging
 
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from uuid import uuid4
 
-sys.path.append(os.getcwd())
-
 if TYPE_CHECKING:
     from quarkagent.agent import QuarkAgent
 
@@ -71,6 +67,9 @@ def build_subagent_tool(
         Tool definition compatible with `QuarkAgent.add_tool`.
     """
     from quarkagent.agent import QuarkAgent
+    from quarkagent.agent.parsing import DEFAULT_TOOL_MARKERS
+    from quarkagent.agent.runtime import ACTIVE_STOP_CALLBACK
+    from quarkagent.agent.constants import DEFAULT_HISTORY_WINDOW
     from quarkagent.memory import Memory
 
     def _generate_task_id() -> str:
@@ -136,17 +135,17 @@ def build_subagent_tool(
         task_id = _generate_task_id()
 
         subagent_memory = Memory(agent_scope = "subagent")
-        subagent_memory.facts.update(
-            {
-                "task_id": task_id,
-                "delegated_task": delegated_task,
-                "delegated_tools": selected_tool_names,
-                "parent_agent_scope": getattr(parent_agent, "agent_scope", "main"),
-            }
-        )
-        subagent_memory.system_prompt = getattr(parent_agent, "base_system_prompt", None)
+        delegated_facts = {
+            "task_id": task_id,
+            "delegated_task": delegated_task,
+            "delegated_tools": selected_tool_names,
+            "parent_agent_scope": getattr(parent_agent, "agent_scope", "main"),
+        }
         if getattr(parent_agent, "memory_path", None):
-            subagent_memory.facts["parent_memory_path"] = parent_agent.memory_path
+            delegated_facts["parent_memory_path"] = parent_agent.memory_path
+        # Go through the mutator so the memoized context never misses these facts
+        subagent_memory.set_facts(delegated_facts)
+        subagent_memory.system_prompt = getattr(parent_agent, "base_system_prompt", None)
 
         child_agent = QuarkAgent(
             model = parent_agent.model,
@@ -160,6 +159,10 @@ def build_subagent_tool(
             model_identifier = getattr(parent_agent, "model_identifier", None),
             use_reflector = False,
             memory_context_provider = lambda query: subagent_memory.context(query = query),
+            stream_responses = getattr(parent_agent, "stream_responses", True),
+            tool_markers = getattr(parent_agent, "tool_markers", DEFAULT_TOOL_MARKERS),
+            history_window = getattr(parent_agent, "history_window", DEFAULT_HISTORY_WINDOW),
+            structured_tools = getattr(parent_agent, "structured_tools", False),
         )
         child_agent.agent_scope = "subagent"
         child_agent.memory_path = str(subagent_memory.path)
@@ -180,9 +183,10 @@ def build_subagent_tool(
         answer = child_agent.run_with_tools(
             query,
             max_iterations = resolved_max_iterations,
-            stop_callback = parent_agent._active_stop_callback,
+            stop_callback = ACTIVE_STOP_CALLBACK.get(),
         )
         subagent_memory.push("assistant", answer)
+        subagent_memory.save()
 
         return {
             "status": "stopped" if answer == child_agent.STOP_MESSAGE else "ok",
@@ -5,8 +5,11 @@ import logging
 import inspect
 import importlib
 
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,38 @@ ToolFunction = Callable[..., Any]
 # Dictionary to store registered tools
 _TOOLS: Dict[str, ToolFunction] = {}
 
+# Read-only live view handed to callers; it tracks later registrations
+# without copying the registry on every call
+_TOOLS_VIEW: Mapping[str, ToolFunction] = MappingProxyType(_TOOLS)
+
+@dataclass
+class ToolResult:
+    """
+    Outcome of one tool call, with failures kept apart from return values.
+    """
+
+    value: Any
+    error: Optional[str] = None
+
+def to_tool_result(result: Any) -> ToolResult:
+    """
+    Wrap a tool return value, recognizing the legacy `{"error": ...}` form.
+
+    Only the top-level keys are inspected, so large results are never
+    stringified just to classify them.
+
+    Args:
+        result: Value returned by a tool or a `ToolResult`
+
+    Returns:
+        Typed tool result
+    """
+    if isinstance(result, ToolResult):
+        return result
+    if isinstance(result, dict) and "error" in result:
+        return ToolResult(value = result, error = str(result["error"]))
+    return ToolResult(value = result)
+
 def register_tool(func: ToolFunction) -> ToolFunction:
     """
     Decorator to register a function as a tool.
@@ -30,6 +65,8 @@ def register_tool(func: ToolFunction) -> ToolFunction:
     return func
 
 __all__ = [
+    'ToolResult',
+    'to_tool_result',
     'register_tool',
     'get_registered_tools',
     'get_tool',
@@ -67,14 +104,14 @@ try:
 except ImportError as e:
     logger.warning(f"Failed to import calculate tool: {e}")
 
-def get_registered_tools() -> Dict[str, ToolFunction]:
+def get_registered_tools() -> Mapping[str, ToolFunction]:
     """
     Get all registered tools.
     
     Returns:
-        Dictionary of tool name to function mapping
+        Read-only mapping of tool name to function
     """
-    return _TOOLS
+    return _TOOLS_VIEW
 
 def get_tool(name: str) -> Optional[ToolFunction]:
     """
@@ -105,10 +142,12 @@ def execute_tool(name: str, **kwargs) -> Any:
     Returns:
         Result of the tool execution
     """
-    logger.info(f"Executing tool: {name} with arguments: {kwargs}")
+    logger.info("Executing tool: %s with arguments: %s", name, kwargs)
 
-    tool = get_tool(name)
-    if not tool:
+    # The registry already maps names straight to the tool functions, so
+    # dispatch is one dict lookup and a direct call
+    tool = _TOOLS.get(name)
+    if tool is None:
         error_msg = f"Tool {name} not found"
         logger.error(error_msg)
         return {
@@ -178,6 +217,36 @@ def load_builtin_tools(tools: Union[List[str], str, None] = None) -> List[str]:
 def get_tool_description(tool: ToolFunction) -> Dict[str, Any]:
     """
     Get the description of a tool.
+
+    Signature introspection runs once per tool function; later calls copy
+    the cached schema so callers may still modify the result.
+    
+    Args:
+        tool: Tool function
+        
+    Returns:
+        Tool description dictionary
+    """
+    try:
+        description = _build_tool_description(tool)
+    except TypeError:
+        # Unhashable callables cannot be cache keys
+        return _build_tool_description.__wrapped__(tool)
+
+    parameters = description["parameters"]
+    return {
+        **description,
+        "parameters": {
+            **parameters,
+            "properties": {name: dict(schema) for name, schema in parameters["properties"].items()},
+            "required": list(parameters["required"]),
+        },
+    }
+
+@lru_cache(maxsize = None)
+def _build_tool_description(tool: ToolFunction) -> Dict[str, Any]:
+    """
+    Build the description of a tool from its signature and docstring.
     
     Args:
         tool: Tool function
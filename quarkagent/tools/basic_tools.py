@@ -1,21 +1,20 @@
 import os
 import re
-import sys
 import json
 import math
+import fnmatch
 import logging
 import datetime
 import platform
 import subprocess
 import webbrowser
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 import psutil
 import requests
 
-sys.path.append(os.getcwd())
-
 from quarkagent.tools import register_tool
 
 logger = logging.getLogger(__name__)
@@ -49,6 +48,38 @@ def env_set(name: str, value: str) -> str:
     os.environ[name] = value
     return f"Set environment variable: {name}={value}"
 
+# Math functions and constants exposed to calculator expressions
+_CALCULATOR_NAMES = {
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'sqrt': math.sqrt,
+    'pow': math.pow,
+    'exp': math.exp,
+    'log': math.log,
+    'log10': math.log10,
+    'pi': math.pi,
+    'e': math.e
+}
+
+# Characters allowed through to the evaluator
+_UNSAFE_EXPRESSION_CHARS = re.compile(r'[^\d+\-*/().a-zA-Z]')
+
+
+@lru_cache(maxsize = 1024)
+def _evaluate_expression(expression: str) -> float:
+    """
+    Evaluate a sanitized expression; results are memoized per expression string.
+
+    Args:
+        expression: Expression with unsafe characters already removed
+
+    Returns:
+        Result of the expression as a float
+    """
+    return float(eval(expression, {"__builtins__": {}}, _CALCULATOR_NAMES))
+
+
 @register_tool
 def calculator(expression: str) -> float:
     """
@@ -61,28 +92,13 @@ def calculator(expression: str) -> float:
          float: The result of the expression.
     """
     logger.info(f"[tool calls] calculator expression: {expression}")
-    # Replace mathematical function names with methods from the math module
-    math_names = {
-        'sin': math.sin,
-        'cos': math.cos,
-        'tan': math.tan,
-        'sqrt': math.sqrt,
-        'pow': math.pow,
-        'exp': math.exp,
-        'log': math.log,
-        'log10': math.log10,
-        'pi': math.pi,
-        'e': math.e
-    }
 
     # For safety, clean unsafe characters from the expression
-    expression = re.sub(r'[^\d+\-*/().a-zA-Z]', '', expression.strip())
+    expression = _UNSAFE_EXPRESSION_CHARS.sub('', expression.strip())
 
-        # Execute calculation
+    # Execute calculation
     try:
-        # Use eval to calculate the expression, providing a safe context
-        result = eval(expression, {"__builtins__": {}}, math_names)
-        return float(result)
+        return _evaluate_expression(expression)
     except Exception as e:
         raise ValueError(f"Failed to calculate expression '{expression}': {str(e)}")
 
@@ -159,6 +175,22 @@ def _format_size(size_bytes: int) -> str:
     s = round(size_bytes / p, 2)
     return f"{s} {size_names[i]}"
    
+def _scan_matching_files(path: Path, pattern: str) -> List[Tuple[Path, os.stat_result]]:
+    """Helper function to collect regular files matching a pattern with their stat results"""
+    # A single-component pattern only needs one directory listing; scandir
+    # entries cache their stat so each file costs one syscall. fnmatch
+    # normalizes case like Path.glob does on case-insensitive platforms
+    separators = [sep for sep in ("/", os.sep, os.altsep) if sep]
+    if not any(sep in pattern for sep in separators) and "**" not in pattern:
+        files = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if fnmatch.fnmatch(entry.name, pattern) and entry.is_file():
+                    files.append((path / entry.name, entry.stat()))
+        return files
+
+    return [(file, file.stat()) for file in path.glob(pattern) if file.is_file()]
+
 @register_tool
 def file_status(
     directory: str = '.',
@@ -185,18 +217,15 @@ def file_status(
         if not path.is_dir():
             raise ValueError(f"Path is not a directory: {directory}")
         
-        # get all files matching the pattern
-        files = list(path.glob(pattern))
-
-        # check if we should only count files in the current directory or recursively
-        files = [file for file in files if file.is_file()]
+        # get all files matching the pattern, stat-ing each one only once
+        files = _scan_matching_files(path, pattern)
 
         # calculate statistics
-        total_size = sum(file.stat().st_size for file in files)
+        total_size = sum(st.st_size for _, st in files)
 
         # Count files by extension
         extensions = {}
-        for file in files:
+        for file, _ in files:
             ext = file.suffix.lower()
             if ext in extensions:
                 extensions[ext] += 1
@@ -205,15 +234,15 @@ def file_status(
 
         # get the oldest and newest file
         if files:
-            oldest_file = min(files, key=lambda f: f.stat().st_mtime)
-            newest_file = max(files, key=lambda f: f.stat().st_mtime)
+            oldest_file, oldest_stat = min(files, key=lambda f: f[1].st_mtime)
+            newest_file, newest_stat = max(files, key=lambda f: f[1].st_mtime)
             oldest = {
                 "path": str(oldest_file.relative_to(path.parent)),
-                "modified": datetime.datetime.fromtimestamp(oldest_file.stat().st_mtime).isoformat()
+                "modified": datetime.datetime.fromtimestamp(oldest_stat.st_mtime).isoformat()
             }
             newest = {
                 "path": str(newest_file.relative_to(path.parent)),
-                "modified": datetime.datetime.fromtimestamp(newest_file.stat().st_mtime).isoformat()
+                "modified": datetime.datetime.fromtimestamp(newest_stat.st_mtime).isoformat()
             }
         else:
             oldest = newest = None
@@ -1,17 +1,56 @@
-import os
 import re
-import sys
 import ast
 import math
 import logging
+from functools import lru_cache
+from types import CodeType
 from typing import Dict, List, Union, Any
 
-sys.path.append(os.getcwd())
-
 from quarkagent.tools import register_tool
 
 logger = logging.getLogger(__name__)
 
+# Functions an expression may call directly
+ALLOWED_FUNCS = frozenset([
+    'abs', 'pow', 'round', 'min', 'max', 'sum', 'len', 'int', 'float',
+    'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'atan2',
+    'sinh', 'cosh', 'tanh', 'exp', 'log', 'log10', 'sqrt',
+    'ceil', 'floor', 'degrees', 'radians'
+])
+
+# Safe evaluation namespace with allowed mathematical functions
+SAFE_NAMES = {
+    'abs': abs,
+    'pow': pow,
+    'round': round,
+    'min': min,
+    'max': max,
+    'sum': sum,
+    'len': len,
+    'int': int,
+    'float': float,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan,
+    'atan2': math.atan2,
+    'sinh': math.sinh,
+    'cosh': math.cosh,
+    'tanh': math.tanh,
+    'exp': math.exp,
+    'log': math.log,
+    'log10': math.log10,
+    'sqrt': math.sqrt,
+    'pi': math.pi,
+    'e': math.e,
+    'ceil': math.ceil,
+    'floor': math.floor,
+    'degrees': math.degrees,
+    'radians': math.radians
+}
+
 def check_node(node):
     """
     Recursively check if a node in the AST contains only allowed operations.
@@ -27,13 +66,7 @@ def check_node(node):
         if isinstance(node, ast.Call):
             if isinstance(node.func, ast.Name):
                 func_name = node.func.id
-                allowed_funcs = [
-                    'abs', 'pow', 'round', 'min', 'max', 'sum', 'len', 'int', 'float',
-                    'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'atan2',
-                    'sinh', 'cosh', 'tanh', 'exp', 'log', 'log10', 'sqrt',
-                    'ceil', 'floor', 'degrees', 'radians'
-                ]
-                if func_name not in allowed_funcs:
+                if func_name not in ALLOWED_FUNCS:
                     raise ValueError(f"Function '{func_name}' is not allowed")
             else:
                 raise ValueError("Only direct function calls are allowed")
@@ -48,6 +81,27 @@ def check_node(node):
     for child in ast.iter_child_nodes(node):
         check_node(child)
 
+@lru_cache(maxsize = 1024)
+def parse(expression: str) -> CodeType:
+    """
+    Parse, validate, and compile an expression once per distinct string.
+    
+    Args:
+        expression: Mathematical expression to compile
+        
+    Returns:
+        Compiled code object ready for eval
+        
+    Raises:
+        ValueError: If the expression contains disallowed operations
+    """
+    tree = ast.parse(expression, mode='eval')
+    
+    # Verify that the expression only contains allowed operations
+    check_node(tree.body)
+    
+    return compile(tree, '<string>', 'eval')
+
 @register_tool
 def calculate(expression: str) -> Dict[str, Any]:
     """
@@ -66,47 +120,8 @@ def calculate(expression: str) -> Dict[str, Any]:
         # Clean and preprocess the expression
         expression = expression.strip()
         
-        # Create a safe dictionary with allowed mathematical functions
-        safe_dict = {
-            'abs': abs,
-            'pow': pow,
-            'round': round,
-            'min': min,
-            'max': max,
-            'sum': sum,
-            'len': len,
-            'int': int,
-            'float': float,
-            'sin': math.sin,
-            'cos': math.cos,
-            'tan': math.tan,
-            'asin': math.asin,
-            'acos': math.acos,
-            'atan': math.atan,
-            'atan2': math.atan2,
-            'sinh': math.sinh,
-            'cosh': math.cosh,
-            'tanh': math.tanh,
-            'exp': math.exp,
-            'log': math.log,
-            'log10': math.log10,
-            'sqrt': math.sqrt,
-            'pi': math.pi,
-            'e': math.e,
-            'ceil': math.ceil,
-            'floor': math.floor,
-            'degrees': math.degrees,
-            'radians': math.radians
-        }
-        
-        # Evaluate the expression
-        tree = ast.parse(expression, mode='eval')
-        
-        # Verify that the expression only contains allowed operations
-        check_node(tree.body)
-        
         # Evaluate the expression using a safe environment
-        result = eval(compile(tree, '<string>', 'eval'), {"__builtins__": {}}, safe_dict)
+        result = eval(parse(expression), {"__builtins__": {}}, SAFE_NAMES)
         
         # Format the result
         if isinstance(result, (int, float)):
@@ -2,14 +2,13 @@ from __future__ import annotations
 
 import os
 import re
-import sys
+import fnmatch
 import logging
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 
-from typing import Any, Dict, List, Tuple, Optional    
-
-sys.path.append(os.getcwd())
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 from quarkagent.tools import register_tool
 
@@ -22,25 +21,101 @@ def _resolve_path(path: str) -> Path:
         p = Path(os.getcwd()) / p
     return p
 
+def _read_file_bytes(path: Path) -> bytes:
+    """Read a whole file through a raw descriptor, skipping the buffered IO layer."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        chunks = [os.read(fd, size)] if size else []
+        # Keep reading until EOF for short reads and files without a stat size
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks)
+
 def _read_text_file(path: Path) -> str:
     """Read the content of a text file."""
     try:
-        with path.open('r', encoding = 'utf-8') as f:
-            return f.read().splitlines()
+        return _read_file_bytes(path).decode('utf-8').splitlines()
     except Exception as e:
         logger.error(f"Error reading file {path}: {e}", exc_info = True)
         return ""
 
+def _write_file_bytes(path: Path, data: bytes) -> None:
+    """Write a whole file through a raw descriptor, skipping the buffered IO layer."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        view = memoryview(data)
+        # os.write may write less than asked, so loop until everything is out
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 def _write_text_file(path: Path, content: str) -> None:
     """Write content to a text file."""
     path.parent.mkdir(parents = True, exist_ok = True)
     try:
-        with path.open('w', encoding = 'utf-8') as f:
-            f.write(content)
+        # Match text-mode newline translation before encoding once
+        if os.linesep != "\n":
+            content = content.replace("\n", os.linesep)
+        _write_file_bytes(path, content.encode('utf-8'))
     except Exception as e:
         logger.error(f"Error writing file {path}: {e}", exc_info = True)
 
 
+@lru_cache(maxsize = 256)
+def _compile_regex(pattern: str) -> re.Pattern:
+    """Compile a regex pattern once and reuse it across tool calls."""
+    return re.compile(pattern)
+
+
+def _split_static_prefix(pattern: str) -> Tuple[str, str]:
+    """Split a glob pattern into its literal leading directories and the rest."""
+    parts = pattern.replace(os.sep, "/").split("/")
+    static_parts = []
+    for part in parts[:-1]:
+        if any(char in part for char in "*?["):
+            break
+        static_parts.append(part)
+    return "/".join(static_parts), "/".join(parts[len(static_parts):])
+
+
+def _walk_glob(root: Path, name_pattern: str) -> List[str]:
+    """Match `**/<name_pattern>` with a single directory walk below root."""
+    matches: List[str] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in fnmatch.filter(dirnames, name_pattern):
+            matches.append(os.path.realpath(os.path.join(dirpath, name)))
+        for name in fnmatch.filter(filenames, name_pattern):
+            matches.append(os.path.realpath(os.path.join(dirpath, name)))
+    return matches
+
+
+def search_multi(matchers: Sequence[Callable[[str], Any]], path: str = ".") -> List[List[str]]:
+    """Match several file-name predicates in a single directory walk.
+
+    Args:
+        matchers: Predicates called with each file name.
+        path: Directory path.
+
+    Returns:
+        One list of matching file paths per matcher, in matcher order.
+    """
+    results: List[List[str]] = [[] for _ in matchers]
+    paired = list(zip(matchers, results))
+    for dirpath, _, filenames in os.walk(_resolve_path(path)):
+        for name in filenames:
+            for matcher, matches in paired:
+                if matcher(name):
+                    matches.append(os.path.realpath(os.path.join(dirpath, name)))
+    return results
+
+
 def _iter_files(root: Path) -> List[Path]:
     if root.is_file():
         return [root]
@@ -164,20 +239,35 @@ def glob(pattern: str, path: str = ".") -> List[str]:
     if not root.exists():
         return []
     try:
-        matches = root.glob(pattern)
-        return [str(p.resolve()) for p in matches]
+        if os.path.isabs(pattern):
+            return [str(p.resolve()) for p in root.glob(pattern)]
+
+        # Only the subtree under the pattern's literal prefix is searched
+        base, tail = _split_static_prefix(pattern)
+        search_root = root / base if base else root
+        # A trailing slash leaves nothing to match below the directory itself
+        if not tail:
+            return [str(search_root.resolve())] if search_root.exists() else []
+
+        # `**/<name>` is matched in one walk instead of pathlib's separate
+        # directory scans for recursion and for the final segment
+        name_pattern = tail[3:]
+        if tail.startswith("**/") and name_pattern and "/" not in name_pattern and "**" not in name_pattern:
+            return _walk_glob(search_root, name_pattern)
+
+        return [str(p.resolve()) for p in search_root.glob(tail)]
     except Exception as e:
         logger.exception("glob failed")
         return [f"error: {e}"]
 
 # noqa: A002
 @register_tool
-def grep(pattern: str, path: str = ".") -> List[Dict[str, Any]]:
+def grep(pattern: Union[str, re.Pattern], path: str = ".") -> List[Dict[str, Any]]:
     """
     Search for a pattern in files.
 
     Args:
-        pattern: Regex pattern.
+        pattern: Regex pattern, as a string or an already compiled pattern.
         path: Directory path.
 
     Returns:
@@ -185,7 +275,7 @@ def grep(pattern: str, path: str = ".") -> List[Dict[str, Any]]:
     """
     root = _resolve_path(path)
     try:
-        regex = re.compile(pattern)
+        regex = pattern if isinstance(pattern, re.Pattern) else _compile_regex(pattern)
     except re.error as e:
         return [{"error": f"invalid regex: {e}"}]
 
@@ -220,18 +310,19 @@ def bash(cmd: str) -> Dict[str, Any]:
         Dict containing exit_code, stdout, stderr.
     """
     try:
+        # The child inherits cwd and environment directly; copying os.environ
+        # only made subprocess re-encode every variable on each call
         completed = subprocess.run(
             cmd,
             shell = True,
-            text = True,
             capture_output = True,
-            cwd = os.getcwd(),
-            env = os.environ.copy(),
         )
+        # Strip the raw bytes and decode once; undecodable output is replaced
+        # instead of failing the whole command
         return {
             "exit_code": completed.returncode,
-            "stdout": (completed.stdout or "").strip(),
-            "stderr": (completed.stderr or "").strip(),
+            "stdout": completed.stdout.strip().decode("utf-8", errors = "replace"),
+            "stderr": completed.stderr.strip().decode("utf-8", errors = "replace"),
         }
     except Exception as e:
         logger.exception("bash failed")
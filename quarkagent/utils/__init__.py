@@ -11,6 +11,8 @@ from .json_util import (
     extract_tool_calls,
     extract_tool_call,
     format_tool_response,
+    dumps_json,
+    loads_json,
 )
 from .llm_util import extract_tool_calls as llm_extract_tool_calls
 from .reflector import Reflector
@@ -23,5 +25,7 @@ __all__ = [
     "extract_tool_calls",
     "extract_tool_call",
     "format_tool_response",
+    "dumps_json",
+    "loads_json",
     "llm_extract_tool_calls",
 ]
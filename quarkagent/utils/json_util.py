@@ -3,13 +3,84 @@ import json
 import logging
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+# orjson is optional; fall back to the standard library when it is missing or
+# its native extension cannot be loaded on this platform. orjson selects its
+# SIMD code paths from CPU features at runtime, so no probing is needed here.
+try:
+    import orjson
+except (ImportError, OSError):
+    orjson = None  # type: ignore[assignment]
+
 # Configure logging
 logger = logging.getLogger("Json Parser")
 
+# Precompiled patterns used by clean_json_string and parse_json
+# Trailing commas only, for text without comments; string literals are
+# matched first and kept verbatim, as in JSON_CLEANUP_PATTERN below
+TRAILING_COMMA_PATTERN = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")|,\s*([}\]])')
+# One left-to-right pass: string literals are matched first and kept verbatim,
+# so comment markers inside strings (e.g. URLs) are never stripped. Comments
+# are dropped, and a trailing comma is replaced by its closing bracket.
+# Block comments end at their first "*/" and line comments always run to the
+# end of the line, even when backtracking.
+JSON_CLEANUP_PATTERN = re.compile(
+    r'("[^"\\]*(?:\\.[^"\\]*)*")'
+    r"|//[^\n]*"
+    r"|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/"
+    r"|,(?:\s|//[^\n]*(?![^\n])|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/)*([}\]])"
+)
+EMBEDDED_JSON_PATTERN = re.compile(r'```json\s*([\s\S]*?)\s*```|```([\s\S]*?)```|(\{[\s\S]*\})')
+TRAILING_COMMA_BRACE_PATTERN = re.compile(r',\s*}')
+TRAILING_COMMA_BRACKET_PATTERN = re.compile(r',\s*]')
+
+# Default number of characters kept by truncate_message_content, and the
+# marker appended when content is cut
+DEFAULT_TRUNCATE_LENGTH = 100
+TRUNCATION_SUFFIX = "..."
+
+# The parser is chosen once at import so calls dispatch without a branch.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception type
+_fast_loads = orjson.loads if orjson is not None else json.loads
+
+def dumps_json(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize an object to a JSON string, preferring orjson when installed
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        JSON string with non-ASCII characters kept as-is
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2 if indent else orjson.OPT_NON_STR_KEYS
+        try:
+            return orjson.dumps(obj, option=option).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Deserialize a JSON document, preferring orjson when installed
+
+    Args:
+        data: JSON text or UTF-8 encoded bytes
+
+    Returns:
+        Deserialized object
+    """
+    return _fast_loads(data)
+
 def extract_json_from_markdown(text: str) -> Tuple[Optional[str], str]:
     """
     Extract JSON string from Markdown text
 
+    Fences and braces are located with str.find, which scans in C without
+    regex backtracking over long responses.
+
     Args:
         text: Markdown text containing JSON
 
@@ -17,18 +88,21 @@ def extract_json_from_markdown(text: str) -> Tuple[Optional[str], str]:
         Tuple of extracted JSON string and remaining text
     """
     # Look for ```json ... ``` blocks
-    json_pattern = r"```(?:json)?\s*([\s\S]*?)```"
-    matches = re.findall(json_pattern, text)
-
-    if matches:
-        return matches[0].strip(), text
+    fence_start = text.find("```")
+    if fence_start != -1:
+        fence_end = text.find("```", fence_start + 3)
+        if fence_end != -1:
+            block = text[fence_start + 3:fence_end]
+            if block.startswith("json"):
+                block = block[4:]
+            return block.strip(), text
 
     # Look for { ... } blocks
-    brace_pattern = r"\{[\s\S]*?\}"
-    matches = re.findall(brace_pattern, text)
-
-    if matches:
-        return matches[0], text
+    brace_start = text.find("{")
+    if brace_start != -1:
+        brace_end = text.find("}", brace_start + 1)
+        if brace_end != -1:
+            return text[brace_start:brace_end + 1], text
 
     return None, text
 
@@ -45,12 +119,13 @@ def clean_json_string(json_str: str) -> str:
     if not json_str:
         return ""
 
-    # Remove comments (// and /* */)
-    json_str = re.sub(r"//.*?$", "", json_str, flags=re.MULTILINE)
-    json_str = re.sub(r"/\*.*?\*/", "", json_str, flags=re.DOTALL)
+    # Without "/" there can be no comments, so only trailing commas need work
+    if "/" not in json_str:
+        return TRAILING_COMMA_PATTERN.sub(r"\1\2", json_str).strip()
 
-    # Remove trailing commas
-    json_str = re.sub(r",\s*([}\]])", r"\1", json_str)
+    # Remove comments (// and /* */) and trailing commas in a single scan;
+    # unmatched groups expand to "" so no Python callback is needed
+    json_str = JSON_CLEANUP_PATTERN.sub(r"\1\2", json_str)
 
     return json_str.strip()
 
@@ -70,9 +145,10 @@ def parse_json(json_str: str) -> Dict:
 
     try:
         # First try direct parsing
-        return json.loads(json_str)
+        return _fast_loads(json_str)
     except json.JSONDecodeError:
-        logger.debug(f"JSON parsing failed, attempting to fix: {truncate_message_content(json_str)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("JSON parsing failed, attempting to fix: %s", truncate_message_content(json_str))
 
         # Try with strict=False to allow control characters (newlines in strings)
         try:
@@ -91,10 +167,7 @@ def parse_json(json_str: str) -> Dict:
 
         # Try to fix common issues and parse again
         # 1. Try to extract JSON from text
-        json_match = re.search(
-            r'```json\s*([\s\S]*?)\s*```|```([\s\S]*?)```|(\{[\s\S]*\})',
-            json_str
-        )
+        json_match = EMBEDDED_JSON_PATTERN.search(json_str)
         if json_match:
             extracted_json = json_match.group(1) or json_match.group(2) or json_match.group(3)
             try:
@@ -117,12 +190,13 @@ def parse_json(json_str: str) -> Dict:
             pass
 
         # 3. Try to fix trailing comma issues
-        fixed_json = re.sub(r',\s*}', '}', json_str)
-        fixed_json = re.sub(r',\s*]', ']', fixed_json)
+        fixed_json = TRAILING_COMMA_BRACE_PATTERN.sub('}', json_str)
+        fixed_json = TRAILING_COMMA_BRACKET_PATTERN.sub(']', fixed_json)
         try:
             return json.loads(fixed_json)
         except json.JSONDecodeError:
-            logger.debug(f"Unable to parse JSON: {truncate_message_content(json_str)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Unable to parse JSON: %s", truncate_message_content(json_str))
             return {}
 
 
@@ -167,10 +241,12 @@ def _fix_unescaped_newlines(json_str: str) -> str:
 
     return "".join(result)
 
-def truncate_message_content(content: str, max_length: int = 100) -> str:
+def truncate_message_content(content: str, max_length: int = DEFAULT_TRUNCATE_LENGTH) -> str:
     """
     Truncate message content for log display
 
+    Strings that already fit are returned as-is without slicing or copying.
+
     Args:
         content: Message content
         max_length: Maximum length
@@ -178,11 +254,9 @@ def truncate_message_content(content: str, max_length: int = 100) -> str:
     Returns:
         Truncated content
     """
-    if not content or not isinstance(content, str):
-        return str(content)
-    if len(content) <= max_length:
-        return content
-    return content[:max_length] + "..."
+    if isinstance(content, str):
+        return content if len(content) <= max_length else f"{content[:max_length]}{TRUNCATION_SUFFIX}"
+    return str(content)
 
 def extract_content(response: Union[Dict, Any]) -> str:
     """
@@ -208,10 +282,10 @@ def extract_content(response: Union[Dict, Any]) -> str:
                     return message.get("content", "")
 
         # If unable to parse, log and return empty string
-        logger.warning(f"Unable to extract content from response: {truncate_message_content(str(response))}")
+        logger.warning("Unable to extract content from response: %s", truncate_message_content(str(response)))
         return ""
     except Exception as e:
-        logger.error(f"Error extracting content: {str(e)}")
+        logger.error("Error extracting content: %s", e)
         return ""
 
 def extract_tool_calls(response: Union[Dict, Any]) -> List[Dict]:
@@ -263,7 +337,7 @@ def extract_tool_calls(response: Union[Dict, Any]) -> List[Dict]:
         # If unable to parse, log and return empty list
         return []
     except Exception as e:
-        logger.error(f"Error extracting tool calls: {str(e)}")
+        logger.error("Error extracting tool calls: %s", e)
         return []
 
 def extract_tool_call(response: Union[Dict, Any]) -> Optional[Dict]:
@@ -295,7 +369,7 @@ def format_tool_response(tool_call: Dict, response: Any) -> Dict:
     # Handle different response types
     if isinstance(response, (dict, list)):
         try:
-            content = json.dumps(response, ensure_ascii=False)
+            content = dumps_json(response)
         except Exception:
             content = str(response)
     else:
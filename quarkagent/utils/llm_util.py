@@ -1,11 +1,8 @@
-import os
-import sys
 import json
 import logging
 from typing import Any, Dict, List, Optional
 
-sys.path.append(os.getcwd())
-from quarkagent.utils.json_util import truncate_message_content
+from quarkagent.utils.json_util import parse_json, truncate_message_content
 
 logger = logging.getLogger("LLM Call Util")
 
@@ -24,10 +21,9 @@ def _parse_tool_arguments(arguments: Any) -> Dict[str, Any]:
 
     if isinstance(arguments, str):
         try:
-            from .json_util import parse_json
             return parse_json(arguments)
         except Exception:
-            logger.warning(f"Failed to parse tool call arguments: {truncate_message_content(arguments)}")
+            logger.warning("Failed to parse tool call arguments: %s", truncate_message_content(arguments))
 
     return {}
 
@@ -50,16 +46,17 @@ def _extract_from_openai_object(response: Any) -> List[Dict[str, Any]]:
     if not (hasattr(message, "tool_calls") and message.tool_calls):
         return tool_calls
 
-    for i, function_call in enumerate(message.tool_calls):
-        if hasattr(function_call, "function"):
-            args = _parse_tool_arguments(function_call.function.arguments)
-            tool_calls.append({
-                "id": f"call_{i}",
-                "name": function_call.function.name,
-                "arguments": args,
-            })
-
-    return tool_calls
+    # Bind the parser once; arguments are decoded by orjson when installed
+    parse_arguments = _parse_tool_arguments
+    return [
+        {
+            "id": f"call_{i}",
+            "name": function_call.function.name,
+            "arguments": parse_arguments(function_call.function.arguments),
+        }
+        for i, function_call in enumerate(message.tool_calls)
+        if hasattr(function_call, "function")
+    ]
 
 def _extract_from_dict_response(response: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -84,17 +81,16 @@ def _extract_from_dict_response(response: Dict[str, Any]) -> List[Dict[str, Any]
     if "tool_calls" not in message or not message["tool_calls"]:
         return tool_calls
 
-    for i, tc in enumerate(message["tool_calls"]):
-        if isinstance(tc, dict) and "function" in tc:
-            function_data = tc["function"]
-            arguments = _parse_tool_arguments(function_data.get("arguments"))
-            tool_calls.append({
-                "id": tc.get("id", f"call_{i}"),
-                "name": function_data.get("name", ""),
-                "arguments": arguments,
-            })
-
-    return tool_calls
+    parse_arguments = _parse_tool_arguments
+    return [
+        {
+            "id": tc.get("id", f"call_{i}"),
+            "name": tc["function"].get("name", ""),
+            "arguments": parse_arguments(tc["function"].get("arguments")),
+        }
+        for i, tc in enumerate(message["tool_calls"])
+        if isinstance(tc, dict) and "function" in tc
+    ]
 
 def _extract_from_string_response(response: str) -> List[Dict[str, Any]]:
     """
@@ -120,7 +116,7 @@ def _extract_from_string_response(response: str) -> List[Dict[str, Any]]:
                 "arguments": data["parameters"],
             })
     except json.JSONDecodeError:
-        logger.warning(f"Failed to parse tool call from response string: {truncate_message_content(response)}")
+        logger.warning("Failed to parse tool call from response string: %s", truncate_message_content(response))
 
     return tool_calls
 
@@ -148,9 +144,9 @@ def extract_tool_calls(response: Any) -> List[Dict[str, Any]]:
         if isinstance(response, str):
             return _extract_from_string_response(response)
 
-        logger.warning(f"Unknown response format: {truncate_message_content(str(response))}")
+        logger.warning("Unknown response format: %s", truncate_message_content(str(response)))
         return []
 
     except Exception as e:
-        logger.error(f"Error extracting tool calls from response: {e}")
+        logger.error("Error extracting tool calls from response: %s", e)
         return [] 
\ No newline at end of file
@@ -1,8 +1,37 @@
 import logging
+import re
 from typing import Dict, Any, Optional, List
 
 logger = logging.getLogger("Reflector")
 
+# Reflection prompt, parsed once and filled with str.format_map per call
+REFLECTION_PROMPT_TEMPLATE = """
+Please evaluate the quality of the following response, which is an answer to a user query. After evaluation, provide an improved version if necessary:
+
+User Query: {query}
+
+Current Response:
+{current_response}
+
+Please evaluate the response based on the following aspects:
+1. Accuracy: Is the information accurate?
+2. Relevance: Does the response fully answer the user's query?
+3. Completeness: Does it cover all important aspects?
+4. Clarity: Is the expression clear and understandable?
+5. Logicality: Are the arguments logical?
+6. Format: Is the format appropriate and easy to read?
+
+Please provide your improved response below. If no improvement is needed, just repeat the original response.
+"""
+
+# Case-insensitive headings that introduce the improved response section
+IMPROVED_RESPONSE_MARKER_PATTERN = re.compile(
+    r"improved response|revised response|better answer|corrected response|enhanced response",
+    re.IGNORECASE
+)
+
+REFLECTION_SYSTEM_PROMPT = "You are a high-quality response analyzer. Your task is to evaluate and improve given responses."
+
 
 class Reflector:
     """
@@ -24,7 +53,13 @@ class Reflector:
         self.disabled = self.config.get("disabled", False)
         self.max_tokens = self.config.get("max_tokens", None)
 
-        logger.debug(f"Reflector initialized, model: {model}, disabled: {self.disabled}")
+        # A disabled reflector passes inputs straight through, so bind no-ops
+        # instead of re-checking the flag on every turn
+        if self.disabled:
+            self.apply_reflection = lambda messages: messages
+            self.reflect = lambda query, current_response: current_response
+
+        logger.debug("Reflector initialized, model: %s, disabled: %s", model, self.disabled)
 
     def apply_reflection(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """
@@ -83,24 +118,9 @@ class Reflector:
         Returns:
             Reflection prompt text
         """
-        return f"""
-Please evaluate the quality of the following response, which is an answer to a user query. After evaluation, provide an improved version if necessary:
-
-User Query: {query}
-
-Current Response:
-{current_response}
-
-Please evaluate the response based on the following aspects:
-1. Accuracy: Is the information accurate?
-2. Relevance: Does the response fully answer the user's query?
-3. Completeness: Does it cover all important aspects?
-4. Clarity: Is the expression clear and understandable?
-5. Logicality: Are the arguments logical?
-6. Format: Is the format appropriate and easy to read?
-
-Please provide your improved response below. If no improvement is needed, just repeat the original response.
-"""
+        return REFLECTION_PROMPT_TEMPLATE.format_map(
+            {"query": query, "current_response": current_response}
+        )
 
     def _extract_improved_response(self, reflection_content: str) -> str:
         """
@@ -113,37 +133,27 @@ Please provide your improved response below. If no improvement is needed, just r
             Extracted improved response or None if not found
         """
         try:
-            # Simple extraction - try to find the improved response section
-            # This is a basic implementation; can be enhanced with more robust parsing
-
-            # Check if there's a clear section indicating the improved response
-            lines = reflection_content.split("\n")
-            improved_response = []
-            capture = False
-
-            for line in lines:
-                line = line.strip()
-
-                # Look for indicators of improved response
-                if any(keyword in line.lower() for keyword in [
-                    "improved response", "revised response", "better answer",
-                    "corrected response", "enhanced response"
-                ]):
-                    capture = True
-                    continue
-
-                if capture and line:
-                    improved_response.append(line)
-
-            # If no specific section found, check if the reflection is different from original
-            if improved_response:
-                return "\n".join(improved_response)
-            else:
-                # If no clear section, return the entire reflection content as fallback
+            # The improved section starts after the first marker line; without
+            # a marker the whole content is returned without splitting it
+            marker = IMPROVED_RESPONSE_MARKER_PATTERN.search(reflection_content)
+            if marker is None:
+                return reflection_content
+
+            line_end = reflection_content.find("\n", marker.end())
+            if line_end == -1:
                 return reflection_content
 
+            improved_response = [
+                line
+                for line in (raw_line.strip() for raw_line in reflection_content[line_end + 1 :].split("\n"))
+                if line and not IMPROVED_RESPONSE_MARKER_PATTERN.search(line)
+            ]
+
+            # If the marked section is empty, fall back to the entire reflection content
+            return "\n".join(improved_response) if improved_response else reflection_content
+
         except Exception as e:
-            logger.error(f"Error extracting improved response: {str(e)}")
+            logger.error("Error extracting improved response: %s", e)
             return None
 
     def reflect(self, query: str, current_response: str) -> str:
@@ -169,7 +179,7 @@ Please provide your improved response below. If no improvement is needed, just r
             # Build reflection prompt
             reflection_prompt = self._build_reflection_prompt(query, current_response)
 
-            logger.debug(f"Sending reflection prompt to LLM")
+            logger.debug("Sending reflection prompt to LLM")
 
             # Request LLM for reflection
             response = self.client.chat.completions.create(
@@ -177,7 +187,7 @@ Please provide your improved response below. If no improvement is needed, just r
                 messages = [
                     {
                         "role": "system",
-                        "content": "You are a high-quality response analyzer. Your task is to evaluate and improve given responses."
+                        "content": REFLECTION_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -191,7 +201,7 @@ Please provide your improved response below. If no improvement is needed, just r
             # Extract reflection content
             reflection_content = response.choices[0].message.content
 
-            logger.debug(f"Received reflection content: {reflection_content[:100]}...")
+            logger.debug("Received reflection content: %.100s...", reflection_content)
 
             # Extract improved response
             improved_response = self._extract_improved_response(reflection_content)
@@ -205,6 +215,6 @@ Please provide your improved response below. If no improvement is needed, just r
                 return current_response
 
         except Exception as e:
-            logger.error(f"Error during reflection process: {str(e)}")
+            logger.error("Error during reflection process: %s", e)
             # Return original response on error
             return current_response
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+
 from setuptools import setup, find_packages
 from pathlib import Path
 
@@ -8,14 +10,29 @@ from pathlib import Path
 readme_path = Path(__file__).parent / "README.md"
 long_description = readme_path.read_text(encoding = "utf-8") if readme_path.exists() else ""
 
+# Optional ahead-of-time compilation of the JSON helpers and the tool-call
+# text scanners with mypyc. Enable with QUARKAGENT_MYPYC=1 (requires
+# `pip install "mypy[mypyc]"`); without the compiled extensions the
+# pure-Python modules are imported as usual.
+ext_modules = []
+if os.environ.get("QUARKAGENT_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify([
+        "--ignore-missing-imports",
+        "--follow-imports=silent",
+        "quarkagent/utils/json_util.py",
+        "quarkagent/agent/parsing.py",
+    ])
+
 setup(
     name = "quarkagent",
     version = "0.1.0",
     packages = find_packages(),
+    ext_modules = ext_modules,
     install_requires = [
         "openai>=1.0.0",
         "python-dotenv>=0.19.0",
-        "tenacity>=8.0.0",
         "requests>=2.31.0",
         "psutil>=5.9.0",
         "distro>=1.8.0",